@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Usuario, Producto, Proveedor, Compra
+from .models import Usuario, Producto, Proveedor, Compra, CompraItem, BibliotecaItem, CarritoItem, MovimientoCredito, Tarea
+from . import busqueda  # Índice FTS5 para el buscador del admin
 
 
 # ==========================
@@ -11,6 +12,7 @@ class UsuarioAdmin(admin.ModelAdmin):
     search_fields = ('username', 'email')
     list_filter = ('estatus', 'is_active', 'pais')
     ordering = ('username',)  # Orden alfabético por username
+    readonly_fields = ('credito',)  # El saldo solo cambia mediante MovimientoCredito (ver saldo.py)
 
 
 # ==========================
@@ -23,6 +25,13 @@ class ProductoAdmin(admin.ModelAdmin):
     search_fields = ('nombre', 'genero')
     ordering = ('nombre',)
 
+    def get_search_results(self, request, queryset, search_term):
+        # Con SQLite se consulta el índice FTS5 en lugar de LIKE '%...%'
+        coincidencias = busqueda.subconsulta(search_term)
+        if coincidencias is None:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(id__in=coincidencias), False
+
 
 # ==========================
 #  PROVEEDOR
@@ -38,21 +47,84 @@ class ProveedorAdmin(admin.ModelAdmin):
 # ==========================
 #  COMPRA
 # ==========================
+class CompraItemInline(admin.TabularInline):
+    model = CompraItem
+    fields = ('producto', 'nombre', 'precio')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
 @admin.register(Compra)
 class CompraAdmin(admin.ModelAdmin):
     list_display = ('usuario', 'get_productos', 'total', 'metodo_pago', 'estatus', 'fecha_compra')
     list_filter = ('estatus', 'metodo_pago', 'fecha_compra')
     search_fields = ('usuario__username',)
     ordering = ('-fecha_compra',)  # Últimas compras primero
+    list_select_related = ('usuario',)
+    exclude = ('detalles_productos',)
+    inlines = [CompraItemInline]
+
+    def get_queryset(self, request):
+        # Una consulta para todas las líneas de la página del listado
+        return super().get_queryset(request).prefetch_related('items')
 
     def get_productos(self, obj):
         """
         Muestra los nombres de los productos de la compra en una sola cadena separada por comas.
         """
-        try:
-            productos = [p.get('nombre', 'Sin nombre') for p in obj.detalles_productos]
-            return ", ".join(productos) if productos else "Sin productos"
-        except Exception:
-            return "Error al leer productos"
+        productos = [item.nombre for item in obj.items.all()]
+        return ", ".join(productos) if productos else "Sin productos"
 
     get_productos.short_description = 'Productos'  # Nombre de columna en admin
+
+
+# ==========================
+#  BIBLIOTECA Y CARRITO
+# ==========================
+@admin.register(BibliotecaItem)
+class BibliotecaItemAdmin(admin.ModelAdmin):
+    list_display = ('usuario', 'producto', 'fecha_compra')
+    search_fields = ('usuario__username', 'producto__nombre')
+    raw_id_fields = ('usuario', 'producto')  # Evita cargar todos los usuarios/productos en un <select>
+    list_select_related = ('usuario', 'producto')
+    ordering = ('-fecha_compra',)
+
+
+@admin.register(CarritoItem)
+class CarritoItemAdmin(admin.ModelAdmin):
+    list_display = ('usuario', 'producto', 'agregado')
+    search_fields = ('usuario__username', 'producto__nombre')
+    raw_id_fields = ('usuario', 'producto')
+    list_select_related = ('usuario', 'producto')
+    ordering = ('-agregado',)
+
+
+# ==========================
+#  MOVIMIENTOS DE CRÉDITO
+# ==========================
+@admin.register(MovimientoCredito)
+class MovimientoCreditoAdmin(admin.ModelAdmin):
+    list_display = ('usuario', 'tipo', 'monto', 'compra', 'fecha')
+    list_filter = ('tipo',)
+    search_fields = ('usuario__username',)
+    raw_id_fields = ('usuario', 'compra', 'producto')
+    list_select_related = ('usuario',)
+    ordering = ('-id',)
+
+    def has_change_permission(self, request, obj=None):
+        return False  # El libro mayor es de solo inserción
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+# ==========================
+#  TAREAS EN SEGUNDO PLANO
+# ==========================
+@admin.register(Tarea)
+class TareaAdmin(admin.ModelAdmin):
+    list_display = ('funcion', 'estado', 'prioridad', 'intentos', 'max_intentos', 'disponible', 'trabajador', 'creada')
+    list_filter = ('estado', 'funcion')
+    ordering = ('-id',)
+    readonly_fields = ('intentos', 'trabajador', 'error', 'creada', 'terminada')
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AppGameverseConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'App_GameVerse'
+
+    def ready(self):
+        from . import senales  # noqa: F401  Registra los receptores de señales del catálogo
+        from . import basedatos  # noqa: F401  Instala el despachador de medir_consultas en cada conexión
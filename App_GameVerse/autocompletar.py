@@ -0,0 +1,219 @@
+# ================================
+# AUTOCOMPLETADO (ÍNDICE DE PREFIJOS EN MEMORIA)
+# ================================
+# Sugerencias mientras el usuario escribe, sin consultar la base de datos en
+# cada tecla. El índice es una lista ordenada de (clave, tipo, id) donde cada
+# clave es el nombre normalizado (sin acentos, en minúsculas) a partir de cada
+# una de sus palabras, de modo que "zel" encuentra "The Legend of Zelda".
+# Un prefijo se resuelve con bisect y los resultados se ordenan por popularidad
+# (número de bibliotecas que tienen el producto; para un proveedor, la suma de
+# sus productos).
+#
+# Para prefijos muy comunes, en vez de recorrer todo el rango se recorre una
+# lista global ordenada por popularidad hasta juntar k coincidencias.
+#
+# El índice se construye en la primera consulta de cada proceso. Cuando la
+# versión del catálogo (version_catalogo.py) avanza, solo se vuelven a leer los
+# productos/proveedores que cambiaron; si el registro de cambios no alcanza, o
+# pasó REFRESCO segundos (la popularidad cambia con las compras), se reconstruye.
+# Ambas cosas producen una instantánea nueva que reemplaza a la anterior: las
+# consultas nunca esperan a la base de datos, salvo la primera del proceso.
+
+import bisect
+import heapq
+import threading
+import time
+import unicodedata
+
+from django.db.models import Count, Q
+from django.urls import reverse
+
+from . import version_catalogo
+from .models import Producto, Proveedor
+
+RESULTADOS = 8                  # Sugerencias por defecto
+RESULTADOS_MAXIMOS = 20
+LARGO_MINIMO = 1
+LARGO_MAXIMO = 60
+REFRESCO = 10 * 60              # Segundos entre reconstrucciones completas
+CAMBIOS_MAXIMOS = 500           # Con más cambios pendientes se reconstruye todo
+MEMO_MAXIMO = 2048              # Prefijos cacheados (se vacía al cambiar el índice)
+RANGO_AMPLIO = 4000             # Claves a partir de las cuales se recorre el ranking global
+
+
+def normalizar(texto):
+    """
+    Minúsculas y sin acentos: "Acción" → "accion".
+    """
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c)).casefold()
+
+
+def _claves(nombre):
+    """
+    Una clave por cada palabra del nombre: el resto del nombre desde esa palabra.
+    """
+    palabras = normalizar(nombre).split()
+    return {' '.join(palabras[i:]) for i in range(len(palabras))}
+
+
+class _Instantanea:
+    """
+    Estado del índice en una versión del catálogo. Una vez publicada no se
+    modifica (salvo sus cachés memo y ranking), así que se lee sin candado.
+    """
+
+    def __init__(self, version, lista, datos, construido):
+        self.version = version
+        self.construido = construido
+        self.lista = lista          # [(clave, tipo, id)] ordenada
+        self.datos = datos          # (tipo, id) → (nombre, popularidad, claves)
+        self.memo = {}              # (prefijo, k) → resultados
+        self.ranking = None         # [(tipo, id)] de más a menos popular; None = por calcular
+
+    def vigente(self, version):
+        return version == self.version and time.monotonic() - self.construido < REFRESCO
+
+    def _orden(self, llave):
+        nombre, popularidad, _ = self.datos[llave]
+        return (-popularidad, nombre, llave)
+
+    def buscar(self, prefijo, k):
+        inicio = bisect.bisect_left(self.lista, (prefijo,))
+        fin = bisect.bisect_left(self.lista, (prefijo + '\uffff',), inicio)
+
+        if fin - inicio <= RANGO_AMPLIO:
+            # Rango corto: se toman los k más populares del rango
+            candidatos = {(tipo, pk) for _, tipo, pk in self.lista[inicio:fin]}
+            mejores = heapq.nsmallest(k, candidatos, key=self._orden)
+        else:
+            # Prefijo muy común ("j", "the"): se recorre el ranking global hasta juntar k
+            if self.ranking is None:
+                self.ranking = sorted(self.datos, key=self._orden)
+            mejores = []
+            for llave in self.ranking:
+                if any(clave.startswith(prefijo) for clave in self.datos[llave][2]):
+                    mejores.append(llave)
+                    if len(mejores) == k:
+                        break
+
+        return [{'tipo': tipo, 'id': pk, 'nombre': self.datos[(tipo, pk)][0]} for tipo, pk in mejores]
+
+
+class IndicePrefijos:
+    """
+    Índice de un proceso, seguro entre hilos. Las consultas leen la
+    instantánea publicada sin esperar; un solo hilo a la vez calcula la
+    siguiente (consultas a la base incluidas) y luego reemplaza la referencia.
+    Mientras tanto, las demás peticiones responden con la anterior.
+    """
+
+    def __init__(self):
+        self._candado = threading.Lock()    # Solo lo toma el hilo que recalcula
+        self._actual = None
+
+    # ---- Carga ----
+    def _productos(self, filtro=Q()):
+        qs = (
+            Producto.objects.filter(filtro, disponible=True)
+            .annotate(popularidad=Count('en_bibliotecas'))
+            .values_list('id', 'nombre', 'popularidad')
+        )
+        return [('producto', pk, nombre, popularidad) for pk, nombre, popularidad in qs]
+
+    def _proveedores(self, filtro=Q()):
+        qs = (
+            Proveedor.objects.filter(filtro, estatus=True)
+            .annotate(popularidad=Count('productos__en_bibliotecas'))
+            .values_list('id', 'nombre', 'popularidad')
+        )
+        return [('proveedor', pk, nombre, popularidad) for pk, nombre, popularidad in qs]
+
+    def _reconstruir(self, version):
+        datos, lista = {}, []
+        for tipo, pk, nombre, popularidad in self._productos() + self._proveedores():
+            claves = _claves(nombre)
+            datos[(tipo, pk)] = (nombre, popularidad, claves)
+            lista.extend((clave, tipo, pk) for clave in claves)
+        lista.sort()
+        return _Instantanea(version, lista, datos, time.monotonic())
+
+    def _actualizar(self, anterior, version, cambiados):
+        productos = [pk for tipo, pk in cambiados if tipo == 'producto']
+        proveedores = [pk for tipo, pk in cambiados if tipo == 'proveedor']
+        filas = self._productos(Q(id__in=productos)) if productos else []
+        if proveedores:
+            filas += self._proveedores(Q(id__in=proveedores))
+
+        # Copias: la instantánea anterior se sigue leyendo mientras tanto
+        datos, lista = dict(anterior.datos), list(anterior.lista)
+        # Los que ya no aparecen fueron borrados o dejaron de estar disponibles
+        for tipo, pk in cambiados:
+            quitado = datos.pop((tipo, pk), None)
+            if quitado is None:
+                continue
+            for clave in quitado[2]:
+                posicion = bisect.bisect_left(lista, (clave, tipo, pk))
+                if posicion < len(lista) and lista[posicion] == (clave, tipo, pk):
+                    del lista[posicion]
+        for tipo, pk, nombre, popularidad in filas:
+            claves = _claves(nombre)
+            datos[(tipo, pk)] = (nombre, popularidad, claves)
+            for clave in claves:
+                bisect.insort(lista, (clave, tipo, pk))
+        return _Instantanea(version, lista, datos, anterior.construido)
+
+    def _siguiente(self, anterior, version):
+        if anterior is None or time.monotonic() - anterior.construido >= REFRESCO:
+            return self._reconstruir(version)
+        cambiados = None
+        if 0 < version - anterior.version <= CAMBIOS_MAXIMOS:
+            cambiados = version_catalogo.cambios(anterior.version, version)
+        if cambiados is None:
+            return self._reconstruir(version)
+        return self._actualizar(anterior, version, cambiados)
+
+    def _instantanea(self):
+        actual = self._actual
+        version = version_catalogo.actual()
+        if actual is not None and actual.vigente(version):
+            return actual
+        # Sin índice todavía no hay con qué responder y se espera; si no, otro hilo ya recalcula
+        if not self._candado.acquire(blocking=actual is None):
+            return actual
+        try:
+            actual = self._actual   # Pudo publicarla otro hilo mientras se esperaba
+            if actual is None or not actual.vigente(version):
+                actual = self._actual = self._siguiente(actual, version)
+            return actual
+        finally:
+            self._candado.release()
+
+    # ---- Consulta ----
+    def sugerencias(self, texto, k=RESULTADOS):
+        prefijo = ' '.join(normalizar(texto[:LARGO_MAXIMO]).split())
+        if len(prefijo) < LARGO_MINIMO:
+            return []
+        instantanea = self._instantanea()
+        memo = instantanea.memo.get((prefijo, k))
+        if memo is None:
+            memo = instantanea.buscar(prefijo, k)
+            if len(instantanea.memo) >= MEMO_MAXIMO:
+                instantanea.memo.clear()
+            instantanea.memo[(prefijo, k)] = memo
+        return memo
+
+
+indice = IndicePrefijos()
+
+
+def sugerencias(texto, k=RESULTADOS):
+    """
+    Sugerencias para 'texto' con su URL de detalle, listas para JSON.
+    """
+    k = max(1, min(int(k), RESULTADOS_MAXIMOS))
+    rutas = {'producto': 'App_GameVerse:producto_detalle', 'proveedor': 'App_GameVerse:proveedor_detalle'}
+    return [
+        dict(resultado, url=reverse(rutas[resultado['tipo']], args=[resultado['id']]))
+        for resultado in indice.sugerencias(texto, k)
+    ]
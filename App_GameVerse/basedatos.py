@@ -0,0 +1,111 @@
+# ================================
+# CONEXIONES DE LECTURA Y ESCRITURA
+# ================================
+# En el perfil 'produccion' de settings hay dos conexiones al mismo archivo
+# SQLite: 'default', la única que escribe, y 'lectura', marcada query_only.
+# Con WAL, las vistas de solo lectura (tienda, detalle, biblioteca, compras)
+# leen por 'lectura' sin esperar a una compra que tenga abierto el bloqueo de
+# escritura en 'default'.
+#
+# El enrutador de Django decide por modelo, no por vista, así que las vistas
+# se marcan con @solo_lectura y el enrutador consulta esa marca. Las lecturas
+# dentro de una transacción de 'default' siguen en 'default' para ver sus
+# propios cambios sin confirmar. La marca es una ContextVar, así que también
+# la ven las consultas que el ORM asíncrono ejecuta en su hilo.
+#
+# medir_consultas() usa la misma idea para los middlewares que cuentan
+# consultas: cada conexión lleva un execute_wrapper fijo que pasa la consulta
+# a los medidores de la ContextVar. Envolver connections.all() por petición no
+# sirve con ASGI, porque el ORM asíncrono consulta desde otro hilo (con otras
+# conexiones) que además comparten las peticiones concurrentes.
+
+import contextvars
+from contextlib import contextmanager
+from functools import partial, wraps
+
+from asgiref.sync import iscoroutinefunction
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+ALIAS_LECTURA = 'lectura'
+METODOS_LECTURA = ('GET', 'HEAD')
+
+_solo_lectura = contextvars.ContextVar('gameverse_solo_lectura', default=False)
+_medidores = contextvars.ContextVar('gameverse_medidores', default=())
+
+
+def solo_lectura(view_func):
+    """
+    Envía las consultas de la vista a la conexión de lectura (solo en GET/HEAD).
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            if request.method not in METODOS_LECTURA:
+                return await view_func(request, *args, **kwargs)
+            marca = _solo_lectura.set(True)
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                _solo_lectura.reset(marca)
+        return _wrapped_view
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if request.method not in METODOS_LECTURA:
+            return view_func(request, *args, **kwargs)
+        marca = _solo_lectura.set(True)
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            _solo_lectura.reset(marca)
+    return _wrapped_view
+
+
+class EnrutadorLectura:
+    """
+    Lecturas marcadas → 'lectura'; todo lo demás (y toda escritura) → 'default'.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _solo_lectura.get() and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return ALIAS_LECTURA
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Ambas conexiones son el mismo archivo
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def medir_consultas(medidor):
+    """
+    Pasa por 'medidor' (con la firma de un execute_wrapper) cada consulta que se
+    ejecute en este contexto, en cualquier conexión, incluidas las que el ORM
+    asíncrono y sync_to_async usan en su hilo.
+    """
+    marca = _medidores.set(_medidores.get() + (medidor,))
+    try:
+        yield medidor
+    finally:
+        _medidores.reset(marca)
+
+
+def _despachar(execute, sql, params, many, context):
+    for medidor in reversed(_medidores.get()):
+        execute = partial(medidor, execute)
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created, dispatch_uid='gameverse_medir_consultas')
+def _instalar_despachador(sender, connection, **kwargs):
+    # Al principio de la lista: execute_wrapper() saca con pop() el último que agregó
+    if _despachar not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _despachar)
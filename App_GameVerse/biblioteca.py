@@ -0,0 +1,55 @@
+# ================================
+# BIBLIOTECA DEL USUARIO
+# ================================
+# Consulta paginada de la biblioteca: un solo SELECT (JOIN a Producto) por
+# página, con filtros por tipo/género y orden por fecha de compra sobre el
+# índice (usuario, fecha_compra, id). El costo no crece con el tamaño de la biblioteca.
+
+from .models import BibliotecaItem
+from .paginacion import apaginar, paginar
+
+TAMANO_PAGINA = 24
+
+ORDENES = {
+    'recientes': True,     # Fecha de compra descendente
+    'antiguos': False,
+}
+ORDEN_POR_DEFECTO = 'recientes'
+
+# Columnas que usa la tarjeta de biblioteca.html
+CAMPOS = (
+    'id', 'usuario_id', 'fecha_compra',
+    'producto__id', 'producto__nombre', 'producto__imagen', 'producto__imagen_hash', 'producto__imagen_ancho',
+)
+
+
+def _items(usuario, tipo=None, genero=None):
+    qs = (
+        BibliotecaItem.objects
+        .filter(usuario=usuario)
+        .select_related('producto')
+        .only(*CAMPOS)
+    )
+    if tipo:
+        qs = qs.filter(producto__tipo=tipo)
+    if genero:
+        qs = qs.filter(producto__genero=genero)
+    return qs
+
+
+def pagina_biblioteca(usuario, tipo=None, genero=None, orden=ORDEN_POR_DEFECTO, cursor=None, limite=TAMANO_PAGINA):
+    """
+    Una página de la biblioteca del usuario; cada item expone .producto y .fecha_compra.
+    """
+    descendente = ORDENES.get(orden, ORDENES[ORDEN_POR_DEFECTO])
+    return paginar(_items(usuario, tipo, genero), 'fecha_compra', descendente=descendente, cursor=cursor, limite=limite)
+
+
+async def apagina_biblioteca(usuario, tipo=None, genero=None, orden=ORDEN_POR_DEFECTO, cursor=None, limite=TAMANO_PAGINA):
+    """
+    pagina_biblioteca() con el ORM asíncrono.
+    """
+    descendente = ORDENES.get(orden, ORDENES[ORDEN_POR_DEFECTO])
+    return await apaginar(
+        _items(usuario, tipo, genero), 'fecha_compra', descendente=descendente, cursor=cursor, limite=limite,
+    )
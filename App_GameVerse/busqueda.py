@@ -0,0 +1,168 @@
+# ================================
+# BÚSQUEDA DE TEXTO COMPLETO
+# ================================
+# Consulta la tabla virtual FTS5 'App_GameVerse_producto_fts' (migración 0015),
+# que indexa nombre, descripción, género y nombre del proveedor de cada producto.
+# Los triggers de la migración la mantienen al día; reconstruir() la vuelve a
+# llenar desde cero si alguna vez se desincroniza.
+#
+# Los resultados se ordenan por relevancia (bm25). Como el orden depende del
+# texto buscado no se puede paginar por cursor: se usa LIMIT/OFFSET con un
+# número máximo de páginas, suficiente para una búsqueda.
+#
+# En motores distintos de SQLite se usa un filtro icontains como respaldo.
+
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .catalogo import productos_visibles
+
+TABLA = 'App_GameVerse_producto_fts'
+TAMANO_PAGINA = 24
+PAGINAS_MAXIMAS = 20
+LARGO_MAXIMO = 100          # Caracteres de la consulta que se toman en cuenta
+TERMINOS_MAXIMOS = 8
+
+# Peso de cada columna en bm25: nombre, descripcion, genero, proveedor
+PESOS = (10.0, 1.0, 3.0, 4.0)
+
+_PALABRA = re.compile(r'\w+', re.UNICODE)
+
+
+def disponible():
+    """
+    True si la base de datos tiene el índice FTS5 (solo SQLite).
+    """
+    return connection.vendor == 'sqlite'
+
+
+def expresion(texto):
+    """
+    Convierte el texto del usuario en una expresión MATCH segura:
+    cada palabra va entre comillas (sin operadores FTS5) y, si tiene al
+    menos dos letras, con '*' para buscar por prefijo. Todas las palabras
+    deben aparecer (AND implícito).
+    """
+    palabras = _PALABRA.findall((texto or '')[:LARGO_MAXIMO])[:TERMINOS_MAXIMOS]
+    return ' '.join(f'"{palabra}"*' if len(palabra) > 1 else f'"{palabra}"' for palabra in palabras)
+
+
+def _ids_fts(consulta, desde, cantidad):
+    sql = (
+        f"SELECT f.rowid FROM {TABLA} f "
+        f"JOIN App_GameVerse_producto p ON p.id = f.rowid "
+        f"WHERE {TABLA} MATCH %s AND p.disponible "
+        f"ORDER BY bm25({TABLA}, {', '.join(str(peso) for peso in PESOS)}), f.rowid "
+        f"LIMIT %s OFFSET %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [consulta, cantidad, desde])
+        return [fila[0] for fila in cursor.fetchall()]
+
+
+def _ids_respaldo(texto, desde, cantidad):
+    qs = productos_visibles()
+    for palabra in _PALABRA.findall(texto[:LARGO_MAXIMO])[:TERMINOS_MAXIMOS]:
+        qs = qs.filter(nombre__icontains=palabra)
+    return list(qs.order_by('nombre', 'id').values_list('id', flat=True)[desde:desde + cantidad])
+
+
+def buscar(texto, pagina=1, limite=TAMANO_PAGINA):
+    """
+    Devuelve (productos, hay_siguiente) para la página 'pagina' (base 1).
+    Son dos consultas: los ids ordenados por relevancia y las tarjetas.
+    """
+    pagina = max(1, min(int(pagina), PAGINAS_MAXIMAS))
+    consulta = expresion(texto)
+    if not consulta:
+        return [], False
+
+    desde = (pagina - 1) * limite
+    if disponible():
+        ids = _ids_fts(consulta, desde, limite + 1)
+    else:
+        ids = _ids_respaldo(texto, desde, limite + 1)
+
+    hay_siguiente = len(ids) > limite and pagina < PAGINAS_MAXIMAS
+    ids = ids[:limite]
+    por_id = productos_visibles().in_bulk(ids)
+    return [por_id[i] for i in ids if i in por_id], hay_siguiente
+
+
+def subconsulta(texto):
+    """
+    Subconsulta con los ids de todos los productos (disponibles o no) que
+    coinciden con 'texto', para usar como filter(id__in=...). Lo usa el admin
+    para no recorrer la tabla con LIKE. None si no hay índice o texto útil.
+    """
+    consulta = expresion(texto)
+    if not consulta or not disponible():
+        return None
+    return RawSQL(f"SELECT rowid FROM {TABLA} WHERE {TABLA} MATCH %s", [consulta])
+
+
+# Triggers que mantienen el índice al día (los mismos que crea la migración 0015).
+# SQLite los borra cuando una migración reconstruye la tabla de Producto o Proveedor
+# (p. ej. al agregar una columna), así que esas migraciones deben quitarlos antes
+# y volver a crearlos después, con su propia copia del SQL (como 0016 y 0018):
+# una migración no puede depender de este módulo, que puede cambiar.
+_INSERTAR = (
+    f"INSERT INTO {TABLA}(rowid, nombre, descripcion, genero, proveedor) "
+    f"VALUES (new.id, new.nombre, new.descripcion, new.genero, "
+    f"(SELECT nombre FROM App_GameVerse_proveedor WHERE id = new.proveedor_id));"
+)
+TRIGGERS = {
+    'producto_fts_insert': (
+        f"AFTER INSERT ON App_GameVerse_producto BEGIN {_INSERTAR} END"
+    ),
+    'producto_fts_update': (
+        f"AFTER UPDATE OF nombre, descripcion, genero, proveedor_id ON App_GameVerse_producto BEGIN "
+        f"DELETE FROM {TABLA} WHERE rowid = old.id; {_INSERTAR} END"
+    ),
+    'producto_fts_delete': (
+        f"AFTER DELETE ON App_GameVerse_producto BEGIN DELETE FROM {TABLA} WHERE rowid = old.id; END"
+    ),
+    'proveedor_fts_update': (
+        f"AFTER UPDATE OF nombre ON App_GameVerse_proveedor BEGIN "
+        f"UPDATE {TABLA} SET proveedor = new.nombre "
+        f"WHERE rowid IN (SELECT id FROM App_GameVerse_producto WHERE proveedor_id = new.id); END"
+    ),
+}
+
+
+def quitar_triggers(conexion=connection):
+    if conexion.vendor != 'sqlite':
+        return
+    with conexion.cursor() as cursor:
+        for nombre in TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+
+
+def crear_triggers(conexion=connection):
+    if conexion.vendor != 'sqlite':
+        return
+    with conexion.cursor() as cursor:
+        for nombre, cuerpo in TRIGGERS.items():
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo}")
+
+
+def reconstruir():
+    """
+    Vacía y vuelve a llenar el índice desde Producto/Proveedor y lo compacta.
+    También vuelve a crear los triggers si faltan. Devuelve el número de productos indexados.
+    """
+    if not disponible():
+        return 0
+    crear_triggers()
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLA}")
+        cursor.execute(
+            f"INSERT INTO {TABLA}(rowid, nombre, descripcion, genero, proveedor) "
+            f"SELECT p.id, p.nombre, p.descripcion, p.genero, v.nombre "
+            f"FROM App_GameVerse_producto p JOIN App_GameVerse_proveedor v ON v.id = p.proveedor_id"
+        )
+        cursor.execute(f"INSERT INTO {TABLA}({TABLA}) VALUES ('optimize')")
+        cursor.execute(f"SELECT COUNT(*) FROM {TABLA}")
+        return cursor.fetchone()[0]
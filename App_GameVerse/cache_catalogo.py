@@ -0,0 +1,143 @@
+# ================================
+# CACHÉ DEL CATÁLOGO
+# ================================
+# Guarda en la caché de Django lo que es igual para todos los visitantes:
+# páginas de la tienda, productos y páginas de proveedor. Todas las claves
+# incluyen la versión del catálogo (version_catalogo.py), así que cualquier
+# cambio en Producto/Proveedor deja obsoletas las entradas anteriores sin
+# tener que borrarlas: simplemente dejan de consultarse y expiran solas.
+#
+# Lo que depende del usuario ("ya en biblioteca", "ya en carrito") NO se
+# guarda aquí; las vistas lo aplican encima de lo que devuelve este módulo.
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+from . import catalogo, version_catalogo
+from .models import Producto, Proveedor
+
+TTL = 60 * 60               # Segundos por defecto (settings.CATALOGO_CACHE_TTL)
+
+
+def ttl():
+    return getattr(settings, 'CATALOGO_CACHE_TTL', TTL)
+
+
+def _clave(version, nombre, *partes):
+    # Las partes pueden incluir cursores largos: se resumen con un hash
+    resumen = hashlib.sha1(repr(partes).encode()).hexdigest()
+    return f'catalogo:{version}:{nombre}:{resumen}'
+
+
+def _obtener(nombre, partes, calcular, version=None):
+    version = version or version_catalogo.actual()
+    clave = _clave(version, nombre, *partes)
+    valor = cache.get(clave)
+    if valor is None:
+        valor = calcular()
+        cache.set(clave, valor, ttl())
+    return valor
+
+
+async def _aobtener(nombre, partes, calcular, version=None):
+    """
+    _obtener() para vistas async: 'calcular' es una corrutina.
+    """
+    version = version or await version_catalogo.aactual()
+    clave = _clave(version, nombre, *partes)
+    valor = await cache.aget(clave)
+    if valor is None:
+        valor = await calcular()
+        await cache.aset(clave, valor, ttl())
+    return valor
+
+
+def _partes_tienda(orden, cursor, filtros):
+    return (
+        orden, cursor or '',
+        tuple(sorted((campo, getattr(valor, 'pk', valor)) for campo, valor in filtros.items())),
+    )
+
+
+def pagina_tienda(orden, cursor, filtros, version=None):
+    """
+    catalogo.consultar() con caché. Los filtros se normalizan para que el
+    mismo filtro produzca la misma clave.
+    """
+    return _obtener(
+        'tienda', _partes_tienda(orden, cursor, filtros),
+        lambda: catalogo.consultar(orden=orden, cursor=cursor, **filtros),
+        version,
+    )
+
+
+async def apagina_tienda(orden, cursor, filtros, version=None):
+    return await _aobtener(
+        'tienda', _partes_tienda(orden, cursor, filtros),
+        lambda: catalogo.aconsultar(orden=orden, cursor=cursor, **filtros),
+        version,
+    )
+
+
+def producto(pk, version=None):
+    """
+    Producto con su proveedor. Lanza Http404 si no existe; la ausencia también
+    se guarda hasta el siguiente cambio del catálogo.
+    """
+    def calcular():
+        return Producto.objects.select_related('proveedor').filter(pk=pk).first() or False
+
+    encontrado = _obtener('producto', (pk,), calcular, version)
+    if not encontrado:
+        raise Http404('Producto no encontrado')
+    return encontrado
+
+
+async def aproducto(pk, version=None):
+    async def calcular():
+        return await Producto.objects.select_related('proveedor').filter(pk=pk).afirst() or False
+
+    encontrado = await _aobtener('producto', (pk,), calcular, version)
+    if not encontrado:
+        raise Http404('Producto no encontrado')
+    return encontrado
+
+
+def pagina_proveedor(pk, version=None):
+    """
+    (proveedor, productos disponibles) para proveedor_detalle.
+    """
+    def calcular():
+        proveedor = Proveedor.objects.filter(pk=pk).first()
+        if proveedor is None:
+            return False
+        return proveedor, list(_productos_proveedor(proveedor))
+
+    encontrado = _obtener('proveedor', (pk,), calcular, version)
+    if not encontrado:
+        raise Http404('Proveedor no encontrado')
+    return encontrado
+
+
+async def apagina_proveedor(pk, version=None):
+    async def calcular():
+        proveedor = await Proveedor.objects.filter(pk=pk).afirst()
+        if proveedor is None:
+            return False
+        return proveedor, [p async for p in _productos_proveedor(proveedor)]
+
+    encontrado = await _aobtener('proveedor', (pk,), calcular, version)
+    if not encontrado:
+        raise Http404('Proveedor no encontrado')
+    return encontrado
+
+
+def _productos_proveedor(proveedor):
+    return (
+        proveedor.productos.filter(disponible=True)
+        # 'proveedor' se incluye: el related manager lo lee de cada fila para enlazarla con 'proveedor'
+        .only('id', 'proveedor', 'nombre', 'genero', 'precio', 'imagen', 'imagen_hash', 'imagen_ancho', 'actualizado')
+    )
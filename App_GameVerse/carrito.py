@@ -0,0 +1,88 @@
+# ================================
+# SERVICIO DEL CARRITO
+# ================================
+# Resuelve y cotiza el carrito completo de un usuario con una sola consulta.
+# Lo usan carrito_view, comprar_carrito y pago_tarjeta para que todos
+# muestren y cobren exactamente los mismos montos.
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from .models import CarritoItem
+
+TASA_IVA = Decimal('0.16')     # IVA aplicado sobre el subtotal
+CENTAVOS = Decimal('0.01')
+
+# Columnas del producto que necesitan el carrito y el checkout
+CAMPOS_PRODUCTO = ('producto__id', 'producto__nombre', 'producto__precio', 'producto__disponible')
+
+
+def redondear(monto):
+    """
+    Redondea un monto a centavos (mitad hacia arriba).
+    """
+    return Decimal(monto).quantize(CENTAVOS, rounding=ROUND_HALF_UP)
+
+
+class LineaCarrito:
+    """
+    Un producto del carrito cotizado con su precio actual.
+    """
+
+    def __init__(self, producto):
+        self.producto = producto
+        self.id_producto = producto.id
+        self.precio = producto.precio
+        self.subtotal = producto.precio   # No hay cantidades: cada producto se compra una vez
+
+
+class ResumenCarrito:
+    """
+    Carrito resuelto: líneas válidas, productos descartados y totales con IVA.
+    """
+
+    def __init__(self, lineas, descartados):
+        self.lineas = lineas
+        self.descartados = descartados    # Productos que ya no están disponibles
+        self.subtotal = redondear(sum((linea.precio for linea in lineas), Decimal('0.00')))
+        self.iva = redondear(self.subtotal * TASA_IVA)
+        self.total = self.subtotal + self.iva
+
+    def __iter__(self):
+        return iter(self.lineas)
+
+    def __len__(self):
+        return len(self.lineas)
+
+    def __bool__(self):
+        return bool(self.lineas)
+
+    @property
+    def productos(self):
+        return [linea.producto for linea in self.lineas]
+
+    @property
+    def ids(self):
+        return [linea.id_producto for linea in self.lineas]
+
+
+def resolver_carrito(usuario):
+    """
+    Carga el carrito del usuario con un solo SELECT (JOIN a Producto) y lo cotiza
+    con el precio actual de cada producto. Los productos no disponibles se descartan.
+    """
+    items = (
+        CarritoItem.objects
+        .filter(usuario=usuario)
+        .select_related('producto')
+        .only('id', 'usuario_id', *CAMPOS_PRODUCTO)
+        .order_by('id')
+    )
+
+    lineas, descartados = [], []
+    for item in items:
+        if item.producto.disponible:
+            lineas.append(LineaCarrito(item.producto))
+        else:
+            descartados.append(item.producto)
+
+    return ResumenCarrito(lineas, descartados)
@@ -0,0 +1,86 @@
+# ================================
+# CATÁLOGO DE LA TIENDA
+# ================================
+# Capa de consultas del catálogo: filtros, órdenes y paginación por cursor
+# (ver paginacion.py) sobre los índices compuestos de Producto.
+
+from django.db.models.functions import Substr
+
+from .models import Producto
+from .paginacion import apaginar, paginar
+
+TAMANO_PAGINA = 24          # Productos por página en la tienda
+TAMANO_PAGINA_MAXIMO = 60   # Límite superior aceptado desde la URL
+LARGO_RESUMEN = 300         # Caracteres de la descripción que necesita la tarjeta
+
+# Orden visible → campo del modelo. El desempate siempre es por 'id'.
+ORDENES = {
+    'recientes': '-id',
+    'precio': 'precio',
+    '-precio': '-precio',
+    'lanzamiento': 'fecha_lanzamiento',
+    '-lanzamiento': '-fecha_lanzamiento',
+    'calificacion': 'calificacion_promedio',
+    '-calificacion': '-calificacion_promedio',
+}
+ORDEN_POR_DEFECTO = 'recientes'
+
+# Columnas que usa la tarjeta de tienda.html (la descripción llega recortada como 'resumen')
+CAMPOS_TARJETA = (
+    'id', 'nombre', 'precio', 'imagen', 'imagen_hash', 'imagen_ancho', 'fecha_lanzamiento', 'calificacion_promedio',
+)
+
+def productos_visibles():
+    """
+    QuerySet base del catálogo: productos disponibles con solo las columnas de la tarjeta.
+    """
+    return (
+        Producto.objects
+        .filter(disponible=True)
+        .only(*CAMPOS_TARJETA)
+        .annotate(resumen=Substr('descripcion', 1, LARGO_RESUMEN))
+    )
+
+
+def aplicar_filtros(qs, tipo=None, genero=None, proveedor=None, precio_min=None, precio_max=None):
+    """
+    Aplica los filtros opcionales del catálogo. Los valores vacíos se ignoran.
+    """
+    if tipo:
+        qs = qs.filter(tipo=tipo)
+    if genero:
+        qs = qs.filter(genero=genero)
+    if proveedor:
+        qs = qs.filter(proveedor=proveedor)
+    if precio_min is not None:
+        qs = qs.filter(precio__gte=precio_min)
+    if precio_max is not None:
+        qs = qs.filter(precio__lte=precio_max)
+    return qs
+
+
+def _campo_orden(orden):
+    campo = ORDENES.get(orden, ORDENES[ORDEN_POR_DEFECTO])
+    return campo.lstrip('-'), campo.startswith('-')
+
+
+def _limite(limite):
+    return max(1, min(int(limite or TAMANO_PAGINA), TAMANO_PAGINA_MAXIMO))
+
+
+def consultar(orden=ORDEN_POR_DEFECTO, cursor=None, limite=TAMANO_PAGINA, **filtros):
+    """
+    Ejecuta una página del catálogo con un solo SELECT.
+    """
+    campo, descendente = _campo_orden(orden)
+    qs = aplicar_filtros(productos_visibles(), **filtros)
+    return paginar(qs, campo, descendente, cursor, _limite(limite))
+
+
+async def aconsultar(orden=ORDEN_POR_DEFECTO, cursor=None, limite=TAMANO_PAGINA, **filtros):
+    """
+    consultar() con el ORM asíncrono.
+    """
+    campo, descendente = _campo_orden(orden)
+    qs = aplicar_filtros(productos_visibles(), **filtros)
+    return await apaginar(qs, campo, descendente, cursor, _limite(limite))
@@ -0,0 +1,64 @@
+# ================================
+# GET CONDICIONAL (ETag / Last-Modified)
+# ================================
+# Piezas para usar con django.views.decorators.http.condition en las páginas
+# de detalle. Si el cliente ya tiene la versión vigente se responde 304 sin
+# renderizar la plantilla.
+#
+# Lo que cambia la página para un usuario también entra en el ETag: su id,
+# el crédito y el rol que muestra el navbar, el secreto CSRF (los formularios
+# llevan un token derivado de él) y el estado del producto en su biblioteca/
+# carrito. Last-Modified solo se envía a visitantes anónimos, porque quitar
+# algo del carrito no deja una fecha con la que compararlo.
+#
+# Si hay mensajes de django.contrib.messages pendientes (p. ej. el aviso que
+# deja agregar_al_carrito antes de redirigir al detalle), la página que los
+# muestra no es la que el cliente tiene guardada: con @sin_mensajes las
+# funciones de condition() devuelven None y se responde completa.
+
+import hashlib
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.middleware.csrf import get_token
+from django.utils.http import quote_etag
+
+
+def firma_usuario(request):
+    """
+    Partes del ETag que dependen de quién hace la petición.
+    """
+    usuario = request.user
+    if not usuario.is_authenticated:
+        return ('anonimo',)
+    # En la primera visita aún no hay secreto: se genera ya (el render usaría el mismo)
+    # para que el ETag coincida con la cookie que recibe el cliente
+    get_token(request)
+    return (usuario.pk, str(usuario.credito), usuario.is_superuser, request.META['CSRF_COOKIE'])
+
+
+def etag(*partes):
+    """
+    ETag opaco a partir de las partes (se resumen con SHA-1).
+    """
+    return quote_etag(hashlib.sha1(repr(partes).encode()).hexdigest())
+
+
+def sin_mensajes(funcion):
+    """
+    Envuelve una función de ETag/Last-Modified para que devuelva None mientras
+    el request tenga mensajes por mostrar.
+    """
+    @wraps(funcion)
+    def _envuelta(request, *args, **kwargs):
+        if len(get_messages(request)):
+            return None
+        return funcion(request, *args, **kwargs)
+    return _envuelta
+
+
+def solo_anonimos(request, fecha):
+    """
+    Last-Modified para anónimos; None (sin encabezado) para usuarios autenticados.
+    """
+    return None if request.user.is_authenticated else fecha
@@ -0,0 +1,182 @@
+# ================================
+# ARCHIVOS ESTÁTICOS EN PRODUCCIÓN
+# ================================
+# 1. EstaticosComprimidos: storage de collectstatic que
+#    - re-codifica imágenes PNG/JPEG optimizadas (solo si quedan más pequeñas),
+#    - escribe nombres con hash de contenido (ManifestStaticFilesStorage),
+#    - y deja junto a cada archivo de texto su copia .gz (y .br si está instalado 'brotli').
+# 2. EstaticosMiddleware: sirve STATIC_ROOT desde el propio proceso WSGI/ASGI con
+#    negociación de Accept-Encoding y caché "immutable" para los nombres con hash.
+#    Funciona en modo síncrono y asíncrono: con ASGI solo el acceso al disco de
+#    un archivo estático pasa a un hilo, no toda la cadena de middlewares.
+
+import gzip
+import io
+import mimetypes
+import os
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:  # Dependencia opcional: sin ella solo se generan copias .gz
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+EXTENSIONES_TEXTO = ('.css', '.js', '.svg', '.txt', '.html', '.json', '.xml', '.map')
+EXTENSIONES_IMAGEN = ('.png', '.jpg', '.jpeg')
+TAMANO_MINIMO_COMPRESION = 256          # Bytes; por debajo no vale la pena comprimir
+CACHE_INMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_SIN_HASH = 'public, max-age=60'
+
+_CON_HASH = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+
+# ==========================
+#  STORAGE DE COLLECTSTATIC
+# ==========================
+def _optimizar_imagen(ruta):
+    """
+    Re-codifica una imagen PNG/JPEG y la reemplaza solo si el resultado es más pequeño.
+    """
+    from PIL import Image
+
+    extension = os.path.splitext(ruta)[1].lower()
+    with Image.open(ruta) as imagen:
+        imagen.load()
+        salida = io.BytesIO()
+        if extension == '.png':
+            imagen.save(salida, 'PNG', optimize=True)
+        else:
+            imagen.convert('RGB').save(salida, 'JPEG', quality=82, optimize=True, progressive=True)
+
+    if salida.tell() < os.path.getsize(ruta):
+        with open(ruta, 'wb') as archivo:
+            archivo.write(salida.getvalue())
+
+
+def _comprimir(ruta):
+    with open(ruta, 'rb') as archivo:
+        datos = archivo.read()
+    if len(datos) < TAMANO_MINIMO_COMPRESION:
+        return
+
+    comprimido = gzip.compress(datos, compresslevel=9, mtime=0)
+    if len(comprimido) < len(datos):
+        with open(ruta + '.gz', 'wb') as archivo:
+            archivo.write(comprimido)
+
+    if brotli is not None:
+        comprimido = brotli.compress(datos, quality=11)
+        if len(comprimido) < len(datos):
+            with open(ruta + '.br', 'wb') as archivo:
+                archivo.write(comprimido)
+
+
+class EstaticosComprimidos(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage + imágenes optimizadas + copias precomprimidas.
+    """
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        optimizados = set()
+        for original, procesado, fue_procesado in super().post_process(paths, dry_run, **options):
+            if not dry_run and procesado and not isinstance(fue_procesado, Exception):
+                extension = procesado.lower()
+                if extension.endswith(EXTENSIONES_TEXTO):
+                    _comprimir(self.path(procesado))
+                elif extension.endswith(EXTENSIONES_IMAGEN) and procesado not in optimizados:
+                    # El hash se calcula sobre el archivo fuente, así que es estable entre despliegues
+                    _optimizar_imagen(self.path(procesado))
+                    optimizados.add(procesado)
+            yield original, procesado, fue_procesado
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            if content is not None:
+                raise
+            # Archivo inexistente (url() rota en un CSS, o desarrollo sin collectstatic): se deja el nombre tal cual
+            return name
+
+
+# ==========================
+#  MIDDLEWARE DE SERVICIO
+# ==========================
+class EstaticosMiddleware:
+    """
+    Sirve STATIC_ROOT sin servidor web aparte. Prefiere la copia .br o .gz
+    según Accept-Encoding y marca como inmutables los archivos con hash.
+    Con DEBUG=True no interviene (los sirve django.conf.urls.static).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefijo = settings.STATIC_URL or '/static/'
+        self.raiz = str(settings.STATIC_ROOT) if settings.STATIC_ROOT else None
+        self.activo = getattr(settings, 'ESTATICOS_EN_PROCESO', not settings.DEBUG) and self.raiz
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        if self._es_estatico(request):
+            respuesta = self._servir(request, request.path_info[len(self.prefijo):])
+            if respuesta is not None:
+                return respuesta
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self._es_estatico(request):
+            # stat() y open() bloquean; no tocan la base de datos, así que no hace falta el hilo compartido
+            respuesta = await sync_to_async(self._servir, thread_sensitive=False)(
+                request, request.path_info[len(self.prefijo):]
+            )
+            if respuesta is not None:
+                return respuesta
+        return await self.get_response(request)
+
+    def _es_estatico(self, request):
+        return self.activo and request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefijo)
+
+    def _servir(self, request, nombre):
+        try:
+            ruta = safe_join(self.raiz, nombre)
+        except (SuspiciousFileOperation, ValueError):
+            return None  # Intento de salir de STATIC_ROOT
+        if not os.path.isfile(ruta):
+            return None
+
+        estado = os.stat(ruta)
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), estado.st_mtime):
+            return HttpResponseNotModified()
+
+        tipo, _ = mimetypes.guess_type(ruta)
+        aceptadas = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        codificacion, servir = None, ruta
+        for token, extension in (('br', '.br'), ('gzip', '.gz')):
+            if token in aceptadas and os.path.isfile(ruta + extension):
+                codificacion, servir = token, ruta + extension
+                break
+
+        respuesta = FileResponse(open(servir, 'rb'), content_type=tipo or 'application/octet-stream')
+        if codificacion:
+            respuesta['Content-Encoding'] = codificacion
+        if nombre.lower().endswith(EXTENSIONES_TEXTO):
+            respuesta['Vary'] = 'Accept-Encoding'
+        respuesta['Last-Modified'] = http_date(estado.st_mtime)
+        respuesta['Cache-Control'] = CACHE_INMUTABLE if _CON_HASH.search(nombre) else CACHE_SIN_HASH
+        return respuesta
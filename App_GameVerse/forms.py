@@ -4,6 +4,7 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from .models import Usuario, Producto, Proveedor
 import re
+from decimal import Decimal
 
 
 # =====================================================
@@ -203,7 +204,7 @@ class PagoTarjetaForm(forms.Form):
 # FORMULARIO PARA AGREGAR CRÉDITO
 # =====================================================
 class AgregarCreditoForm(forms.Form):
-    credito = forms.DecimalField(max_digits=10, decimal_places=2, label="Monto a agregar")
+    credito = forms.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'), label="Monto a agregar")
     nombre_tarjeta = forms.CharField(max_length=100)
     numero_tarjeta = forms.CharField(max_length=20)
     mes_expiracion = forms.IntegerField(min_value=1, max_value=12, label="Mes de expiración")
@@ -223,6 +224,101 @@ class AgregarCreditoForm(forms.Form):
         return cleaned_data
 
 
+# =====================================================
+# FORMULARIO DE FILTROS DEL CATÁLOGO
+# =====================================================
+class FiltroCatalogoForm(forms.Form):
+    ORDENES = [
+        ('recientes', 'Más recientes en la tienda'),
+        ('precio', 'Precio: menor a mayor'),
+        ('-precio', 'Precio: mayor a menor'),
+        ('-lanzamiento', 'Lanzamiento: más nuevos'),
+        ('lanzamiento', 'Lanzamiento: más antiguos'),
+        ('-calificacion', 'Mejor calificados'),
+    ]
+
+    tipo = forms.ChoiceField(
+        choices=[('', 'Todos los tipos')] + Producto.TIPO_PRODUCTO,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    genero = forms.CharField(
+        max_length=50,
+        required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Género'})
+    )
+    proveedor = forms.ModelChoiceField(
+        queryset=Proveedor.objects.filter(estatus=True).only('id', 'nombre').order_by('nombre'),
+        required=False,
+        empty_label='Todos los proveedores',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    precio_min = forms.DecimalField(
+        max_digits=10, decimal_places=2, min_value=0, required=False,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Precio mínimo'})
+    )
+    precio_max = forms.DecimalField(
+        max_digits=10, decimal_places=2, min_value=0, required=False,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Precio máximo'})
+    )
+    orden = forms.ChoiceField(
+        choices=ORDENES,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    cursor = forms.CharField(required=False, widget=forms.HiddenInput)
+
+    def filtros(self):
+        """
+        Devuelve los filtros válidos listos para catalogo.consultar().
+        """
+        data = self.cleaned_data if self.is_valid() else {}
+        return {
+            'tipo': data.get('tipo') or None,
+            'genero': (data.get('genero') or '').strip() or None,
+            'proveedor': data.get('proveedor'),
+            'precio_min': data.get('precio_min'),
+            'precio_max': data.get('precio_max'),
+        }
+
+
+# =====================================================
+# FORMULARIO DE FILTROS DE LA BIBLIOTECA
+# =====================================================
+class FiltroBibliotecaForm(forms.Form):
+    ORDENES = [
+        ('recientes', 'Compras más recientes'),
+        ('antiguos', 'Compras más antiguas'),
+    ]
+
+    tipo = forms.ChoiceField(
+        choices=[('', 'Todos los tipos')] + Producto.TIPO_PRODUCTO,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    genero = forms.CharField(
+        max_length=50,
+        required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Género'})
+    )
+    orden = forms.ChoiceField(
+        choices=ORDENES,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+
+    def filtros(self):
+        """
+        Devuelve los filtros válidos listos para biblioteca.pagina_biblioteca().
+        """
+        data = self.cleaned_data if self.is_valid() else {}
+        return {
+            'tipo': data.get('tipo') or None,
+            'genero': (data.get('genero') or '').strip() or None,
+            'orden': data.get('orden') or 'recientes',
+        }
+
+
 # =====================================================
 # FORMULARIO DE DEVOLUCIÓN
 # =====================================================
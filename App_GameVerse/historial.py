@@ -0,0 +1,89 @@
+# ================================
+# HISTORIAL Y EXPORTACIÓN DE COMPRAS
+# ================================
+# Paginación por cursor sobre (fecha_compra, id) y exportación en streaming.
+# La exportación recorre las compras con .iterator(chunk_size=...) y escribe
+# cada fila en cuanto se lee, así la memoria no depende del número de compras.
+
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+
+from .models import Compra
+from .paginacion import paginar
+
+TAMANO_PAGINA = 20
+TAMANO_LOTE_EXPORTACION = 2000
+FORMATOS = ('csv', 'jsonl')
+COLUMNAS = ('id', 'fecha_compra', 'usuario', 'metodo_pago', 'estatus', 'total', 'productos')
+
+
+def pagina_compras(usuario, cursor=None, limite=TAMANO_PAGINA):
+    """
+    Una página del historial del usuario, de la compra más reciente a la más antigua.
+    Usa el índice (usuario, fecha_compra, id); las líneas llegan en una consulta extra.
+    """
+    qs = Compra.objects.filter(usuario=usuario).prefetch_related('items')
+    return paginar(qs, 'fecha_compra', descendente=True, cursor=cursor, limite=limite)
+
+
+def _filas(qs):
+    """
+    Genera una fila por compra leyendo la base de datos por lotes.
+    """
+    compras = (
+        qs.select_related('usuario')
+        .only('id', 'fecha_compra', 'metodo_pago', 'estatus', 'total', 'usuario__username')
+        .prefetch_related('items')
+        .order_by('id')
+    )
+    for compra in compras.iterator(chunk_size=TAMANO_LOTE_EXPORTACION):
+        yield {
+            'id': compra.id,
+            'fecha_compra': compra.fecha_compra.isoformat(),
+            'usuario': compra.usuario.username,
+            'metodo_pago': compra.metodo_pago,
+            'estatus': compra.estatus,
+            'total': str(compra.total),
+            'productos': [
+                {'id_producto': item.producto_id, 'nombre': item.nombre, 'precio': str(item.precio)}
+                for item in compra.items.all()
+            ],
+        }
+
+
+class _Eco:
+    """
+    Pseudo-archivo para csv.writer: devuelve la línea en vez de guardarla.
+    """
+    def write(self, valor):
+        return valor
+
+
+def _csv(filas):
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(COLUMNAS)
+    for fila in filas:
+        fila['productos'] = '; '.join(p['nombre'] for p in fila['productos'])
+        yield escritor.writerow([fila[columna] for columna in COLUMNAS])
+
+
+def _jsonl(filas):
+    for fila in filas:
+        yield json.dumps(fila, ensure_ascii=False) + '\n'
+
+
+def exportar(qs, formato, nombre_archivo='compras'):
+    """
+    Respuesta en streaming con las compras de 'qs' en CSV o JSONL.
+    """
+    if formato == 'jsonl':
+        contenido, tipo = _jsonl(_filas(qs)), 'application/x-ndjson; charset=utf-8'
+    else:
+        formato = 'csv'
+        contenido, tipo = _csv(_filas(qs)), 'text/csv; charset=utf-8'
+
+    respuesta = StreamingHttpResponse(contenido, content_type=tipo)
+    respuesta['Content-Disposition'] = f'attachment; filename="{nombre_archivo}.{formato}"'
+    return respuesta
@@ -0,0 +1,132 @@
+# ================================
+# IDEMPOTENCIA DE POSTS
+# ================================
+# Evita que un reintento (doble clic, proxy o balanceador) repita una compra
+# o una recarga de crédito. Cada formulario lleva una clave única; el primer
+# POST con esa clave se ejecuta y su redirección se guarda, y los siguientes
+# POST con la misma clave reciben la misma redirección sin volver a ejecutar la vista.
+#
+# Mientras la vista corre, la clave queda 'Procesando' con un plazo corto
+# (bloqueada_hasta). Si el proceso muere a mitad de la petición, la clave no
+# queda bloqueada hasta que venza su TTL: al vencer el plazo, el siguiente
+# reintento la toma. El plazo debe superar el timeout del servidor de aplicación.
+
+import uuid
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from django.utils import timezone
+
+from .models import ClaveIdempotencia
+
+CAMPO_FORMULARIO = 'clave_idempotencia'     # Campo oculto que envían los formularios
+HEADER = 'HTTP_IDEMPOTENCY_KEY'             # Header "Idempotency-Key" para clientes de API
+TTL_POR_DEFECTO = timedelta(hours=24)
+PLAZO_POR_DEFECTO = timedelta(seconds=60)
+
+
+def nueva_clave():
+    """
+    Genera una clave nueva para incluir en un formulario.
+    """
+    return uuid.uuid4().hex
+
+
+def _ttl():
+    return getattr(settings, 'IDEMPOTENCIA_TTL', TTL_POR_DEFECTO)
+
+
+def _plazo():
+    return getattr(settings, 'IDEMPOTENCIA_PLAZO', PLAZO_POR_DEFECTO)
+
+
+def _clave_de(request):
+    clave = request.POST.get(CAMPO_FORMULARIO) or request.META.get(HEADER) or ''
+    return clave.strip()[:64]
+
+
+def _reproducir(registro):
+    """
+    Reconstruye la respuesta guardada para una clave ya completada.
+    """
+    respuesta = HttpResponse(status=registro.codigo_respuesta)
+    if registro.location:
+        respuesta['Location'] = registro.location
+    respuesta['Idempotent-Replayed'] = 'true'
+    return respuesta
+
+
+def _en_proceso():
+    # Otra petición con la misma clave sigue ejecutándose
+    respuesta = HttpResponse("La solicitud original todavía se está procesando.", status=409)
+    respuesta['Retry-After'] = '1'
+    return respuesta
+
+
+def idempotente(view_func):
+    """
+    Decorador para vistas POST que no deben ejecutarse dos veces con la misma clave.
+    Solo se guardan las redirecciones (la vista terminó su trabajo); cualquier otra
+    respuesta libera la clave para que el usuario corrija el formulario y reintente.
+    Los POST sin clave se ejecutan normalmente.
+    """
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        if request.method != 'POST' or not request.user.is_authenticated:
+            return view_func(request, *args, **kwargs)
+
+        clave = _clave_de(request)
+        if not clave:
+            return view_func(request, *args, **kwargs)
+
+        ahora = timezone.now()
+        try:
+            with transaction.atomic():
+                registro = ClaveIdempotencia.objects.create(
+                    usuario=request.user,
+                    clave=clave,
+                    ruta=request.path[:200],
+                    expira=ahora + _ttl(),
+                    bloqueada_hasta=ahora + _plazo(),
+                )
+        except IntegrityError:
+            registro = ClaveIdempotencia.objects.filter(usuario=request.user, clave=clave).first()
+            if registro is None:
+                return _en_proceso()
+            vigente = registro.expira > ahora
+            if vigente and registro.estado == 'Completada':
+                return _reproducir(registro)
+            if vigente and registro.bloqueada_hasta and registro.bloqueada_hasta > ahora:
+                return _en_proceso()
+            # Clave vencida, o petición abandonada con el plazo vencido: se toma como si fuera nueva.
+            # El UPDATE está condicionado a lo que se leyó, por si otro reintento la tomó primero.
+            reclamada = ClaveIdempotencia.objects.filter(
+                pk=registro.pk, estado=registro.estado, expira=registro.expira,
+                bloqueada_hasta=registro.bloqueada_hasta,
+            ).update(
+                estado='Procesando', codigo_respuesta=None, location='',
+                ruta=request.path[:200], expira=ahora + _ttl(), bloqueada_hasta=ahora + _plazo(),
+            )
+            if not reclamada:
+                return _en_proceso()
+
+        try:
+            respuesta = view_func(request, *args, **kwargs)
+        except Exception:
+            registro.delete()
+            raise
+
+        if 300 <= respuesta.status_code < 400:
+            registro.estado = 'Completada'
+            registro.codigo_respuesta = respuesta.status_code
+            registro.location = respuesta.get('Location', '')[:500]
+            registro.bloqueada_hasta = None
+            registro.save(update_fields=['estado', 'codigo_respuesta', 'location', 'bloqueada_hasta'])
+        else:
+            registro.delete()
+        return respuesta
+
+    return _wrapped
@@ -0,0 +1,173 @@
+# ================================
+# DERIVADOS DE IMÁGENES DE PRODUCTO
+# ================================
+# Genera versiones reducidas (WebP y JPEG) de Producto.imagen en varios anchos
+# dentro de MEDIA_ROOT/derivados/<hash>/, donde <hash> es el SHA-256 del archivo
+# original. Como la ruta depende del contenido, una imagen idéntica nunca se
+# procesa dos veces y las URLs se pueden cachear indefinidamente.
+#
+# Las funciones de trabajo (_generar) solo reciben rutas absolutas y no tocan el
+# ORM, por lo que pueden ejecutarse en un ProcessPoolExecutor sin configurar Django.
+
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import version_catalogo
+from .models import Producto
+from .tareas import tarea
+
+ANCHOS = (320, 640, 960)                 # Anchos generados (px)
+FORMATOS = {                             # extensión → (formato de Pillow, opciones de guardado)
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+CARPETA = 'derivados'
+ORIENTACION_EXIF = 0x0112
+
+
+def anchos():
+    return tuple(getattr(settings, 'IMAGENES_ANCHOS', ANCHOS))
+
+
+def ruta_relativa(huella, ancho, extension):
+    """
+    Ruta (relativa a MEDIA_ROOT) de un derivado.
+    """
+    return f"{CARPETA}/{huella[:2]}/{huella}/{ancho}.{extension}"
+
+
+def url(huella, ancho, extension):
+    return f"{settings.MEDIA_URL}{ruta_relativa(huella, ancho, extension)}"
+
+
+def candidatos(ancho_original):
+    """
+    (ancho del archivo, ancho real) de los derivados que vale la pena anunciar
+    en srcset. Los anchos mayores que el original se generan con el ancho del
+    original (ver _generar), así que de esos solo se anuncia el primero.
+    """
+    por_ancho_real = {}
+    for ancho in anchos():
+        por_ancho_real.setdefault(min(ancho, ancho_original), ancho)
+    return [(archivo, real) for real, archivo in por_ancho_real.items()]
+
+
+def _huella(origen):
+    sha = hashlib.sha256()
+    with open(origen, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(1024 * 1024), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def _guardar(imagen, destino, formato, opciones):
+    # Escritura atómica: nunca se sirve un archivo a medio escribir
+    carpeta = os.path.dirname(destino)
+    os.makedirs(carpeta, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=carpeta, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as archivo:
+            imagen.save(archivo, formato, **opciones)
+        os.replace(temporal, destino)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.unlink(temporal)
+        raise
+
+
+def _ancho_orientado(imagen):
+    # Ancho tal como se muestra: con orientación EXIF de 90° o 270° (5 a 8) se intercambian los lados
+    ancho, alto = imagen.size
+    return alto if imagen.getexif().get(ORIENTACION_EXIF) in (5, 6, 7, 8) else ancho
+
+
+def _generar(origen, raiz_media, lista_anchos, forzar=False):
+    """
+    Genera todos los derivados de 'origen'. Devuelve (huella SHA-256, ancho del original).
+    Se ejecuta en procesos hijos: solo usa rutas y Pillow.
+    """
+    huella = _huella(origen)
+    pendientes = [
+        (ancho, extension)
+        for ancho in lista_anchos
+        for extension in FORMATOS
+        if forzar or not os.path.exists(os.path.join(raiz_media, ruta_relativa(huella, ancho, extension)))
+    ]
+
+    with Image.open(origen) as original:  # Abrir solo lee el encabezado; decodifica al transformarla
+        if not pendientes:
+            return huella, _ancho_orientado(original)
+        original = ImageOps.exif_transpose(original)
+        if original.mode in ('RGBA', 'LA', 'P'):
+            # JPEG no admite transparencia: se compone sobre fondo blanco
+            original = original.convert('RGBA')
+            fondo = Image.new('RGB', original.size, (255, 255, 255))
+            fondo.paste(original, mask=original.getchannel('A'))
+            original = fondo
+        else:
+            original = original.convert('RGB')
+
+        for ancho in sorted({ancho for ancho, _ in pendientes}, reverse=True):
+            # Nunca se amplía: si el original es más angosto se conserva su ancho
+            ancho_real = min(ancho, original.width)
+            alto = max(1, round(original.height * ancho_real / original.width))
+            reducida = original.resize((ancho_real, alto), Image.LANCZOS)
+            for ancho_p, extension in pendientes:
+                if ancho_p == ancho:
+                    formato, opciones = FORMATOS[extension]
+                    destino = os.path.join(raiz_media, ruta_relativa(huella, ancho, extension))
+                    _guardar(reducida, destino, formato, opciones)
+
+        return huella, original.width
+
+
+def procesar_producto(producto, forzar=False):
+    """
+    Genera los derivados de la imagen de un producto y guarda su huella y el
+    ancho del original. El CRUD la ejecuta en segundo plano con generar_derivados_producto.
+    """
+    if not producto.imagen:
+        huella, ancho = '', None
+    else:
+        huella, ancho = _generar(producto.imagen.path, str(settings.MEDIA_ROOT), anchos(), forzar)
+    ahora = timezone.now()
+    Producto.objects.filter(pk=producto.pk).update(imagen_hash=huella, imagen_ancho=ancho, actualizado=ahora)
+    producto.imagen_hash, producto.imagen_ancho, producto.actualizado = huella, ancho, ahora
+    # update() no emite post_save ni aplica auto_now: se avisa a la caché del catálogo a mano
+    version_catalogo.incrementar('producto', producto.pk)
+    return huella
+
+
+@tarea(visibilidad=600, invalida_cache=True)
+def generar_derivados_producto(producto_id):
+    """
+    Tarea que el CRUD encola al guardar la imagen de un producto (ver tareas.py).
+    """
+    producto = Producto.objects.filter(pk=producto_id).only('id', 'imagen').first()
+    if producto is not None:  # Pudo borrarse antes de que el worker llegara a ella
+        procesar_producto(producto)
+
+
+def procesar_en_lote(productos, procesos=None, forzar=False):
+    """
+    Genera los derivados de varios productos en paralelo usando todos los núcleos.
+    'productos' es un iterable de (id, ruta absoluta). Produce (id, (huella, ancho) o excepción).
+    """
+    raiz = str(settings.MEDIA_ROOT)
+    lista_anchos = anchos()
+    with ProcessPoolExecutor(max_workers=procesos or os.cpu_count()) as pool:
+        futuros = {
+            pool.submit(_generar, ruta, raiz, lista_anchos, forzar): producto_id
+            for producto_id, ruta in productos
+        }
+        for futuro in as_completed(futuros):
+            try:
+                yield futuros[futuro], futuro.result()
+            except Exception as error:
+                yield futuros[futuro], error
@@ -0,0 +1,198 @@
+# ================================
+# INSTRUMENTACIÓN POR PETICIÓN
+# ================================
+# InstrumentacionMiddleware mide, en una muestra de las peticiones, cuántas
+# consultas SQL se hicieron y cuánto tardaron, cuánto tardó el render de
+# plantillas, la vista y la petición completa. Lo envía en el encabezado
+# Server-Timing (visible en las herramientas de desarrollo del navegador) y,
+# si la petición supera INSTRUMENTACION_UMBRAL_MS, escribe una línea JSON en el
+# logger 'App_GameVerse.lentas' con las sentencias que más se repitieron: una
+# misma consulta muchas veces en una petición suele ser un N+1.
+#
+# Con INSTRUMENTACION_MUESTREO = 0 el middleware se desactiva al arrancar
+# (MiddlewareNotUsed) y no cuesta nada. El tiempo de plantillas lo aporta el
+# backend PlantillasMedidas (ver TEMPLATES en settings).
+#
+# El middleware funciona en modo síncrono (WSGI) y asíncrono (ASGI): en ASGI no
+# obliga a Django a pasar la petición a un hilo.
+
+import contextvars
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter, defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.template.backends.django import DjangoTemplates, Template
+
+from .basedatos import medir_consultas
+
+logger = logging.getLogger('App_GameVerse.lentas')
+
+UMBRAL_MS = 500             # Por defecto (settings.INSTRUMENTACION_UMBRAL_MS)
+REPETICIONES_N_MAS_1 = 5    # Veces que una sentencia se repite para marcarla como posible N+1
+MAXIMO_REPETIDAS = 5        # Sentencias repetidas que se incluyen en el log
+
+# "IN (%s, %s, %s)" y "IN (%s)" son la misma sentencia con distinto número de parámetros
+_LISTA_PARAMETROS = re.compile(r'\((?:%s, )+%s\)')
+
+_medicion = contextvars.ContextVar('gameverse_medicion', default=None)
+
+
+class Medicion:
+    """
+    Acumuladores de una petición muestreada.
+    """
+
+    def __init__(self):
+        self.consultas = 0
+        self.db = 0.0
+        self.plantillas = 0.0
+        self.sentencias = Counter()
+        self.tiempo_sentencias = defaultdict(float)
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper de Django: se llama en cada consulta de las conexiones envueltas
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            sentencia = _LISTA_PARAMETROS.sub('(%s, ...)', sql)
+            self.consultas += 1
+            self.db += duracion
+            self.sentencias[sentencia] += 1
+            self.tiempo_sentencias[sentencia] += duracion
+
+    def repetidas(self):
+        return [
+            {'sql': sql, 'veces': veces, 'ms': round(self.tiempo_sentencias[sql] * 1000, 2)}
+            for sql, veces in self.sentencias.most_common(MAXIMO_REPETIDAS)
+            if veces > 1
+        ]
+
+
+class _PlantillaMedida(Template):
+
+    def render(self, context=None, request=None):
+        medicion = _medicion.get()
+        if medicion is None:
+            return super().render(context, request)
+        inicio = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            medicion.plantillas += time.perf_counter() - inicio
+
+
+class PlantillasMedidas(DjangoTemplates):
+    """
+    Backend de plantillas de Django que suma el tiempo de render a la medición en curso.
+    """
+
+    def from_string(self, template_code):
+        return _PlantillaMedida(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return _PlantillaMedida(super().get_template(template_name).template, self)
+
+
+def _ms(segundos):
+    return round(segundos * 1000, 2)
+
+
+class InstrumentacionMiddleware:
+    """
+    Server-Timing y log de peticiones lentas para una muestra de las peticiones.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.muestreo = getattr(settings, 'INSTRUMENTACION_MUESTREO', 0)
+        self.umbral = getattr(settings, 'INSTRUMENTACION_UMBRAL_MS', UMBRAL_MS) / 1000
+        if self.muestreo <= 0:
+            raise MiddlewareNotUsed
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+            # Django pasaría un process_view síncrono a un hilo en cada petición
+            self.process_view = self._aprocess_view
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        if not self._muestrear():
+            return self.get_response(request)
+
+        medicion = Medicion()
+        marca = _medicion.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            with medir_consultas(medicion):
+                response = self.get_response(request)
+        finally:
+            _medicion.reset(marca)
+        return self._terminar(request, response, medicion, inicio)
+
+    async def __acall__(self, request):
+        if not self._muestrear():
+            return await self.get_response(request)
+
+        medicion = Medicion()
+        marca = _medicion.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            with medir_consultas(medicion):
+                response = await self.get_response(request)
+        finally:
+            _medicion.reset(marca)
+        return self._terminar(request, response, medicion, inicio)
+
+    def _muestrear(self):
+        return self.muestreo >= 1 or random.random() < self.muestreo
+
+    def _terminar(self, request, response, medicion, inicio):
+        fin = time.perf_counter()
+        total = fin - inicio
+        # Desde process_view hasta aquí: la vista y el render que hace dentro
+        inicio_vista = getattr(request, '_inicio_vista', None)
+        vista = fin - inicio_vista if inicio_vista is not None else 0.0
+
+        response.headers['Server-Timing'] = ', '.join([
+            f'db;dur={_ms(medicion.db)};desc="{medicion.consultas} consultas"',
+            f'tpl;dur={_ms(medicion.plantillas)}',
+            f'view;dur={_ms(vista)}',
+            f'total;dur={_ms(total)}',
+        ])
+        if total >= self.umbral:
+            self._registrar_lenta(request, response, medicion, vista, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._inicio_vista = time.perf_counter()
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        request._inicio_vista = time.perf_counter()
+
+    def _registrar_lenta(self, request, response, medicion, vista, total):
+        repetidas = medicion.repetidas()
+        coincidencia = request.resolver_match
+        logger.warning(json.dumps({
+            'metodo': request.method,
+            'ruta': request.path,
+            'vista': coincidencia.view_name if coincidencia else None,
+            'estado': response.status_code,
+            'total_ms': _ms(total),
+            'vista_ms': _ms(vista),
+            'db_ms': _ms(medicion.db),
+            'consultas': medicion.consultas,
+            'plantillas_ms': _ms(medicion.plantillas),
+            'posible_n_mas_1': any(r['veces'] >= REPETICIONES_N_MAS_1 for r in repetidas),
+            'repetidas': repetidas,
+        }, ensure_ascii=False))
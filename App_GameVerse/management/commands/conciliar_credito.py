@@ -0,0 +1,61 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+
+from App_GameVerse.models import MovimientoCredito, Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Verifica que Usuario.credito coincida con la suma de sus MovimientoCredito. "
+        "Recorre los usuarios por lotes de ID y suma el libro mayor en SQL, "
+        "así la memoria usada no depende del número de movimientos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=2000, help="Usuarios por lote.")
+        parser.add_argument('--corregir', action='store_true',
+                            help="Ajusta el saldo en caché al valor del libro mayor cuando no coinciden.")
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        corregir = options['corregir']
+        ultimo_id = 0
+        revisados = diferencias = 0
+
+        while True:
+            # Paginación por cursor sobre la llave primaria
+            saldos = list(
+                Usuario.objects
+                .filter(id__gt=ultimo_id)
+                .order_by('id')
+                .values_list('id', 'credito')[:lote]
+            )
+            if not saldos:
+                break
+            ultimo_id = saldos[-1][0]
+
+            # Una sola consulta agregada por lote (usa el índice usuario+id)
+            sumas = dict(
+                MovimientoCredito.objects
+                .filter(usuario_id__gte=saldos[0][0], usuario_id__lte=ultimo_id)
+                .values('usuario_id')
+                .annotate(total=Sum('monto'))
+                .values_list('usuario_id', 'total')
+            )
+
+            for usuario_id, credito in saldos:
+                esperado = sumas.get(usuario_id) or Decimal('0.00')
+                revisados += 1
+                if esperado == credito:
+                    continue
+                diferencias += 1
+                self.stdout.write(self.style.WARNING(
+                    f"Usuario {usuario_id}: saldo {credito} / libro mayor {esperado}"
+                ))
+                if corregir:
+                    Usuario.objects.filter(pk=usuario_id).update(credito=esperado)
+
+        estilo = self.style.SUCCESS if not diferencias else self.style.ERROR
+        self.stdout.write(estilo(f"Usuarios revisados: {revisados}. Diferencias: {diferencias}."))
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from App_GameVerse import tareas, version_catalogo
+from App_GameVerse.imagenes import procesar_en_lote
+from App_GameVerse.models import Producto
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera los derivados (WebP/JPEG en varios anchos) de las imágenes de producto "
+        "en paralelo con un pool de procesos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=None, help="Procesos del pool (por defecto, todos los núcleos).")
+        parser.add_argument('--lote', type=int, default=500, help="Productos por lote.")
+        parser.add_argument('--todos', action='store_true', help="Incluye productos que ya tienen derivados.")
+        parser.add_argument('--forzar', action='store_true', help="Regenera archivos aunque ya existan.")
+
+    def handle(self, *args, **options):
+        qs = Producto.objects.exclude(imagen='').exclude(imagen__isnull=True)
+        if not (options['todos'] or options['forzar']):
+            # Los procesados antes de guardar el ancho del original también se completan
+            qs = qs.filter(Q(imagen_hash='') | Q(imagen_ancho__isnull=True))
+
+        ultimo_id = 0
+        generados = errores = 0
+        while True:
+            lote = list(qs.filter(id__gt=ultimo_id).order_by('id').only('id', 'imagen')[:options['lote']])
+            if not lote:
+                break
+            ultimo_id = lote[-1].id
+
+            rutas = []
+            for producto in lote:
+                try:
+                    rutas.append((producto.id, producto.imagen.path))
+                except (NotImplementedError, ValueError):
+                    continue  # Almacenamiento sin ruta local
+
+            resultados = {}
+            for producto_id, resultado in procesar_en_lote(rutas, options['procesos'], options['forzar']):
+                if isinstance(resultado, Exception):
+                    errores += 1
+                    self.stderr.write(f"Producto {producto_id}: {resultado}")
+                else:
+                    resultados[producto_id] = resultado
+
+            ahora = timezone.now()
+            actualizar = [
+                Producto(id=producto_id, imagen_hash=huella, imagen_ancho=ancho, actualizado=ahora)
+                for producto_id, (huella, ancho) in resultados.items()
+            ]
+            Producto.objects.bulk_update(actualizar, ['imagen_hash', 'imagen_ancho', 'actualizado'], batch_size=500)
+            for producto_id in resultados:
+                version_catalogo.incrementar('producto', producto_id)  # bulk_update no emite señales
+            generados += len(actualizar)
+
+        self.stdout.write(self.style.SUCCESS(f"Productos procesados: {generados}. Errores: {errores}."))
+        if generados and not tareas.cache_compartida():
+            # La versión del catálogo se incrementó solo en la caché de este proceso
+            self.stdout.write(self.style.WARNING(
+                "La caché es local de cada proceso: el sitio mostrará las imágenes nuevas "
+                "al vencer CATALOGO_CACHE_TTL o al reiniciarse."
+            ))
@@ -0,0 +1,138 @@
+import asyncio
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _servidor(despliegue, puerto, hilos):
+    """
+    Comando que levanta un solo proceso del despliegue: gunicorn con hilos (WSGI) o uvicorn (ASGI).
+    """
+    if despliegue == 'wsgi':
+        return [
+            sys.executable, '-m', 'gunicorn', 'Backend_GameVerse.wsgi:application',
+            '--bind', f'127.0.0.1:{puerto}', '--workers', '1',
+            '--worker-class', 'gthread', '--threads', str(hilos), '--log-level', 'warning',
+        ]
+    return [
+        sys.executable, '-m', 'uvicorn', 'Backend_GameVerse.asgi:application',
+        '--host', '127.0.0.1', '--port', str(puerto), '--workers', '1', '--log-level', 'warning',
+    ]
+
+
+async def _peticion(lector, escritor, ruta):
+    """
+    Una petición GET por una conexión keep-alive. Devuelve el código de estado.
+    """
+    escritor.write(f'GET {ruta} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+    await escritor.drain()
+    cabecera = await lector.readuntil(b'\r\n\r\n')
+    lineas = cabecera.decode('latin-1').split('\r\n')
+    estado = int(lineas[0].split()[1])
+    encabezados = {k.strip().lower(): v.strip() for k, _, v in (l.partition(':') for l in lineas[1:] if l)}
+    if 'content-length' in encabezados:
+        await lector.readexactly(int(encabezados['content-length']))
+    elif encabezados.get('transfer-encoding') == 'chunked':
+        while True:
+            tamano = int((await lector.readline()).split(b';')[0], 16)
+            await lector.readexactly(tamano + 2)
+            if not tamano:
+                break
+    return estado
+
+
+async def _conexion(puerto, rutas, fin, latencias, errores):
+    lector, escritor = await asyncio.open_connection('127.0.0.1', puerto)
+    i = 0
+    try:
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            try:
+                estado = await _peticion(lector, escritor, rutas[i % len(rutas)])
+            except (OSError, asyncio.IncompleteReadError):
+                # El servidor cerró la conexión: se abre otra
+                errores.append(None)
+                escritor.close()
+                lector, escritor = await asyncio.open_connection('127.0.0.1', puerto)
+                continue
+            latencias.append(time.perf_counter() - inicio)
+            if estado >= 500:
+                errores.append(estado)
+            i += 1
+    finally:
+        escritor.close()
+
+
+async def _carga(puerto, rutas, conexiones, segundos):
+    latencias, errores = [], []
+    fin = time.perf_counter() + segundos
+    await asyncio.gather(*[_conexion(puerto, rutas, fin, latencias, errores) for _ in range(conexiones)])
+    return latencias, errores
+
+
+def _esperar(puerto, proceso, limite=30):
+    fin = time.time() + limite
+    while time.time() < fin:
+        if proceso.poll() is not None:
+            raise CommandError(f"El servidor terminó al arrancar (código {proceso.returncode}).")
+        try:
+            socket.create_connection(('127.0.0.1', puerto), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError("El servidor no respondió a tiempo.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba de carga de las vistas de catálogo desplegadas con WSGI (gunicorn, un proceso con "
+        "hilos) y con ASGI (uvicorn, un proceso): mantiene N conexiones keep-alive concurrentes "
+        "durante unos segundos y reporta peticiones por segundo y latencias. Requiere gunicorn y uvicorn."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--conexiones', type=int, default=64, help="Conexiones concurrentes.")
+        parser.add_argument('--segundos', type=float, default=10, help="Duración de cada medición.")
+        parser.add_argument('--hilos', type=int, default=8, help="Hilos del proceso gunicorn (WSGI).")
+        parser.add_argument('--rutas', default='/,/tienda/', help="Rutas a pedir separadas por coma.")
+        parser.add_argument('--despliegues', default='wsgi,asgi', help="Despliegues a medir separados por coma.")
+
+    def handle(self, *args, **options):
+        rutas = [r.strip() for r in options['rutas'].split(',') if r.strip()]
+        self.stdout.write(f"{'despliegue':<12}{'pet/s':>9}{'ms p50':>9}{'ms p99':>9}{'errores':>9}")
+
+        for despliegue in [d.strip() for d in options['despliegues'].split(',') if d.strip()]:
+            servidor = 'gunicorn' if despliegue == 'wsgi' else 'uvicorn'
+            if shutil.which(servidor) is None:
+                self.stdout.write(self.style.WARNING(f"{despliegue:<12}{servidor} no está instalado"))
+                continue
+
+            puerto = _puerto_libre()
+            proceso = subprocess.Popen(_servidor(despliegue, puerto, options['hilos']))
+            try:
+                _esperar(puerto, proceso)
+                asyncio.run(_carga(puerto, rutas, 1, 1))  # Calentamiento (plantillas, caché, conexiones)
+                latencias, errores = asyncio.run(
+                    _carga(puerto, rutas, options['conexiones'], options['segundos'])
+                )
+            finally:
+                proceso.terminate()
+                proceso.wait()
+
+            latencias.sort()
+            p99 = latencias[int(0.99 * (len(latencias) - 1))] if latencias else 0
+            self.stdout.write(
+                f"{despliegue:<12}{len(latencias) / options['segundos']:>9.1f}"
+                f"{statistics.median(latencias or [0]) * 1000:>9.2f}{p99 * 1000:>9.2f}{len(errores):>9}"
+            )
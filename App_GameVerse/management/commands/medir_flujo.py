@@ -0,0 +1,234 @@
+import datetime
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from App_GameVerse.idempotencia import nueva_clave
+from App_GameVerse.instrumentacion import Medicion
+from App_GameVerse.models import Producto, Proveedor, Usuario
+
+PREFIJO_USUARIO = 'benchmark_flujo_'
+PASOS = ('tienda', 'producto', 'agregar', 'comprar', 'biblioteca')
+PERCENTILES = (50, 95, 99)
+
+
+def _ruta(nombre, *args):
+    return reverse(f'App_GameVerse:{nombre}', args=args)
+
+
+def _cerrar_conexiones():
+    for conexion in connections.all():
+        conexion.close()
+
+
+def _percentil(ordenados, p):
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, round(p / 100 * (len(ordenados) - 1)))]
+
+
+def _sesion(producto):
+    """
+    (paso, método, url, datos, respuesta esperada) de una visita completa: navegar,
+    ver el producto, agregarlo al carrito, pagarlo con crédito y ver la biblioteca.
+    La respuesta esperada es un código de estado o, en los POST, la URL a la que
+    redirigen cuando salen bien (un error también redirige, pero a otro lado).
+    """
+    return [
+        ('tienda', 'get', _ruta('tienda'), None, 200),
+        ('producto', 'get', _ruta('producto_detalle', producto), None, 200),
+        ('agregar', 'post', _ruta('agregar_al_carrito', producto), None, _ruta('carrito_view')),
+        ('comprar', 'post', _ruta('comprar_carrito'), {
+            'metodo_pago': 'Credito', 'telefono': '5555555555', 'direccion': 'Calle 1',
+            'clave_idempotencia': nueva_clave(),
+        }, _ruta('biblioteca')),
+        ('biblioteca', 'get', _ruta('biblioteca'), None, 200),
+    ]
+
+
+def _cliente(usuarios, productos, medidas, errores):
+    """
+    Recorre una sesión por cada (usuario, producto) con su propio Client, midiendo
+    la latencia y las consultas de cada paso.
+    """
+    try:
+        for usuario, producto in zip(usuarios, productos):
+            cliente = Client()
+            cliente.force_login(usuario)
+            for paso, metodo, url, datos, esperado in _sesion(producto):
+                medicion = Medicion()
+                with ExitStack() as pila:
+                    for conexion in connections.all():
+                        pila.enter_context(conexion.execute_wrapper(medicion))
+                    inicio = time.perf_counter()
+                    respuesta = getattr(cliente, metodo)(url, datos)
+                    duracion = time.perf_counter() - inicio
+                medidas[paso].append((duracion, medicion.consultas))
+                obtenido = respuesta.url if respuesta.status_code == 302 else respuesta.status_code
+                if obtenido != esperado:
+                    errores.append(f"{paso} {url}: {obtenido} (se esperaba {esperado})")
+    finally:
+        _cerrar_conexiones()
+
+
+def _resumen(medidas, segundos):
+    pasos = {}
+    for paso in PASOS:
+        latencias = sorted(d for d, _ in medidas[paso])
+        consultas = [c for _, c in medidas[paso]]
+        pasos[paso] = {
+            'peticiones': len(latencias),
+            **{f'p{p}_ms': round(_percentil(latencias, p) * 1000, 2) for p in PERCENTILES},
+            'peticiones_por_segundo': round(len(latencias) / segundos, 1),
+            'consultas_media': round(sum(consultas) / len(consultas), 2) if consultas else 0,
+            'consultas_max': max(consultas, default=0),
+        }
+    return pasos
+
+
+def _regresiones(actual, base, tolerancia):
+    """
+    Pasos más lentos (p95) o con más consultas (máximo) que en la línea base.
+    """
+    encontradas = []
+    for paso, medida in actual.items():
+        anterior = base.get(paso)
+        if anterior is None:
+            continue
+        if medida['p95_ms'] > anterior['p95_ms'] * (1 + tolerancia):
+            encontradas.append(f"{paso}: p95 {anterior['p95_ms']} → {medida['p95_ms']} ms")
+        if medida['consultas_max'] > anterior['consultas_max']:
+            encontradas.append(f"{paso}: consultas {anterior['consultas_max']} → {medida['consultas_max']}")
+    return encontradas
+
+
+class Command(BaseCommand):
+    help = (
+        "Repite sesiones completas de compra (tienda → producto → agregar al carrito → pagar con "
+        "crédito → biblioteca) con el cliente de pruebas de Django sobre las rutas reales y reporta "
+        "p50/p95/p99, peticiones por segundo y consultas por paso. Con --salida guarda el resultado "
+        "en JSON; con --linea-base lo compara con un resultado anterior y termina con error si algún "
+        "paso empeoró. Úsese sobre una copia de la base (GAMEVERSE_DB), idealmente sembrada con seed_gameverse."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sesiones', type=int, default=200, help="Sesiones de compra a medir.")
+        parser.add_argument('--hilos', type=int, default=1, help="Clientes concurrentes.")
+        parser.add_argument('--calentamiento', type=int, default=5, help="Sesiones previas que no se miden.")
+        parser.add_argument('--semilla', type=int, default=42, help="Semilla para elegir los productos.")
+        parser.add_argument('--salida', help="Archivo JSON donde guardar el resultado.")
+        parser.add_argument('--linea-base', help="Archivo JSON de una corrida anterior para comparar.")
+        parser.add_argument(
+            '--tolerancia', type=float, default=0.2,
+            help="Aumento de p95 permitido respecto a la línea base (0.2 = 20%%).",
+        )
+
+    def handle(self, *args, **options):
+        base = None
+        if options['linea_base']:
+            with open(options['linea_base'], encoding='utf-8') as archivo:
+                base = json.load(archivo)
+
+        total = options['calentamiento'] + options['sesiones']
+        productos, proveedor = self._productos(total, options['semilla'])
+        usuarios = [
+            Usuario.objects.create_user(f'{PREFIJO_USUARIO}{i}', credito=Decimal('100000.00'))
+            for i in range(total)
+        ]
+        try:
+            with override_settings(ALLOWED_HOSTS=['*']):
+                calentamiento = options['calentamiento']
+                _cliente(usuarios[:calentamiento], productos[:calentamiento], defaultdict(list), [])
+                medidas, errores, segundos = self._medir(
+                    usuarios[calentamiento:], productos[calentamiento:], options['hilos'],
+                )
+        finally:
+            # Los usuarios arrastran sus compras, biblioteca y movimientos
+            Usuario.objects.filter(username__startswith=PREFIJO_USUARIO).delete()
+            if proveedor is not None:
+                proveedor.delete()
+
+        resultado = {
+            'fecha': timezone.now().isoformat(),
+            'sesiones': options['sesiones'],
+            'hilos': options['hilos'],
+            'segundos': round(segundos, 2),
+            'sesiones_por_segundo': round(options['sesiones'] / segundos, 1),
+            'errores': len(errores),
+            'pasos': _resumen(medidas, segundos),
+        }
+        self._imprimir(resultado, errores)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+
+        if errores:
+            raise CommandError(f"{len(errores)} peticiones no respondieron lo esperado.")
+        if base is not None:
+            if (base['sesiones'], base['hilos']) != (resultado['sesiones'], resultado['hilos']):
+                self.stdout.write(self.style.WARNING(
+                    f"La línea base se midió con {base['sesiones']} sesiones y {base['hilos']} hilos: "
+                    "las latencias no son comparables."
+                ))
+            regresiones = _regresiones(resultado['pasos'], base['pasos'], options['tolerancia'])
+            if regresiones:
+                raise CommandError("Regresiones respecto a la línea base:\n  " + "\n  ".join(regresiones))
+            self.stdout.write(self.style.SUCCESS("Sin regresiones respecto a la línea base."))
+
+    def _productos(self, cantidad, semilla):
+        """
+        Un producto disponible distinto por sesión (así cada compra cobra algo). Si el
+        catálogo no alcanza se crea uno temporal que se borra al terminar.
+        """
+        ids = list(Producto.objects.filter(disponible=True).order_by('id').values_list('id', flat=True))
+        proveedor = None
+        if len(ids) < cantidad:
+            proveedor = Proveedor.objects.create(nombre='Benchmark flujo', tipo='Publisher', pais='MX')
+            ids = [p.pk for p in Producto.objects.bulk_create([
+                Producto(
+                    nombre=f'Benchmark flujo {i}', tipo='Juego', genero='RPG', descripcion='x',
+                    precio=Decimal('100.00'), fecha_lanzamiento=datetime.date(2024, 1, 1), proveedor=proveedor,
+                )
+                for i in range(cantidad)
+            ])]
+        return random.Random(semilla).sample(ids, cantidad), proveedor
+
+    def _medir(self, usuarios, productos, hilos):
+        medidas, errores = defaultdict(list), []
+        clientes = [
+            threading.Thread(target=_cliente, args=(usuarios[i::hilos], productos[i::hilos], medidas, errores))
+            for i in range(hilos)
+        ]
+        inicio = time.perf_counter()
+        for hilo in clientes:
+            hilo.start()
+        for hilo in clientes:
+            hilo.join()
+        return medidas, errores, time.perf_counter() - inicio
+
+    def _imprimir(self, resultado, errores):
+        self.stdout.write(
+            f"{'paso':<12}{'n':>6}{'ms p50':>9}{'ms p95':>9}{'ms p99':>9}{'pet/s':>9}{'consultas':>11}"
+        )
+        for paso, m in resultado['pasos'].items():
+            self.stdout.write(
+                f"{paso:<12}{m['peticiones']:>6}{m['p50_ms']:>9.2f}{m['p95_ms']:>9.2f}{m['p99_ms']:>9.2f}"
+                f"{m['peticiones_por_segundo']:>9.1f}{m['consultas_media']:>7.1f}/{m['consultas_max']:<3}"
+            )
+        self.stdout.write(
+            f"{resultado['sesiones']} sesiones en {resultado['segundos']} s "
+            f"({resultado['sesiones_por_segundo']} sesiones/s), {resultado['errores']} errores"
+        )
+        for error in errores[:10]:
+            self.stdout.write(self.style.WARNING(f"  {error}"))
@@ -0,0 +1,122 @@
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from App_GameVerse.models import Usuario
+
+MOTORES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'cookie': 'django.contrib.sessions.backends.signed_cookies',
+}
+CLAVE = 'benchmark'
+
+
+def _sesion(usuario, rutas, paginas, barrera, resultado):
+    """
+    Un usuario: inicia sesión y recorre las rutas; guarda latencias y consultas a django_session.
+    """
+    consultas = [0]
+
+    def contar(execute, sql, params, many, context):
+        if 'django_session' in sql:
+            consultas[0] += 1
+        return execute(sql, params, many, context)
+
+    cliente = Client()
+    latencias = []
+    errores = 0
+    barrera.wait()
+    try:
+        with connection.execute_wrapper(contar):
+            inicio = time.perf_counter()
+            cliente.login(username=usuario, password=CLAVE)
+            latencias.append(time.perf_counter() - inicio)
+            for i in range(paginas):
+                inicio = time.perf_counter()
+                try:
+                    cliente.get(rutas[i % len(rutas)])
+                except OperationalError:
+                    errores += 1  # SQLite: "database is locked"
+                latencias.append(time.perf_counter() - inicio)
+    finally:
+        connection.close()
+    llave = cliente.cookies.get(settings.SESSION_COOKIE_NAME)
+    resultado.append((latencias, consultas[0], errores, llave.value if llave else None))
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara los motores de sesión (db, cached_db, cache, cookie) con usuarios que inician "
+        "sesión y navegan al mismo tiempo: peticiones por segundo, latencia y consultas a "
+        "django_session por petición. Usa un hash de contraseña rápido para que el costo de la "
+        "sesión no quede oculto por PBKDF2; borra sus usuarios y sesiones al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=8, help="Usuarios (hilos) concurrentes.")
+        parser.add_argument('--paginas', type=int, default=25, help="Páginas que visita cada usuario tras iniciar sesión.")
+        parser.add_argument('--rutas', default='/,/tienda/', help="Rutas a visitar separadas por coma.")
+        parser.add_argument('--motores', default=','.join(MOTORES), help="Motores a comparar separados por coma.")
+
+    def handle(self, *args, **options):
+        rutas = [r.strip() for r in options['rutas'].split(',') if r.strip()]
+        motores = [m.strip() for m in options['motores'].split(',') if m.strip()]
+
+        with override_settings(
+            ALLOWED_HOSTS=['*'],
+            PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+        ):
+            nombres = [f'benchmark_sesion_{i}' for i in range(options['usuarios'])]
+            Usuario.objects.filter(username__in=nombres).delete()
+            for nombre in nombres:
+                Usuario.objects.create_user(nombre, password=CLAVE)
+
+            try:
+                self.stdout.write(
+                    f"{'motor':<11}{'pet/s':>9}{'ms p50':>9}{'ms p95':>9}{'sesión/pet':>12}{'errores':>9}"
+                )
+                for motor in motores:
+                    with override_settings(SESSION_ENGINE=MOTORES[motor]):
+                        self._medir(motor, nombres, rutas, options['paginas'])
+            finally:
+                Usuario.objects.filter(username__in=nombres).delete()
+
+    def _medir(self, motor, nombres, rutas, paginas):
+        caches[settings.SESSION_CACHE_ALIAS].clear()
+        barrera = threading.Barrier(len(nombres) + 1)
+        resultado = []
+        hilos = [
+            threading.Thread(target=_sesion, args=(nombre, rutas, paginas, barrera, resultado))
+            for nombre in nombres
+        ]
+        for hilo in hilos:
+            hilo.start()
+        barrera.wait()
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.join()
+        segundos = time.perf_counter() - inicio
+
+        latencias = sorted(l for lat, _, _, _ in resultado for l in lat)
+        peticiones = len(latencias)
+        consultas = sum(c for _, c, _, _ in resultado)
+        errores = sum(e for _, _, e, _ in resultado)
+        p95 = latencias[int(0.95 * (peticiones - 1))] if peticiones else 0
+
+        self.stdout.write(
+            f"{motor:<11}{peticiones / segundos:>9.1f}{statistics.median(latencias) * 1000:>9.2f}"
+            f"{p95 * 1000:>9.2f}{consultas / peticiones:>12.2f}{errores:>9}"
+        )
+
+        # Las sesiones de 'db' y 'cached_db' quedan en la tabla
+        Session.objects.filter(session_key__in=[llave for *_, llave in resultado if llave]).delete()
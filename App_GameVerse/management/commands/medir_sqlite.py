@@ -0,0 +1,148 @@
+import datetime
+import os
+import subprocess
+import sys
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+from django.test import Client
+from django.test.utils import override_settings
+
+from App_GameVerse.models import CarritoItem, Producto, Proveedor, Usuario
+from App_GameVerse.pagos import procesar_compra
+
+PERFILES = ('simple', 'produccion')
+
+
+def _cerrar_conexiones():
+    for conexion in connections.all():
+        conexion.close()
+
+
+def _comprador(usuario, productos, resultado):
+    """
+    Compra con crédito los productos uno por uno (una transacción por compra).
+    """
+    hechas = bloqueos = 0
+    try:
+        for producto in productos:
+            try:
+                CarritoItem.objects.create(usuario=usuario, producto=producto)
+                procesar_compra(usuario, 'Credito')
+                hechas += 1
+            except OperationalError:
+                bloqueos += 1  # "database is locked"
+                CarritoItem.objects.filter(usuario=usuario).delete()
+    finally:
+        _cerrar_conexiones()
+    resultado.append((hechas, bloqueos))
+
+
+def _lector(rutas, terminado, resultado):
+    """
+    Recorre las rutas de solo lectura mientras haya compras en curso.
+    """
+    cliente = Client()
+    hechas = bloqueos = 0
+    try:
+        while not terminado.is_set():
+            for ruta in rutas:
+                try:
+                    cliente.get(ruta)
+                    hechas += 1
+                except OperationalError:
+                    bloqueos += 1
+    finally:
+        _cerrar_conexiones()
+    resultado.append((hechas, bloqueos))
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el perfil SQLite 'simple' con el de 'produccion' (ver settings): compradores y "
+        "lectores concurrentes, operaciones por segundo y errores 'database is locked'. Cada perfil "
+        "corre en un proceso aparte con GAMEVERSE_SQLITE. Úsese sobre una copia de la base "
+        "(GAMEVERSE_DB): el perfil 'simple' regresa el archivo al journal por defecto antes de medir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--perfil', choices=PERFILES, help="Mide solo este perfil en el proceso actual.")
+        parser.add_argument('--compradores', type=int, default=4, help="Hilos que compran al mismo tiempo.")
+        parser.add_argument('--lectores', type=int, default=4, help="Hilos que navegan la tienda al mismo tiempo.")
+        parser.add_argument('--compras', type=int, default=50, help="Compras por comprador.")
+
+    def handle(self, *args, **options):
+        if options['perfil']:
+            self._medir(options)
+            return
+
+        self.stdout.write(
+            f"{'perfil':<12}{'compras/s':>11}{'lecturas/s':>12}{'bloqueos':>10}{'segundos':>10}"
+        )
+        for perfil in PERFILES:
+            comando = [
+                sys.executable, sys.argv[0], 'medir_sqlite', '--perfil', perfil,
+                '--compradores', str(options['compradores']),
+                '--lectores', str(options['lectores']),
+                '--compras', str(options['compras']),
+            ]
+            salida = subprocess.run(
+                comando, env={**os.environ, 'GAMEVERSE_SQLITE': perfil},
+                capture_output=True, text=True, check=True,
+            )
+            self.stdout.write(salida.stdout.strip())
+
+    def _medir(self, options):
+        perfil = options['perfil']
+        if perfil == 'simple':
+            with connections['default'].cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode = DELETE')
+
+        proveedor = Proveedor.objects.create(nombre='Benchmark SQLite', tipo='Publisher', pais='MX')
+        productos = Producto.objects.bulk_create([
+            Producto(
+                nombre=f'Benchmark SQLite {i}', tipo='Juego', genero='RPG', descripcion='x',
+                precio=Decimal('1.00'), fecha_lanzamiento=datetime.date(2024, 1, 1), proveedor=proveedor,
+            )
+            for i in range(options['compras'])
+        ])
+        usuarios = [
+            Usuario.objects.create(username=f'benchmark_sqlite_{i}', credito=Decimal('100000.00'))
+            for i in range(options['compradores'])
+        ]
+        rutas = ['/tienda/', f'/producto/{productos[0].pk}/', f'/proveedor/{proveedor.pk}/']
+
+        try:
+            with override_settings(ALLOWED_HOSTS=['*']):
+                compras, lecturas = [], []
+                terminado = threading.Event()
+                lectores = [
+                    threading.Thread(target=_lector, args=(rutas, terminado, lecturas))
+                    for _ in range(options['lectores'])
+                ]
+                compradores = [
+                    threading.Thread(target=_comprador, args=(usuario, productos, compras))
+                    for usuario in usuarios
+                ]
+                inicio = time.perf_counter()
+                for hilo in lectores + compradores:
+                    hilo.start()
+                for hilo in compradores:
+                    hilo.join()
+                segundos = time.perf_counter() - inicio
+                terminado.set()
+                for hilo in lectores:
+                    hilo.join()
+        finally:
+            # Usuarios y proveedor arrastran compras, biblioteca, movimientos y productos
+            Usuario.objects.filter(pk__in=[u.pk for u in usuarios]).delete()
+            proveedor.delete()
+
+        bloqueos = sum(b for _, b in compras) + sum(b for _, b in lecturas)
+        self.stdout.write(
+            f"{perfil:<12}{sum(h for h, _ in compras) / segundos:>11.1f}"
+            f"{sum(h for h, _ in lecturas) / segundos:>12.1f}{bloqueos:>10}{segundos:>10.2f}"
+        )
@@ -0,0 +1,92 @@
+import datetime
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from App_GameVerse.models import BibliotecaItem, Producto, Proveedor, Usuario
+
+BACKENDS = {
+    'completo': 'django.contrib.auth.backends.ModelBackend',
+    'ligero': 'App_GameVerse.usuarios.UsuarioLigeroBackend',
+}
+
+
+class _Deshacer(Exception):
+    pass
+
+
+def _bytes_usuario(consultas):
+    """
+    Bytes leídos por los SELECT sobre la tabla de usuarios de una petición.
+    """
+    total = 0
+    with connection.cursor() as cursor:
+        for consulta in consultas:
+            sql = consulta['sql']
+            if sql.startswith('SELECT') and 'FROM "App_GameVerse_usuario"' in sql:
+                cursor.execute(sql)
+                for fila in cursor.fetchall():
+                    total += sum(len(str(valor).encode()) for valor in fila if valor is not None)
+    return total
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide tiempo, consultas y bytes leídos del usuario por petición con el backend de "
+        "autenticación completo y con el ligero, para bibliotecas de distintos tamaños. "
+        "Trabaja dentro de una transacción que se deshace al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanos', default='0,1000,10000', help="Tamaños de biblioteca separados por coma.")
+        parser.add_argument('--peticiones', type=int, default=200, help="Peticiones medidas por combinación.")
+        parser.add_argument('--ruta', default='/', help="Ruta a pedir (por defecto la página de inicio).")
+
+    def handle(self, *args, **options):
+        tamanos = [int(t) for t in options['tamanos'].split(',') if t.strip()]
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=['*']):
+                self._medir(tamanos, options['peticiones'], options['ruta'])
+                raise _Deshacer
+        except _Deshacer:
+            pass
+
+    def _medir(self, tamanos, peticiones, ruta):
+        proveedor = Proveedor.objects.create(nombre='Benchmark', tipo='Publisher', pais='MX')
+        productos = Producto.objects.bulk_create([
+            Producto(
+                nombre=f'Benchmark {i}', tipo='Juego', genero='RPG', descripcion='x', precio=Decimal('1.00'),
+                fecha_lanzamiento=datetime.date(2024, 1, 1), proveedor=proveedor,
+            )
+            for i in range(max(tamanos, default=0))
+        ], batch_size=1000)
+
+        self.stdout.write(f"{'backend':<10}{'biblioteca':>12}{'ms/petición':>14}{'consultas':>11}{'bytes usuario':>15}")
+        for nombre, ruta_backend in BACKENDS.items():
+            with override_settings(AUTHENTICATION_BACKENDS=[ruta_backend]):
+                for tamano in tamanos:
+                    usuario = Usuario.objects.create_user(f'benchmark_{nombre}_{tamano}', password='benchmark')
+                    BibliotecaItem.objects.bulk_create(
+                        [BibliotecaItem(usuario=usuario, producto=p) for p in productos[:tamano]], batch_size=1000,
+                    )
+                    cliente = Client()
+                    cliente.force_login(usuario, backend=ruta_backend)
+                    cliente.get(ruta)  # Calentamiento (plantillas, conexiones)
+
+                    reset_queries()  # El registro de consultas tiene tope; se vacía antes de medir
+                    with CaptureQueriesContext(connection) as capturadas:
+                        cliente.get(ruta)
+                    leidos = _bytes_usuario(capturadas.captured_queries)
+
+                    inicio = time.perf_counter()
+                    for _ in range(peticiones):
+                        cliente.get(ruta)
+                    ms = (time.perf_counter() - inicio) * 1000 / peticiones
+
+                    self.stdout.write(
+                        f"{nombre:<10}{tamano:>12}{ms:>14.2f}{len(capturadas.captured_queries):>11}{leidos:>15}"
+                    )
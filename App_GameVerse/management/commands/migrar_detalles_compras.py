@@ -0,0 +1,75 @@
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from App_GameVerse.models import Compra, CompraItem, Producto
+
+
+class Command(BaseCommand):
+    help = (
+        "Convierte Compra.detalles_productos (JSON) en filas CompraItem. "
+        "Procesa las compras por lotes de ID y omite las que ya tienen líneas, "
+        "por lo que se puede interrumpir y volver a ejecutar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help="Compras por lote.")
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        ultimo_id = 0
+        compras_migradas = lineas_creadas = 0
+
+        while True:
+            compras = list(
+                Compra.objects
+                .filter(id__gt=ultimo_id)
+                .order_by('id')
+                .only('id', 'fecha_compra', 'detalles_productos')[:lote]
+            )
+            if not compras:
+                break
+            ultimo_id = compras[-1].id
+
+            ids = [compra.id for compra in compras]
+            ya_migradas = set(
+                CompraItem.objects.filter(compra_id__in=ids).values_list('compra_id', flat=True).distinct()
+            )
+            pendientes = [c for c in compras if c.id not in ya_migradas and c.detalles_productos]
+
+            # Precios y existencia de los productos del lote en una sola consulta
+            producto_ids = {
+                detalle.get('id_producto')
+                for compra in pendientes for detalle in compra.detalles_productos
+            }
+            precios = dict(Producto.objects.filter(id__in=producto_ids).values_list('id', 'precio'))
+
+            lineas = []
+            for compra in pendientes:
+                for detalle in compra.detalles_productos:
+                    pid = detalle.get('id_producto')
+                    lineas.append(CompraItem(
+                        compra_id=compra.id,
+                        producto_id=pid if pid in precios else None,
+                        nombre=(detalle.get('nombre') or 'Sin nombre')[:100],
+                        precio=self._precio(detalle, precios.get(pid)),
+                        fecha_compra=compra.fecha_compra,
+                    ))
+
+            with transaction.atomic():
+                CompraItem.objects.bulk_create(lineas, batch_size=lote)
+            compras_migradas += len(pendientes)
+            lineas_creadas += len(lineas)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Compras migradas: {compras_migradas}. Líneas creadas: {lineas_creadas}."
+        ))
+
+    @staticmethod
+    def _precio(detalle, precio_actual):
+        # Las compras antiguas no guardaban el precio; se usa el actual del producto como aproximación
+        try:
+            return Decimal(str(detalle['precio']))
+        except (KeyError, InvalidOperation):
+            return precio_actual if precio_actual is not None else Decimal('0.00')
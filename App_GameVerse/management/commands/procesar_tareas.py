@@ -0,0 +1,94 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from App_GameVerse import tareas
+
+
+def _ejecutar(tarea):
+    # Cada hilo del pool usa su propia conexión; se cierra si ya venció CONN_MAX_AGE o quedó rota
+    close_old_connections()
+    try:
+        return tareas.ejecutar(tarea)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker de la cola de tareas (ver App_GameVerse/tareas.py): reclama tareas de la base por "
+        "prioridad y las ejecuta en un pool de hilos. Con --procesos levanta varios workers en "
+        "procesos separados. Termina limpiamente con SIGTERM/SIGINT (no reclama más y espera las en curso)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=4, help="Tareas simultáneas por proceso.")
+        parser.add_argument('--procesos', type=int, default=1, help="Procesos worker (cada uno con --hilos).")
+        parser.add_argument('--espera', type=float, default=1.0, help="Segundos entre consultas si la cola está vacía.")
+        parser.add_argument('--una-vez', action='store_true', help="Vacía la cola disponible y termina.")
+
+    def handle(self, *args, **options):
+        if options['procesos'] > 1:
+            self._supervisar(options)
+            return
+
+        trabajador = f'{socket.gethostname()}:{os.getpid()}'
+        detener = threading.Event()
+        for senal in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(senal, lambda *_: detener.set())
+
+        resultados = []
+        en_curso = set()
+        with ThreadPoolExecutor(max_workers=options['hilos'], thread_name_prefix='tarea') as pool:
+            while not detener.is_set():
+                libres = options['hilos'] - len(en_curso)
+                if libres:
+                    en_curso.update(pool.submit(_ejecutar, tarea) for tarea in tareas.reclamar(trabajador, libres))
+
+                if not en_curso:
+                    if options['una_vez']:
+                        break
+                    detener.wait(options['espera'])
+                    continue
+                # Con hilos libres se vuelve a consultar la cola tras 'espera'; si no, al terminar alguna
+                listas, en_curso = wait(
+                    en_curso, timeout=options['espera'] if len(en_curso) < options['hilos'] else None,
+                    return_when=FIRST_COMPLETED,
+                )
+                resultados.extend(futuro.result() for futuro in listas)
+
+            # Señal recibida: no se reclaman más, pero las reclamadas terminan
+            resultados.extend(futuro.result() for futuro in wait(en_curso).done)
+
+        connections.close_all()
+        self.stdout.write(self.style.SUCCESS(
+            f"{trabajador}: {resultados.count(True)} tareas hechas, {resultados.count(False)} con error."
+        ))
+
+    def _supervisar(self, options):
+        """
+        Levanta --procesos workers de un proceso y les reenvía SIGTERM/SIGINT.
+        """
+        comando = [
+            sys.executable, sys.argv[0], 'procesar_tareas', '--procesos', '1',
+            '--hilos', str(options['hilos']), '--espera', str(options['espera']),
+        ]
+        if options['una_vez']:
+            comando.append('--una-vez')
+        hijos = [subprocess.Popen(comando) for _ in range(options['procesos'])]
+
+        def reenviar(senal, _marco):
+            for hijo in hijos:
+                hijo.send_signal(senal)
+
+        for senal in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(senal, reenviar)
+        for hijo in hijos:
+            hijo.wait()
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from App_GameVerse.models import ClaveIdempotencia
+
+
+class Command(BaseCommand):
+    help = "Elimina por lotes las claves de idempotencia vencidas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=5000, help="Filas a borrar por sentencia.")
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        ahora = timezone.now()
+        total = 0
+
+        while True:
+            # Se borra por lotes de IDs (usa el índice de 'expira') para no retener el bloqueo de escritura
+            ids = list(
+                ClaveIdempotencia.objects
+                .filter(expira__lte=ahora)
+                .values_list('id', flat=True)[:lote]
+            )
+            if not ids:
+                break
+            borradas, _ = ClaveIdempotencia.objects.filter(id__in=ids).delete()
+            total += borradas
+
+        self.stdout.write(self.style.SUCCESS(f"Claves vencidas eliminadas: {total}"))
@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+# Motores que guardan las sesiones en la tabla django_session
+MOTORES_DB = ('django.contrib.sessions.backends.db', 'django.contrib.sessions.backends.cached_db')
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina por lotes las sesiones vencidas de django_session. Pensado para ejecutarse "
+        "periódicamente (cron); a diferencia de 'clearsessions' no borra todo en una sola sentencia."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=2000, help="Sesiones a borrar por sentencia.")
+        parser.add_argument('--pausa', type=float, default=0.05,
+                            help="Segundos de espera entre lotes para dejar pasar a otros escritores.")
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE not in MOTORES_DB:
+            self.stdout.write(f"SESSION_ENGINE = {settings.SESSION_ENGINE}: no hay sesiones en la base de datos.")
+            return
+
+        lote = options['lote']
+        ahora = timezone.now()
+        total = 0
+
+        while True:
+            # Lotes de llaves por el índice de 'expire_date'; cada DELETE es una transacción corta
+            llaves = list(
+                Session.objects
+                .filter(expire_date__lt=ahora)
+                .values_list('session_key', flat=True)[:lote]
+            )
+            if not llaves:
+                break
+            borradas, _ = Session.objects.filter(session_key__in=llaves).delete()
+            total += borradas
+            if len(llaves) == lote and options['pausa']:
+                time.sleep(options['pausa'])
+
+        self.stdout.write(self.style.SUCCESS(f"Sesiones vencidas eliminadas: {total}"))
@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from App_GameVerse.models import Tarea
+
+
+class Command(BaseCommand):
+    help = "Elimina por lotes las tareas terminadas (hechas o fallidas) más antiguas que --dias."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=7, help="Días que se conservan las tareas terminadas.")
+        parser.add_argument('--lote', type=int, default=5000, help="Filas a borrar por sentencia.")
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=options['dias'])
+        total = 0
+
+        while True:
+            # Por lotes de IDs para no retener el bloqueo de escritura mientras el worker reclama
+            ids = list(
+                Tarea.objects
+                .filter(estado__in=('Hecha', 'Fallida'), terminada__lte=limite)
+                .values_list('id', flat=True)[:options['lote']]
+            )
+            if not ids:
+                break
+            borradas, _ = Tarea.objects.filter(id__in=ids).delete()
+            total += borradas
+
+        self.stdout.write(self.style.SUCCESS(f"Tareas terminadas eliminadas: {total}"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from App_GameVerse import busqueda
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de búsqueda de texto completo (FTS5) de los productos."
+
+    def handle(self, *args, **options):
+        if not busqueda.disponible():
+            self.stdout.write("La base de datos no es SQLite: la búsqueda usa el filtro de respaldo.")
+            return
+        with transaction.atomic():
+            total = busqueda.reconstruir()
+        self.stdout.write(self.style.SUCCESS(f"Productos indexados: {total}."))
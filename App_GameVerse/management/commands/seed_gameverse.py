@@ -0,0 +1,224 @@
+import datetime
+import itertools
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from App_GameVerse import version_catalogo
+from App_GameVerse.carrito import TASA_IVA, redondear
+from App_GameVerse.models import (
+    BibliotecaItem, CarritoItem, Compra, CompraItem, MovimientoCredito, Producto, Proveedor, Usuario,
+)
+
+PREFIJO_USUARIO = 'sintetico_'
+PREFIJO_PROVEEDOR = 'Sintético '
+CLAVE = 'sintetico'
+GENEROS = ('Acción', 'Aventura', 'RPG', 'Estrategia', 'Deportes', 'Carreras', 'Puzzle', 'Terror', 'Simulación', 'Shooter')
+PALABRAS = ('Legend', 'Dark', 'Star', 'Quest', 'Racing', 'Kingdom', 'Shadow', 'Pixel', 'Empire', 'Tactics', 'Zero', 'Odyssey')
+TIPOS = ('Juego',) * 8 + ('DLC',) * 3 + ('Membresía',)
+PRECIOS = tuple(Decimal(p) for p in ('99.00', '199.00', '299.00', '499.00', '799.00', '999.00', '1299.00'))
+
+
+def _insertar_filas(modelo, campos, filas):
+    """
+    INSERT con executemany de tuplas ya adaptadas a la base, en el orden de 'campos'.
+    """
+    columnas = [modelo._meta.get_field(campo).column for campo in campos]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(modelo._meta.db_table),
+        ', '.join(connection.ops.quote_name(c) for c in columnas),
+        ', '.join(['%s'] * len(columnas)),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, filas)
+
+
+class _Zipf:
+    """
+    Muestreo de productos con popularidad Zipf: el de rango k sale con peso 1/k^s.
+    El rango de cada producto es una permutación fija por la semilla.
+    """
+
+    def __init__(self, azar, ids, exponente):
+        self.azar = azar
+        self.ids = list(ids)
+        azar.shuffle(self.ids)
+        self.acumulados = list(itertools.accumulate(1 / (k ** exponente) for k in range(1, len(self.ids) + 1)))
+
+    def muestra(self, cantidad):
+        return self.azar.choices(self.ids, cum_weights=self.acumulados, k=cantidad)
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera datos sintéticos deterministas (por --semilla) para pruebas de carga: proveedores, "
+        "productos con popularidad Zipf, usuarios con biblioteca, carrito y saldo, y compras "
+        "históricas con sus líneas. Inserta con bulk_create por lotes dentro de una transacción."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semilla', type=int, default=42, help="Semilla del generador aleatorio.")
+        parser.add_argument('--proveedores', type=int, default=50)
+        parser.add_argument('--productos', type=int, default=5000)
+        parser.add_argument('--usuarios', type=int, default=10000)
+        parser.add_argument('--compras', type=int, default=100000, help="Compras históricas en total.")
+        parser.add_argument('--lineas-max', type=int, default=3, help="Máximo de productos por compra.")
+        parser.add_argument('--carrito-medio', type=float, default=2.0, help="Productos promedio en el carrito de cada usuario.")
+        parser.add_argument('--zipf', type=float, default=1.1, help="Exponente de la distribución de popularidad.")
+        parser.add_argument('--dias', type=int, default=730, help="Días hacia atrás que cubre el historial.")
+        parser.add_argument(
+            '--hasta', type=datetime.date.fromisoformat, default=None,
+            help="Fecha (AAAA-MM-DD) en que termina el historial. Por defecto hoy; fíjela para repetir exactamente los datos.",
+        )
+        parser.add_argument('--lote', type=int, default=5000, help="Filas por bulk_create.")
+
+    def handle(self, *args, **options):
+        if Usuario.objects.filter(username__startswith=PREFIJO_USUARIO).exists():
+            raise CommandError(
+                "La base ya tiene datos sintéticos. Use una base nueva (GAMEVERSE_DB=... manage.py migrate)."
+            )
+
+        self.azar = random.Random(options['semilla'])
+        self.lote = options['lote']
+        hasta = options['hasta'] or timezone.now().date()
+        self.ahora = datetime.datetime.combine(hasta, datetime.time(), tzinfo=datetime.timezone.utc)
+        inicio = time.perf_counter()
+
+        with transaction.atomic():
+            proveedores = self._proveedores(options['proveedores'])
+            productos = self._productos(options['productos'], proveedores)
+            usuarios = self._usuarios(options['usuarios'])
+            zipf = _Zipf(self.azar, productos, options['zipf'])
+            poseidos = self._compras(options, usuarios, productos, zipf)
+            self._carritos(options['carrito_medio'], usuarios, zipf, poseidos)
+
+        # bulk_create no envía post_save: se avisa a las cachés del catálogo una sola vez
+        version_catalogo.incrementar()
+        self.stdout.write(self.style.SUCCESS(f"Datos sintéticos generados en {time.perf_counter() - inicio:.1f} s"))
+
+    def _insertar(self, modelo, filas):
+        total = 0
+        iterador = iter(filas)
+        while lote := list(itertools.islice(iterador, self.lote)):
+            modelo.objects.bulk_create(lote, batch_size=self.lote)
+            total += len(lote)
+        self.stdout.write(f"  {modelo.__name__}: {total}")
+
+    def _proveedores(self, cantidad):
+        self._insertar(Proveedor, (
+            Proveedor(
+                nombre=f'{PREFIJO_PROVEEDOR}{i}', tipo=self.azar.choice(('Desarrollador', 'Publisher')),
+                pais=self.azar.choice(('MX', 'US', 'JP', 'FR', 'PL', 'CA')),
+            )
+            for i in range(cantidad)
+        ))
+        return list(Proveedor.objects.filter(nombre__startswith=PREFIJO_PROVEEDOR).values_list('id', flat=True))
+
+    def _productos(self, cantidad, proveedores):
+        azar = self.azar
+
+        def producto(i):
+            nombre = f'{azar.choice(PALABRAS)} {azar.choice(PALABRAS)} {i}'
+            return Producto(
+                nombre=nombre, tipo=azar.choice(TIPOS), genero=azar.choice(GENEROS),
+                descripcion=f'{nombre}: juego generado para pruebas de carga.',
+                precio=azar.choice(PRECIOS),
+                fecha_lanzamiento=datetime.date(2010, 1, 1) + datetime.timedelta(days=azar.randrange(5500)),
+                proveedor_id=azar.choice(proveedores),
+                calificacion_promedio=Decimal(azar.randrange(100, 500)) / 100,
+            )
+
+        self._insertar(Producto, (producto(i) for i in range(cantidad)))
+        return {
+            pk: (nombre, precio)
+            for pk, nombre, precio in Producto.objects.filter(proveedor_id__in=proveedores).values_list('id', 'nombre', 'precio')
+        }
+
+    def _usuarios(self, cantidad):
+        clave = make_password(CLAVE)  # Un solo hash para todos: PBKDF2 por usuario tardaría minutos
+        self._insertar(Usuario, (
+            Usuario(username=f'{PREFIJO_USUARIO}{i}', password=clave, credito=Decimal(self.azar.randrange(0, 5000)))
+            for i in range(cantidad)
+        ))
+        usuarios = list(
+            Usuario.objects.filter(username__startswith=PREFIJO_USUARIO).values_list('id', 'credito')
+        )
+        # El saldo inicial queda en el libro mayor para que conciliar_credito cuadre
+        self._insertar(MovimientoCredito, (
+            MovimientoCredito(usuario_id=pk, tipo='Recarga', monto=credito) for pk, credito in usuarios if credito
+        ))
+        return [pk for pk, _ in usuarios]
+
+    def _compras(self, options, usuarios, productos, zipf):
+        """
+        Compras en orden cronológico; cada una otorga sus productos a la biblioteca.
+        Devuelve el conjunto de (usuario, producto) ya poseídos.
+
+        Son las tablas grandes (millones de filas), así que se insertan tuplas con
+        executemany en lugar de instancias con bulk_create: construir y compilar un
+        objeto por fila es la mayor parte del tiempo del ORM.
+        """
+        azar = self.azar
+        ops = connection.ops
+        cantidad = options['compras']
+        segundos = options['dias'] * 86400
+        fechas = sorted(azar.randrange(segundos) for _ in range(cantidad))
+        siguiente_id = (Compra.objects.aggregate(m=Max('id'))['m'] or 0) + 1
+        poseidos = set()
+        totales = {'Compra': 0, 'CompraItem': 0, 'BibliotecaItem': 0}
+
+        for desde in range(0, cantidad, self.lote):
+            compras, lineas, biblioteca = [], [], []
+            for atras in fechas[desde:desde + self.lote]:
+                usuario = azar.choice(usuarios)
+                elegidos = {
+                    p for p in zipf.muestra(azar.randint(1, options['lineas_max']))
+                    if (usuario, p) not in poseidos
+                }
+                if not elegidos:
+                    continue  # Ya tenía todo lo que le tocó: se omite la compra
+                fecha = ops.adapt_datetimefield_value(self.ahora - datetime.timedelta(seconds=segundos - atras))
+                subtotal = redondear(sum(productos[p][1] for p in elegidos))
+                # Sin 'Credito': esas compras exigirían cuadrar cargos en el libro mayor
+                compras.append((
+                    siguiente_id, usuario, '[]', ops.adapt_decimalfield_value(subtotal + redondear(subtotal * TASA_IVA)),
+                    azar.choice(('Tarjeta', 'Tarjeta', 'Efectivo')), 'Completada', fecha,
+                ))
+                for p in elegidos:
+                    poseidos.add((usuario, p))
+                    nombre, precio = productos[p]
+                    lineas.append((siguiente_id, p, nombre, ops.adapt_decimalfield_value(precio), fecha))
+                    biblioteca.append((usuario, p, fecha))
+                siguiente_id += 1
+
+            _insertar_filas(Compra, (
+                'id', 'usuario', 'detalles_productos', 'total', 'metodo_pago', 'estatus', 'fecha_compra',
+            ), compras)
+            _insertar_filas(CompraItem, ('compra', 'producto', 'nombre', 'precio', 'fecha_compra'), lineas)
+            _insertar_filas(BibliotecaItem, ('usuario', 'producto', 'fecha_compra'), biblioteca)
+            totales['Compra'] += len(compras)
+            totales['CompraItem'] += len(lineas)
+            totales['BibliotecaItem'] += len(biblioteca)
+
+        for modelo, total in totales.items():
+            self.stdout.write(f"  {modelo}: {total}")
+        return poseidos
+
+    def _carritos(self, medio, usuarios, zipf, poseidos):
+        azar = self.azar
+
+        def items():
+            for usuario in usuarios:
+                # Tamaño geométrico con media cercana a 'medio': la mayoría pocos, algunos muchos
+                tamano = int(azar.expovariate(1 / medio)) if medio > 0 else 0
+                for p in set(zipf.muestra(tamano)) if tamano else ():
+                    if (usuario, p) not in poseidos:
+                        yield CarritoItem(usuario_id=usuario, producto_id=p)
+
+        self._insertar(CarritoItem, items())
@@ -0,0 +1,282 @@
+# ================================
+# MÉTRICAS (FORMATO PROMETHEUS)
+# ================================
+# Registro en memoria de contadores e histogramas: latencia y consultas SQL
+# por ruta (MetricasMiddleware) y eventos de negocio (compras por método de
+# pago, productos agregados al carrito, devoluciones y recargas de crédito).
+# La vista 'metricas' (/metrics/, solo superusuarios) los publica en el
+# formato de texto de Prometheus.
+#
+# Con varios procesos (gunicorn con varios workers) cada uno tiene su propio
+# registro. Si METRICAS_DIR apunta a un directorio compartido, cada proceso
+# escribe ahí su estado como metricas_<pid>_<id>.json (como mucho una vez por
+# segundo y al terminar) y /metrics/ suma todos los archivos. Los de procesos
+# que ya terminaron se siguen sumando, así los contadores no bajan cuando se
+# recicla un worker; el directorio se vacía en cada despliegue.
+#
+# Cada valor es una lista de números que se suma elemento a elemento: [total]
+# en un contador y [conteo por cubeta..., conteo +Inf, suma] en un histograma.
+#
+# MetricasMiddleware funciona en modo síncrono (WSGI) y asíncrono (ASGI), así
+# que con ASGI no obliga a Django a pasar cada petición a un hilo.
+
+import atexit
+import base64
+import binascii
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.core.exceptions import MiddlewareNotUsed
+
+from .basedatos import medir_consultas
+
+CUBETAS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # Segundos
+PUBLICAR_CADA = 1.0         # Segundos mínimos entre dos escrituras del archivo del proceso
+SIN_RUTA = 'sin_ruta'       # Etiqueta de las peticiones que no resolvieron a una ruta (404)
+
+_registro = []
+_candado = threading.Lock()
+
+
+class Contador:
+    """
+    Valor que solo crece, con una serie por combinación de etiquetas.
+    """
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.valores = {}
+        _registro.append(self)
+
+    def incrementar(self, *etiquetas, cantidad=1):
+        with _candado:
+            valor = self.valores.setdefault(etiquetas, [0])
+            valor[0] += cantidad
+
+    def lineas(self, valores):
+        for etiquetas, (total,) in sorted(valores.items()):
+            yield f'{self.nombre}{_etiquetas(self.etiquetas, etiquetas)} {_numero(total)}'
+
+
+class Histograma:
+    """
+    Distribución en cubetas fijas (límites superiores en 'cubetas').
+    """
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), cubetas=CUBETAS_LATENCIA):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.cubetas = cubetas
+        self.valores = {}
+        _registro.append(self)
+
+    def observar(self, valor, *etiquetas):
+        indice = next((i for i, limite in enumerate(self.cubetas) if valor <= limite), len(self.cubetas))
+        with _candado:
+            serie = self.valores.setdefault(etiquetas, [0] * (len(self.cubetas) + 2))
+            serie[indice] += 1
+            serie[-1] += valor
+
+    def lineas(self, valores):
+        nombres = self.etiquetas + ('le',)
+        for etiquetas, serie in sorted(valores.items()):
+            acumulado = 0
+            for limite, conteo in zip(self.cubetas + ('+Inf',), serie[:-1]):
+                acumulado += conteo
+                yield f'{self.nombre}_bucket{_etiquetas(nombres, etiquetas + (_numero(limite),))} {_numero(acumulado)}'
+            yield f'{self.nombre}_sum{_etiquetas(self.etiquetas, etiquetas)} {_numero(serie[-1])}'
+            yield f'{self.nombre}_count{_etiquetas(self.etiquetas, etiquetas)} {_numero(acumulado)}'
+
+
+# ---- Métricas de la tienda ----
+PETICIONES = Histograma('gameverse_peticion_segundos', 'Duración de las peticiones por ruta.', ('vista',))
+CONSULTAS = Contador('gameverse_consultas_db_total', 'Consultas SQL ejecutadas por ruta.', ('vista',))
+COMPRAS = Contador('gameverse_compras_total', 'Compras completadas por método de pago.', ('metodo_pago',))
+CARRITO_AGREGADOS = Contador('gameverse_carrito_agregados_total', 'Productos agregados al carrito.')
+DEVOLUCIONES = Contador('gameverse_devoluciones_total', 'Productos devueltos por método de reembolso.', ('metodo',))
+RECARGAS = Contador('gameverse_recargas_credito_total', 'Recargas de crédito realizadas.')
+RECARGAS_MONTO = Contador('gameverse_recargas_credito_pesos_total', 'Monto total recargado como crédito.')
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _etiquetas(nombres, valores):
+    if not nombres:
+        return ''
+    return '{' + ','.join(f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)) + '}'
+
+
+def _numero(valor):
+    if isinstance(valor, str):
+        return valor
+    valor = float(valor)
+    return str(int(valor)) if valor.is_integer() else repr(valor)
+
+
+# ---- Publicación entre procesos ----
+_proceso = {'archivo': None, 'publicado': 0.0}
+
+
+def _directorio():
+    return getattr(settings, 'METRICAS_DIR', None)
+
+
+def _estado():
+    with _candado:
+        return {m.nombre: [[list(e), list(v)] for e, v in m.valores.items()] for m in _registro}
+
+
+def _reiniciar_en_hijo():
+    # Tras un fork (gunicorn --preload, ProcessPoolExecutor) el hijo empieza de cero con su propio archivo
+    global _candado
+    _candado = threading.Lock()
+    for metrica in _registro:
+        metrica.valores.clear()
+    _proceso.update(archivo=None, publicado=0.0)
+
+
+os.register_at_fork(after_in_child=_reiniciar_en_hijo)
+
+
+def _archivo_del_proceso(directorio):
+    if _proceso['archivo'] is None:
+        _proceso['archivo'] = os.path.join(directorio, f'metricas_{os.getpid()}_{uuid.uuid4().hex[:8]}.json')
+    return _proceso['archivo']
+
+
+def publicar(forzar=False):
+    """
+    Escribe el estado de este proceso en METRICAS_DIR (si está configurado).
+    Sin 'forzar', como mucho una vez cada PUBLICAR_CADA segundos.
+    """
+    directorio = _directorio()
+    if not directorio:
+        return
+    ahora = time.monotonic()
+    if not forzar and ahora - _proceso['publicado'] < PUBLICAR_CADA:
+        return
+    _proceso['publicado'] = ahora
+    archivo = _archivo_del_proceso(directorio)
+    temporal = f'{archivo}.{threading.get_ident()}.tmp'  # Un temporal por hilo: dos hilos pueden publicar a la vez
+    with open(temporal, 'w', encoding='utf-8') as destino:
+        json.dump(_estado(), destino)
+    os.replace(temporal, archivo)  # Quien lee nunca ve un archivo a medio escribir
+
+
+atexit.register(publicar, forzar=True)
+
+
+def _sumar(total, estado):
+    for nombre, series in estado.items():
+        destino = total.setdefault(nombre, {})
+        for etiquetas, valor in series:
+            clave = tuple(etiquetas)
+            anterior = destino.get(clave)
+            destino[clave] = valor if anterior is None else [a + b for a, b in zip(anterior, valor)]
+
+
+def exponer():
+    """
+    Texto en formato Prometheus con las métricas de todos los procesos.
+    """
+    directorio = _directorio()
+    if directorio:
+        publicar(forzar=True)
+        total = {}
+        for ruta in glob.glob(os.path.join(directorio, 'metricas_*.json')):
+            try:
+                with open(ruta, encoding='utf-8') as origen:
+                    _sumar(total, json.load(origen))
+            except (OSError, ValueError):
+                continue  # Archivo borrado o dañado: se omite en esta lectura
+    else:
+        total = {}
+        _sumar(total, _estado())
+
+    lineas = []
+    for metrica in _registro:
+        lineas.append(f'# HELP {metrica.nombre} {metrica.ayuda}')
+        lineas.append(f'# TYPE {metrica.nombre} {metrica.tipo}')
+        lineas.extend(metrica.lineas(total.get(metrica.nombre, {})))
+    return '\n'.join(lineas) + '\n'
+
+
+def superusuario_basic(request):
+    """
+    Superusuario autenticado con HTTP Basic (para el scraper de Prometheus), o None.
+    """
+    tipo, _, credenciales = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    if tipo.lower() != 'basic':
+        return None
+    try:
+        usuario, _, clave = base64.b64decode(credenciales).decode('utf-8').partition(':')
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    encontrado = authenticate(request, username=usuario, password=clave)
+    return encontrado if encontrado is not None and encontrado.is_superuser else None
+
+
+# ---- Latencia y consultas por ruta ----
+class _ContadorConsultas:
+
+    def __init__(self):
+        self.consultas = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.consultas += 1
+        return execute(sql, params, many, context)
+
+
+class MetricasMiddleware:
+    """
+    Registra la duración y las consultas SQL de cada petición bajo el nombre de su ruta.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not getattr(settings, 'METRICAS_ACTIVAS', True):
+            raise MiddlewareNotUsed
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        contador = _ContadorConsultas()
+        inicio = time.perf_counter()
+        with medir_consultas(contador):
+            response = self.get_response(request)
+        return self._registrar(request, response, contador, time.perf_counter() - inicio)
+
+    async def __acall__(self, request):
+        contador = _ContadorConsultas()
+        inicio = time.perf_counter()
+        with medir_consultas(contador):
+            response = await self.get_response(request)
+        return self._registrar(request, response, contador, time.perf_counter() - inicio)
+
+    def _registrar(self, request, response, contador, duracion):
+        # El nombre de la ruta (y no la URL) mantiene acotado el número de series
+        coincidencia = request.resolver_match
+        vista = (coincidencia.url_name if coincidencia else None) or SIN_RUTA
+        PETICIONES.observar(duracion, vista)
+        CONSULTAS.incrementar(vista, cantidad=contador.consultas)
+        publicar()
+        return response
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App_GameVerse', '0003_usuario_credito'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['disponible', 'precio', 'id'], name='producto_disp_precio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['disponible', 'fecha_lanzamiento', 'id'], name='producto_disp_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['disponible', 'calificacion_promedio', 'id'], name='producto_disp_calif_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['disponible', 'tipo', 'id'], name='producto_disp_tipo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['disponible', 'genero', 'id'], name='producto_disp_genero_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['proveedor', 'disponible', 'id'], name='producto_prov_disp_idx'),
+        ),
+    ]
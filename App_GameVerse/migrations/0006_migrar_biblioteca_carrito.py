@@ -0,0 +1,93 @@
+# Migración de datos: mueve las listas JSON de Usuario.biblioteca y Usuario.carrito
+# a las tablas BibliotecaItem y CarritoItem.
+
+from datetime import datetime
+
+from django.db import migrations
+from django.utils import timezone
+
+LOTE = 1000
+FORMATO_FECHA = '%Y-%m-%d %H:%M'   # Formato con el que las vistas guardaban 'fecha_compra'
+
+
+def _parsear_fecha(valor):
+    try:
+        return timezone.make_aware(datetime.strptime(valor, FORMATO_FECHA))
+    except (TypeError, ValueError):
+        return timezone.now()
+
+
+def json_a_tablas(apps, schema_editor):
+    Usuario = apps.get_model('App_GameVerse', 'Usuario')
+    Producto = apps.get_model('App_GameVerse', 'Producto')
+    BibliotecaItem = apps.get_model('App_GameVerse', 'BibliotecaItem')
+    CarritoItem = apps.get_model('App_GameVerse', 'CarritoItem')
+
+    existentes = set(Producto.objects.values_list('id', flat=True))
+    biblioteca, carrito = [], []
+
+    for usuario in Usuario.objects.only('id', 'biblioteca', 'carrito').iterator(chunk_size=LOTE):
+        vistos = set()
+        for entrada in usuario.biblioteca or []:
+            pid = entrada.get('id_producto')
+            # Se omiten productos eliminados y duplicados de la lista JSON
+            if pid in existentes and pid not in vistos:
+                vistos.add(pid)
+                biblioteca.append(BibliotecaItem(
+                    usuario_id=usuario.id,
+                    producto_id=pid,
+                    fecha_compra=_parsear_fecha(entrada.get('fecha_compra')),
+                ))
+
+        en_carrito = set()
+        for entrada in usuario.carrito or []:
+            pid = entrada.get('id_producto')
+            if pid in existentes and pid not in en_carrito and pid not in vistos:
+                en_carrito.add(pid)
+                carrito.append(CarritoItem(usuario_id=usuario.id, producto_id=pid))
+
+        if len(biblioteca) >= LOTE:
+            BibliotecaItem.objects.bulk_create(biblioteca, ignore_conflicts=True)
+            biblioteca = []
+        if len(carrito) >= LOTE:
+            CarritoItem.objects.bulk_create(carrito, ignore_conflicts=True)
+            carrito = []
+
+    BibliotecaItem.objects.bulk_create(biblioteca, ignore_conflicts=True)
+    CarritoItem.objects.bulk_create(carrito, ignore_conflicts=True)
+
+
+def tablas_a_json(apps, schema_editor):
+    Usuario = apps.get_model('App_GameVerse', 'Usuario')
+    BibliotecaItem = apps.get_model('App_GameVerse', 'BibliotecaItem')
+    CarritoItem = apps.get_model('App_GameVerse', 'CarritoItem')
+
+    for usuario in Usuario.objects.only('id').iterator(chunk_size=LOTE):
+        usuario.biblioteca = [
+            {
+                'id_producto': item.producto_id,
+                'nombre': item.producto.nombre,
+                'fecha_compra': timezone.localtime(item.fecha_compra).strftime(FORMATO_FECHA),
+            }
+            for item in BibliotecaItem.objects.filter(usuario_id=usuario.id).select_related('producto').order_by('id')
+        ]
+        usuario.carrito = [
+            {
+                'id_producto': item.producto_id,
+                'nombre': item.producto.nombre,
+                'precio': float(item.producto.precio),
+            }
+            for item in CarritoItem.objects.filter(usuario_id=usuario.id).select_related('producto').order_by('id')
+        ]
+        usuario.save(update_fields=['biblioteca', 'carrito'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App_GameVerse', '0005_bibliotecaitem_carritoitem'),
+    ]
+
+    operations = [
+        migrations.RunPython(json_a_tablas, tablas_a_json),
+    ]
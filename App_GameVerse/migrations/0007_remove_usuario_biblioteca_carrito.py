@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:44
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App_GameVerse', '0006_migrar_biblioteca_carrito'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='usuario',
+            name='biblioteca',
+        ),
+        migrations.RemoveField(
+            model_name='usuario',
+            name='carrito',
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App_GameVerse', '0008_claveidempotencia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientoCredito',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('Recarga', 'Recarga'), ('Compra', 'Compra'), ('Reembolso', 'Reembolso'), ('Ajuste', 'Ajuste')], max_length=20)),
+                ('monto', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+                ('compra', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movimientos_credito', to='App_GameVerse.compra')),
+                ('producto', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='App_GameVerse.producto')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movimientos_credito', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['usuario', 'id'], name='movcredito_usuario_idx')],
+            },
+        ),
+    ]
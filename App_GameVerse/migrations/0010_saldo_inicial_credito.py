@@ -0,0 +1,35 @@
+# Migración de datos: registra el crédito existente como movimiento "Ajuste"
+# para que el libro mayor cuadre con Usuario.credito desde el inicio.
+
+from django.db import migrations
+
+LOTE = 1000
+
+
+def registrar_saldos(apps, schema_editor):
+    Usuario = apps.get_model('App_GameVerse', 'Usuario')
+    MovimientoCredito = apps.get_model('App_GameVerse', 'MovimientoCredito')
+
+    movimientos = []
+    for usuario in Usuario.objects.exclude(credito=0).only('id', 'credito').iterator(chunk_size=LOTE):
+        movimientos.append(MovimientoCredito(usuario_id=usuario.id, tipo='Ajuste', monto=usuario.credito))
+        if len(movimientos) >= LOTE:
+            MovimientoCredito.objects.bulk_create(movimientos)
+            movimientos = []
+    MovimientoCredito.objects.bulk_create(movimientos)
+
+
+def borrar_saldos(apps, schema_editor):
+    MovimientoCredito = apps.get_model('App_GameVerse', 'MovimientoCredito')
+    MovimientoCredito.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App_GameVerse', '0009_movimientocredito'),
+    ]
+
+    operations = [
+        migrations.RunPython(registrar_saldos, borrar_saldos),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App_GameVerse', '0010_saldo_inicial_credito'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='compra',
+            name='detalles_productos',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.CreateModel(
+            name='CompraItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100)),
+                ('precio', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('fecha_compra', models.DateTimeField()),
+                ('compra', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='App_GameVerse.compra')),
+                ('producto', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ventas', to='App_GameVerse.producto')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['producto', 'fecha_compra'], name='compraitem_producto_fecha_idx'), models.Index(fields=['fecha_compra'], name='compraitem_fecha_idx')],
+            },
+        ),
+    ]
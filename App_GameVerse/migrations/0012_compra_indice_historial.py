@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App_GameVerse', '0011_compraitem'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='compra',
+            index=models.Index(fields=['usuario', 'fecha_compra', 'id'], name='compra_usuario_fecha_idx'),
+        ),
+    ]
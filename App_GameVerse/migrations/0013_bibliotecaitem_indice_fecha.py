@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App_GameVerse', '0012_compra_indice_historial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bibliotecaitem',
+            index=models.Index(fields=['usuario', 'fecha_compra', 'id'], name='biblioteca_usuario_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Índice de búsqueda de texto completo (SQLite FTS5) sobre Producto.
+# La tabla virtual se mantiene sincronizada con triggers, así que también
+# cubre bulk_create(), update() y cambios hechos fuera del ORM.
+# Los índices de prefijo (2 y 3 caracteres) aceleran las búsquedas "palabra*".
+# En otros motores la migración no hace nada y busqueda.py usa un filtro LIKE.
+
+from django.db import migrations
+
+TABLA = 'App_GameVerse_producto_fts'
+
+CREAR = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA} USING fts5(
+        nombre, descripcion, genero, proveedor,
+        tokenize = "unicode61 remove_diacritics 2",
+        prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS producto_fts_insert AFTER INSERT ON App_GameVerse_producto BEGIN
+        INSERT INTO {TABLA}(rowid, nombre, descripcion, genero, proveedor)
+        VALUES (new.id, new.nombre, new.descripcion, new.genero,
+                (SELECT nombre FROM App_GameVerse_proveedor WHERE id = new.proveedor_id));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS producto_fts_update
+    AFTER UPDATE OF nombre, descripcion, genero, proveedor_id ON App_GameVerse_producto BEGIN
+        DELETE FROM {TABLA} WHERE rowid = old.id;
+        INSERT INTO {TABLA}(rowid, nombre, descripcion, genero, proveedor)
+        VALUES (new.id, new.nombre, new.descripcion, new.genero,
+                (SELECT nombre FROM App_GameVerse_proveedor WHERE id = new.proveedor_id));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS producto_fts_delete AFTER DELETE ON App_GameVerse_producto BEGIN
+        DELETE FROM {TABLA} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS proveedor_fts_update AFTER UPDATE OF nombre ON App_GameVerse_proveedor BEGIN
+        UPDATE {TABLA} SET proveedor = new.nombre
+        WHERE rowid IN (SELECT id FROM App_GameVerse_producto WHERE proveedor_id = new.id);
+    END
+    """,
+    f"""
+    INSERT INTO {TABLA}(rowid, nombre, descripcion, genero, proveedor)
+    SELECT p.id, p.nombre, p.descripcion, p.genero, v.nombre
+    FROM App_GameVerse_producto p JOIN App_GameVerse_proveedor v ON v.id = p.proveedor_id
+    """,
+]
+
+BORRAR = [
+    "DROP TRIGGER IF EXISTS proveedor_fts_update",
+    "DROP TRIGGER IF EXISTS producto_fts_delete",
+    "DROP TRIGGER IF EXISTS producto_fts_update",
+    "DROP TRIGGER IF EXISTS producto_fts_insert",
+    f"DROP TABLE IF EXISTS {TABLA}",
+]
+
+
+def _ejecutar(sentencias):
+    def operacion(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in sentencias:
+            schema_editor.execute(sql)
+    return operacion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App_GameVerse', '0014_producto_imagen_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(_ejecutar(CREAR), _ejecutar(BORRAR)),
+    ]
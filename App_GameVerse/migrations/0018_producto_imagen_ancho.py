@@ -0,0 +1,71 @@
+# Agrega Producto.imagen_ancho (ancho real de los derivados en srcset).
+
+from django.db import migrations, models
+
+# Como en 0016: si SQLite reconstruye la tabla se pierden los triggers del índice
+# FTS5. El SQL va copiado aquí (no se importa de busqueda.py) para que la
+# migración produzca siempre el mismo esquema.
+TABLA = 'App_GameVerse_producto_fts'
+
+CREAR_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS producto_fts_insert AFTER INSERT ON App_GameVerse_producto BEGIN
+        INSERT INTO {TABLA}(rowid, nombre, descripcion, genero, proveedor)
+        VALUES (new.id, new.nombre, new.descripcion, new.genero,
+                (SELECT nombre FROM App_GameVerse_proveedor WHERE id = new.proveedor_id));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS producto_fts_update
+    AFTER UPDATE OF nombre, descripcion, genero, proveedor_id ON App_GameVerse_producto BEGIN
+        DELETE FROM {TABLA} WHERE rowid = old.id;
+        INSERT INTO {TABLA}(rowid, nombre, descripcion, genero, proveedor)
+        VALUES (new.id, new.nombre, new.descripcion, new.genero,
+                (SELECT nombre FROM App_GameVerse_proveedor WHERE id = new.proveedor_id));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS producto_fts_delete AFTER DELETE ON App_GameVerse_producto BEGIN
+        DELETE FROM {TABLA} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS proveedor_fts_update AFTER UPDATE OF nombre ON App_GameVerse_proveedor BEGIN
+        UPDATE {TABLA} SET proveedor = new.nombre
+        WHERE rowid IN (SELECT id FROM App_GameVerse_producto WHERE proveedor_id = new.id);
+    END
+    """,
+]
+
+QUITAR_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS proveedor_fts_update",
+    "DROP TRIGGER IF EXISTS producto_fts_delete",
+    "DROP TRIGGER IF EXISTS producto_fts_update",
+    "DROP TRIGGER IF EXISTS producto_fts_insert",
+]
+
+
+def _ejecutar(sentencias):
+    def operacion(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in sentencias:
+            schema_editor.execute(sql)
+    return operacion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App_GameVerse', '0017_tarea'),
+    ]
+
+    operations = [
+        migrations.RunPython(_ejecutar(QUITAR_TRIGGERS), _ejecutar(CREAR_TRIGGERS)),
+        migrations.AddField(
+            model_name='producto',
+            name='imagen_ancho',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(_ejecutar(CREAR_TRIGGERS), _ejecutar(QUITAR_TRIGGERS)),
+    ]
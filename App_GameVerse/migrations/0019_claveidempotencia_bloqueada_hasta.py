@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('App_GameVerse', '0018_producto_imagen_ancho'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='claveidempotencia',
+            name='bloqueada_hasta',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
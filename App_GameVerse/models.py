@@ -1,6 +1,7 @@
 from django.db import models                  # Importa las herramientas para definir modelos de Django
 from django.contrib.auth.models import AbstractUser  # Permite extender el modelo de usuario base
 from django.core.validators import MinValueValidator  # Validador para asegurar mínimos en campos numéricos
+from django.utils import timezone             # Fecha/hora actual con zona horaria
 from decimal import Decimal                   # Permite manejar cantidades monetarias con precisión
 
 # ==========================
@@ -18,6 +19,7 @@ class Proveedor(models.Model):                # Modelo que representa un proveed
     sitio_web = models.URLField(max_length=200, blank=True, null=True)  # Página web opcional del proveedor
     descripcion = models.TextField(blank=True, null=True)              # Información adicional opcional
     estatus = models.BooleanField(default=True)     # Indica si el proveedor está activo
+    actualizado = models.DateTimeField(auto_now=True)  # Última modificación (Last-Modified/ETag de su página)
 
     def __str__(self):                              # Representación legible del objeto
         return self.nombre
@@ -49,6 +51,21 @@ class Producto(models.Model):                # Modelo que representa videojuegos
     )
     disponible = models.BooleanField(default=True)   # Indica si está visible para venta
     imagen = models.ImageField(upload_to='productos/', blank=True, null=True)  # Imagen del producto
+    imagen_hash = models.CharField(max_length=64, blank=True, editable=False)  # SHA-256 de la imagen; ubica sus derivados (imagenes.py)
+    imagen_ancho = models.PositiveIntegerField(null=True, blank=True, editable=False)  # Ancho del original: los derivados no lo superan
+    actualizado = models.DateTimeField(auto_now=True)  # Última modificación (Last-Modified/ETag del detalle)
+
+    class Meta:
+        # Índices compuestos para los filtros y órdenes del catálogo (ver catalogo.py).
+        # Todos terminan en 'id' para soportar la paginación por cursor sin ordenar en memoria.
+        indexes = [
+            models.Index(fields=['disponible', 'precio', 'id'], name='producto_disp_precio_idx'),
+            models.Index(fields=['disponible', 'fecha_lanzamiento', 'id'], name='producto_disp_fecha_idx'),
+            models.Index(fields=['disponible', 'calificacion_promedio', 'id'], name='producto_disp_calif_idx'),
+            models.Index(fields=['disponible', 'tipo', 'id'], name='producto_disp_tipo_idx'),
+            models.Index(fields=['disponible', 'genero', 'id'], name='producto_disp_genero_idx'),
+            models.Index(fields=['proveedor', 'disponible', 'id'], name='producto_prov_disp_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -71,8 +88,6 @@ class Usuario(AbstractUser):                        # Extiende el modelo de usua
         choices=ESTATUS_CHOICES,
         default='Activo'
     )
-    biblioteca = models.JSONField(default=list, blank=True)  # Lista JSON de productos comprados
-    carrito = models.JSONField(default=list, blank=True)     # Lista JSON del carrito de compras
     credito = models.DecimalField(                          # Dinero disponible para usar
         max_digits=10,
         decimal_places=2,
@@ -84,6 +99,61 @@ class Usuario(AbstractUser):                        # Extiende el modelo de usua
         return self.username                              # Representa el usuario por su nombre de cuenta
 
 
+# ==========================
+#  MODELO: BIBLIOTECA
+# ==========================
+class BibliotecaItem(models.Model):                      # Producto que el usuario ya posee
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.CASCADE,
+        related_name='items_biblioteca'
+    )
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.CASCADE,
+        related_name='en_bibliotecas'
+    )
+    fecha_compra = models.DateTimeField(default=timezone.now)  # Momento en que se adquirió
+
+    class Meta:
+        constraints = [
+            # Un producto solo puede estar una vez en la biblioteca; también sirve de índice de búsqueda
+            models.UniqueConstraint(fields=['usuario', 'producto'], name='biblioteca_usuario_producto_uniq'),
+        ]
+        indexes = [
+            # Biblioteca paginada por fecha de compra: WHERE usuario = ? ORDER BY fecha_compra, id
+            models.Index(fields=['usuario', 'fecha_compra', 'id'], name='biblioteca_usuario_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} → {self.producto_id}"
+
+
+# ==========================
+#  MODELO: CARRITO
+# ==========================
+class CarritoItem(models.Model):                         # Producto agregado al carrito del usuario
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.CASCADE,
+        related_name='items_carrito'
+    )
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.CASCADE,
+        related_name='en_carritos'
+    )
+    agregado = models.DateTimeField(auto_now_add=True)   # Momento en que se agregó al carrito
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'producto'], name='carrito_usuario_producto_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} → {self.producto_id}"
+
+
 # ==========================
 #  MODELO: COMPRA
 # ==========================
@@ -101,7 +171,7 @@ class Compra(models.Model):                              # Modelo que registra u
         on_delete=models.CASCADE,
         related_name='compras'
     )
-    detalles_productos = models.JSONField(default=list)  # Lista de productos incluidos en la compra
+    detalles_productos = models.JSONField(default=list, blank=True)  # Formato anterior; las líneas ahora viven en CompraItem
     total = models.DecimalField(max_digits=10, decimal_places=2, default=0)  # Total pagado
     metodo_pago = models.CharField(max_length=20, choices=METODOS_PAGO)  # Método utilizado
     estatus = models.CharField(                          # Estatus de la compra
@@ -111,5 +181,149 @@ class Compra(models.Model):                              # Modelo que registra u
     )
     fecha_compra = models.DateTimeField(auto_now_add=True)  # Fecha y hora automática al crearse
 
+    class Meta:
+        indexes = [
+            # Historial paginado por cursor: WHERE usuario = ? ORDER BY fecha_compra DESC, id DESC
+            models.Index(fields=['usuario', 'fecha_compra', 'id'], name='compra_usuario_fecha_idx'),
+        ]
+
     def __str__(self):
         return f"Compra #{self.id} - {self.usuario.username}"  # Representación legible
+
+
+# ==========================
+#  MODELO: LÍNEA DE COMPRA
+# ==========================
+class CompraItem(models.Model):                          # Producto incluido en una compra y el precio pagado
+    compra = models.ForeignKey(
+        Compra,
+        on_delete=models.CASCADE,
+        related_name='items'
+    )
+    producto = models.ForeignKey(                        # Se conserva la línea aunque el producto se elimine
+        Producto,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='ventas'
+    )
+    nombre = models.CharField(max_length=100)            # Nombre del producto al momento de la compra
+    precio = models.DecimalField(max_digits=10, decimal_places=2)  # Precio pagado (sin IVA)
+    fecha_compra = models.DateTimeField()                # Copia de Compra.fecha_compra para agregar por fecha sin JOIN
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['producto', 'fecha_compra'], name='compraitem_producto_fecha_idx'),
+            models.Index(fields=['fecha_compra'], name='compraitem_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre} (${self.precio})"
+
+
+# ==========================
+#  MODELO: MOVIMIENTO DE CRÉDITO
+# ==========================
+class MovimientoCredito(models.Model):                   # Libro mayor (solo inserciones) del crédito del usuario
+    TIPOS = [
+        ('Recarga', 'Recarga'),
+        ('Compra', 'Compra'),
+        ('Reembolso', 'Reembolso'),
+        ('Ajuste', 'Ajuste'),
+    ]
+
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.CASCADE,
+        related_name='movimientos_credito'
+    )
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    monto = models.DecimalField(max_digits=12, decimal_places=2)  # Positivo abona, negativo descuenta
+    compra = models.ForeignKey(                           # Compra que originó el movimiento (si aplica)
+        Compra,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='movimientos_credito'
+    )
+    producto = models.ForeignKey(                         # Producto reembolsado (si aplica)
+        Producto,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    fecha = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Historial por usuario y conciliación agrupada por usuario
+            models.Index(fields=['usuario', 'id'], name='movcredito_usuario_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} {self.monto} ({self.usuario_id})"
+
+
+# ==========================
+#  MODELO: CLAVE DE IDEMPOTENCIA
+# ==========================
+class ClaveIdempotencia(models.Model):                   # Registro de un POST ya procesado (ver idempotencia.py)
+    ESTADOS = [
+        ('Procesando', 'Procesando'),
+        ('Completada', 'Completada'),
+    ]
+
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.CASCADE,
+        related_name='claves_idempotencia'
+    )
+    clave = models.CharField(max_length=64)              # Valor enviado por el formulario o el header Idempotency-Key
+    ruta = models.CharField(max_length=200)              # Ruta del POST original
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='Procesando')
+    codigo_respuesta = models.PositiveSmallIntegerField(null=True, blank=True)  # Status HTTP guardado
+    location = models.CharField(max_length=500, blank=True)                     # Destino si fue una redirección
+    expira = models.DateTimeField(db_index=True)         # Después de esta fecha la clave se puede purgar
+    bloqueada_hasta = models.DateTimeField(null=True, blank=True)  # Plazo de la petición en curso; vencido, un reintento la toma
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'clave'], name='idempotencia_usuario_clave_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.clave} ({self.estado})"
+
+
+# ==========================
+#  MODELO: TAREA EN SEGUNDO PLANO
+# ==========================
+class Tarea(models.Model):                               # Trabajo pendiente para el worker (ver tareas.py)
+    ESTADOS = [
+        ('Pendiente', 'Pendiente'),
+        ('EnCurso', 'En curso'),
+        ('Hecha', 'Hecha'),
+        ('Fallida', 'Fallida'),
+    ]
+
+    funcion = models.CharField(max_length=200)           # Ruta importable de la función marcada con @tarea
+    argumentos = models.JSONField(default=dict)          # {'args': [...], 'kwargs': {...}}
+    prioridad = models.SmallIntegerField(default=0)      # Mayor prioridad se ejecuta antes
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='Pendiente')
+    intentos = models.PositiveSmallIntegerField(default=0)      # Veces que se ha reclamado
+    max_intentos = models.PositiveSmallIntegerField(default=5)
+    visibilidad = models.PositiveIntegerField(default=300)      # Segundos que un worker la retiene antes de que otro la reclame
+    disponible = models.DateTimeField(default=timezone.now)     # No se reclama antes; en curso, fin del plazo de visibilidad
+    trabajador = models.CharField(max_length=100, blank=True)   # Último worker que la reclamó
+    error = models.TextField(blank=True)                 # Traceback del último intento fallido
+    creada = models.DateTimeField(auto_now_add=True)
+    terminada = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Cola: WHERE estado IN (Pendiente, EnCurso) AND disponible <= ahora ORDER BY prioridad DESC
+            models.Index(fields=['estado', 'disponible'], name='tarea_estado_disponible_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.funcion} ({self.estado}, intento {self.intentos})"
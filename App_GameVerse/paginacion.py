@@ -0,0 +1,125 @@
+# ================================
+# PAGINACIÓN POR CURSOR (KEYSET)
+# ================================
+# En lugar de OFFSET, cada página continúa a partir de la última fila vista
+# (valor del campo de orden + id como desempate), por lo que el costo de una
+# página no crece con su posición. Los cursores van firmados para que el
+# cliente no los pueda alterar.
+#
+# El cursor 'anterior' apunta a la primera fila de la página y lleva la
+# dirección hacia atrás: se consulta con el orden invertido y se da vuelta
+# el resultado, con el mismo costo que avanzar.
+
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+_SAL_CURSOR = 'App_GameVerse.paginacion.cursor'
+
+
+class Pagina:
+    """
+    Resultado paginado: 'productos' es la lista de la página, 'siguiente'
+    el cursor de la próxima (o None si es la última) y 'anterior' el de la
+    previa (o None si es la primera).
+    """
+
+    def __init__(self, productos, siguiente, anterior=None):
+        self.productos = productos
+        self.siguiente = siguiente
+        self.anterior = anterior
+
+    def __iter__(self):
+        return iter(self.productos)
+
+    def __len__(self):
+        return len(self.productos)
+
+
+def _codificar(etiqueta, campo, fila, atras=False):
+    valor = getattr(fila, campo)
+    datos = {'o': etiqueta, 'v': None if valor is None else str(valor), 'id': fila.pk}
+    if atras:
+        datos['a'] = 1
+    return signing.dumps(datos, salt=_SAL_CURSOR, compress=True)
+
+
+def _decodificar(modelo, etiqueta, campo, cursor):
+    """
+    Devuelve (valor, id, atras) del cursor, o None si es inválido o pertenece a otro orden.
+    """
+    if not cursor:
+        return None
+    try:
+        datos = signing.loads(cursor, salt=_SAL_CURSOR)
+    except signing.BadSignature:
+        return None
+    if not isinstance(datos, dict) or datos.get('o') != etiqueta:
+        return None
+    try:
+        valor = modelo._meta.get_field(campo).to_python(datos['v'])
+        ultimo_id = int(datos['id'])
+    except (KeyError, TypeError, ValueError, ValidationError):
+        return None
+    return valor, ultimo_id, bool(datos.get('a'))
+
+
+def _ordenar(qs, campo, descendente, cursor):
+    """
+    (qs filtrado a partir del cursor y ordenado por (campo, id), etiqueta del
+    orden, posición del cursor o None, si se recorre hacia atrás).
+    """
+    etiqueta = f"{qs.model._meta.label_lower}:{'-' if descendente else ''}{campo}"
+    posicion = _decodificar(qs.model, etiqueta, campo, cursor)
+    atras = posicion is not None and posicion[2]
+    # Hacia atrás se recorre en el orden contrario y _pagina da vuelta las filas
+    invertido = descendente != atras
+    op = 'lt' if invertido else 'gt'
+    prefijo = '-' if invertido else ''
+
+    if posicion is not None:
+        valor, ultimo_id, _ = posicion
+        if campo == 'id':
+            qs = qs.filter(**{f'id__{op}': ultimo_id})
+        else:
+            qs = qs.filter(Q(**{f'{campo}__{op}': valor}) | Q(**{campo: valor, f'id__{op}': ultimo_id}))
+
+    orden = [f'{prefijo}id'] if campo == 'id' else [f'{prefijo}{campo}', f'{prefijo}id']
+    return qs.order_by(*orden), etiqueta, posicion, atras
+
+
+def _pagina(filas, limite, etiqueta, campo, posicion, atras):
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+    if atras:
+        filas.reverse()
+    if not filas:
+        return Pagina(filas, None)
+    # Si se llegó con un cursor, del otro lado quedan las filas de donde se venía
+    if atras:
+        hay_siguiente, hay_anterior = True, hay_mas
+    else:
+        hay_siguiente, hay_anterior = hay_mas, posicion is not None
+    return Pagina(
+        filas,
+        _codificar(etiqueta, campo, filas[-1]) if hay_siguiente else None,
+        _codificar(etiqueta, campo, filas[0], atras=True) if hay_anterior else None,
+    )
+
+
+def paginar(qs, campo='id', descendente=False, cursor=None, limite=20):
+    """
+    Ejecuta una página de 'qs' ordenada por (campo, id) con un solo SELECT.
+    Se pide una fila extra para saber si existe una página siguiente.
+    """
+    qs, etiqueta, posicion, atras = _ordenar(qs, campo, descendente, cursor)
+    return _pagina(list(qs[:limite + 1]), limite, etiqueta, campo, posicion, atras)
+
+
+async def apaginar(qs, campo='id', descendente=False, cursor=None, limite=20):
+    """
+    paginar() con el ORM asíncrono, para vistas async.
+    """
+    qs, etiqueta, posicion, atras = _ordenar(qs, campo, descendente, cursor)
+    filas = [fila async for fila in qs[:limite + 1]]
+    return _pagina(filas, limite, etiqueta, campo, posicion, atras)
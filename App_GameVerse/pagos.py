@@ -0,0 +1,113 @@
+# ================================
+# MOTOR DE COMPRA (CHECKOUT)
+# ================================
+# Punto único para cobrar el carrito, sin importar el método de pago.
+# Todo ocurre dentro de una transacción y con un número fijo de sentencias SQL:
+#
+#   1. Bloquea la fila del usuario (SELECT ... FOR UPDATE donde el motor lo soporta).
+#   2. Resuelve el carrito y los productos que ya posee (2 SELECT).
+#   3. "Reclama" el carrito borrándolo; si otra petición ya lo reclamó, se aborta.
+#   4. Inserta la Compra, sus líneas (CompraItem) y otorga la biblioteca con bulk INSERT.
+#   5. Si se paga con crédito, lo descuenta con un UPDATE condicional (credito >= total)
+#      y registra el MovimientoCredito (ver saldo.py).
+
+from functools import partial
+
+from django.db import transaction
+
+from . import metricas, saldo
+from .carrito import ResumenCarrito, resolver_carrito
+from .models import BibliotecaItem, CarritoItem, Compra, CompraItem, Usuario
+
+METODOS_CON_CREDITO = ('Credito',)   # Métodos que descuentan Usuario.credito
+
+
+class ErrorCompra(Exception):
+    """
+    Error de negocio al procesar una compra. El mensaje se muestra al usuario.
+    """
+    mensaje = "No se pudo completar la compra."
+
+    def __init__(self, mensaje=None):
+        super().__init__(mensaje or self.mensaje)
+
+
+class CarritoVacio(ErrorCompra):
+    mensaje = "Tu carrito está vacío."
+
+
+class NadaQueComprar(ErrorCompra):
+    mensaje = "Todos los productos del carrito ya están en tu biblioteca."
+
+
+class CreditoInsuficiente(ErrorCompra):
+    mensaje = "No tienes suficiente crédito para realizar esta compra."
+
+
+class CarritoModificado(ErrorCompra):
+    mensaje = "Tu carrito cambió mientras se procesaba el pago. Inténtalo de nuevo."
+
+
+def procesar_compra(usuario, metodo_pago):
+    """
+    Cobra el carrito de 'usuario' con 'metodo_pago' y devuelve la Compra creada.
+    Lanza una subclase de ErrorCompra si no se puede completar; en ese caso
+    la transacción se revierte y no queda ningún cambio.
+    """
+    with transaction.atomic():
+        # 1. Serializa las compras concurrentes de la misma cuenta
+        Usuario.objects.select_for_update().only('id').get(pk=usuario.pk)
+
+        # 2. Carrito cotizado y productos que ya posee
+        carrito = resolver_carrito(usuario)
+        if not carrito:
+            raise CarritoVacio()
+
+        ya_en_biblioteca = set(
+            BibliotecaItem.objects
+            .filter(usuario_id=usuario.pk, producto_id__in=carrito.ids)
+            .values_list('producto_id', flat=True)
+        )
+        nuevas = [linea for linea in carrito if linea.id_producto not in ya_en_biblioteca]
+        if not nuevas:
+            raise NadaQueComprar()
+
+        # 3. Reclama el carrito: si otra petición ya lo procesó, las filas ya no existen
+        borradas, _ = CarritoItem.objects.filter(usuario_id=usuario.pk, producto_id__in=carrito.ids).delete()
+        if borradas != len(carrito):
+            raise CarritoModificado()
+
+        # Solo se cobra lo que realmente se otorga
+        cobro = ResumenCarrito(nuevas, [])
+
+        # 4. Registro de la compra y entrega de los productos
+        compra = Compra.objects.create(
+            usuario=usuario,
+            total=cobro.total,
+            metodo_pago=metodo_pago,
+            estatus="Completada"
+        )
+        CompraItem.objects.bulk_create([
+            CompraItem(
+                compra=compra,
+                producto_id=linea.id_producto,
+                nombre=linea.producto.nombre,
+                precio=linea.precio,
+                fecha_compra=compra.fecha_compra,
+            )
+            for linea in nuevas
+        ])
+        BibliotecaItem.objects.bulk_create(
+            [BibliotecaItem(usuario_id=usuario.pk, producto_id=linea.id_producto) for linea in nuevas],
+            ignore_conflicts=True,
+        )
+
+        # 5. Descuento atómico en la base de datos; si no alcanza se revierte todo lo anterior
+        if metodo_pago in METODOS_CON_CREDITO:
+            if saldo.cargar(usuario, cobro.total, 'Compra', compra=compra) is None:
+                raise CreditoInsuficiente()
+
+        # Se cuenta solo si la transacción (o la que la contiene) se confirma
+        transaction.on_commit(partial(metricas.COMPRAS.incrementar, metodo_pago))
+
+    return compra
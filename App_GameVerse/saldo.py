@@ -0,0 +1,61 @@
+# ================================
+# SALDO DE CRÉDITO
+# ================================
+# Toda modificación de Usuario.credito pasa por aquí: se inserta un
+# MovimientoCredito y se actualiza el saldo en caché con un UPDATE atómico
+# (credito = credito + monto) en la misma transacción. Nunca se hace
+# lectura-modificación-escritura en Python ni usuario.save() completo.
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import MovimientoCredito, Usuario
+from .tareas import tarea
+
+
+def _registrar(usuario, tipo, monto, minimo=None, **referencias):
+    # Sin savepoint: si el UPDATE no afecta filas, todavía no se escribió nada
+    with transaction.atomic(savepoint=False):
+        filas = Usuario.objects.filter(pk=usuario.pk)
+        if minimo is not None:
+            filas = filas.filter(credito__gte=minimo)
+        if not filas.update(credito=F('credito') + monto):
+            return None
+        movimiento = MovimientoCredito.objects.create(usuario_id=usuario.pk, tipo=tipo, monto=monto, **referencias)
+
+    # Mantiene coherente el objeto en memoria (p. ej. el crédito del navbar)
+    usuario.credito = Decimal(usuario.credito) + monto
+    return movimiento
+
+
+def abonar(usuario, monto, tipo, **referencias):
+    """
+    Suma 'monto' al crédito del usuario y devuelve el movimiento registrado.
+    'referencias' acepta compra= o producto= para ligar el movimiento.
+    """
+    monto = Decimal(monto)
+    if monto <= 0:
+        raise ValueError("El monto a abonar debe ser positivo.")
+    return _registrar(usuario, tipo, monto, **referencias)
+
+
+def cargar(usuario, monto, tipo, **referencias):
+    """
+    Descuenta 'monto' solo si el saldo alcanza. Devuelve el movimiento,
+    o None si el crédito es insuficiente (en ese caso no se modifica nada).
+    """
+    monto = Decimal(monto)
+    if monto <= 0:
+        raise ValueError("El monto a cargar debe ser positivo.")
+    return _registrar(usuario, tipo, -monto, minimo=monto, **referencias)
+
+
+@tarea(prioridad=10, transaccional=True)
+def reembolsar(usuario_id, producto_id, monto):
+    """
+    Abona el reembolso de una devolución. La vista solo quita el producto de la
+    biblioteca y encola esta tarea en la misma transacción (ver tareas.py).
+    """
+    abonar(Usuario(pk=usuario_id), monto, 'Reembolso', producto_id=producto_id)
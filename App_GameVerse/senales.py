@@ -0,0 +1,27 @@
+# ================================
+# SEÑALES DEL CATÁLOGO
+# ================================
+# Cada alta, cambio o baja de Producto/Proveedor incrementa la versión del
+# catálogo una vez confirmada la transacción, para que quien reconstruya a
+# partir de ella lea ya los datos nuevos.
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import version_catalogo
+from .models import Producto, Proveedor
+
+
+def _registrar_cambio(tipo, pk):
+    transaction.on_commit(lambda: version_catalogo.incrementar(tipo, pk))
+
+
+@receiver([post_save, post_delete], sender=Producto, dispatch_uid='catalogo_producto')
+def producto_cambiado(sender, instance, **kwargs):
+    _registrar_cambio('producto', instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Proveedor, dispatch_uid='catalogo_proveedor')
+def proveedor_cambiado(sender, instance, **kwargs):
+    _registrar_cambio('proveedor', instance.pk)
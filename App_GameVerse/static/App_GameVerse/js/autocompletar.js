@@ -0,0 +1,38 @@
+// 🔹 Sugerencias de búsqueda del navbar: pide /autocompletar/ mientras se escribe
+// y llena el <datalist> asociado al campo. Espera una pausa corta entre teclas
+// para no enviar una petición por cada una.
+(function () {
+    var campo = document.querySelector('[data-autocompletar]');
+    if (!campo) {
+        return;
+    }
+    var lista = document.getElementById(campo.getAttribute('list'));
+    var url = campo.getAttribute('data-autocompletar');
+    var espera = null;
+    var ultimo = '';
+
+    campo.addEventListener('input', function () {
+        clearTimeout(espera);
+        espera = setTimeout(function () {
+            var texto = campo.value.trim();
+            if (!texto || texto === ultimo) {
+                return;
+            }
+            ultimo = texto;
+            fetch(url + '?q=' + encodeURIComponent(texto))
+                .then(function (respuesta) { return respuesta.json(); })
+                .then(function (datos) {
+                    if (texto !== ultimo) {
+                        return;  // Llegó tarde: el usuario ya escribió otra cosa
+                    }
+                    lista.innerHTML = '';
+                    datos.resultados.forEach(function (resultado) {
+                        var opcion = document.createElement('option');
+                        opcion.value = resultado.nombre;
+                        lista.appendChild(opcion);
+                    });
+                })
+                .catch(function () { /* Sin sugerencias si falla la red */ });
+        }, 150);
+    });
+})();
@@ -0,0 +1,183 @@
+# ================================
+# TAREAS EN SEGUNDO PLANO
+# ================================
+# Cola guardada en la propia base de datos (modelo Tarea), sin servicios
+# externos. Una vista encola con funcion.encolar(...) dentro de su transacción:
+# si la transacción se revierte, la tarea tampoco existe. El worker
+# ('manage.py procesar_tareas') reclama tareas y las ejecuta en un pool de hilos.
+#
+#   - Prioridad: se reclaman primero las de mayor 'prioridad'.
+#   - Plazo de visibilidad: al reclamarla, 'disponible' pasa a ahora + visibilidad.
+#     Si el worker muere, al vencer el plazo otro worker la vuelve a reclamar.
+#   - Reintentos: si falla, vuelve a 'Pendiente' con espera exponencial
+#     (RETRASO_BASE · 2^(intento-1), con variación aleatoria) hasta max_intentos;
+#     después queda 'Fallida' con el traceback en 'error'.
+#   - Cada cambio de estado es un UPDATE condicionado a 'intentos': si otro
+#     worker ya la reclamó de nuevo, el anterior no puede marcarla.
+#
+# Las tareas transaccionales ejecutan la función y la marcan como hecha en la
+# misma transacción, así su efecto en la base ocurre exactamente una vez. Las
+# demás (p. ej. generar imágenes) deben poder repetirse sin daño.
+#
+# Las tareas con invalida_cache=True avisan a la caché del catálogo. Si esa
+# caché es LocMemCache (una por proceso), el worker solo invalidaría la suya y
+# los procesos web seguirían sirviendo páginas viejas; en ese caso encolar()
+# no crea la Tarea y ejecuta la función en el propio proceso al confirmar.
+
+import random
+import traceback
+from datetime import timedelta
+from functools import partial
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Tarea
+
+ACTIVAS = ('Pendiente', 'EnCurso')
+RETRASO_BASE = 5              # Segundos antes del primer reintento
+RETRASO_MAXIMO = 60 * 60      # Tope de la espera entre reintentos
+LARGO_ERROR = 5000            # Caracteres del traceback que se guardan
+
+
+class PlazoVencido(Exception):
+    """
+    Otro worker reclamó la tarea mientras se ejecutaba: su resultado se descarta.
+    """
+
+
+def tarea(intentos=5, prioridad=0, visibilidad=300, transaccional=False, invalida_cache=False):
+    """
+    Marca una función de nivel de módulo como tarea y le agrega .encolar().
+    Sus argumentos deben poder guardarse como JSON.
+    """
+    def decorador(funcion):
+        funcion.opciones_tarea = {
+            'max_intentos': intentos, 'prioridad': prioridad,
+            'visibilidad': visibilidad, 'transaccional': transaccional,
+            'invalida_cache': invalida_cache,
+        }
+        funcion.encolar = partial(encolar, funcion)
+        return funcion
+    return decorador
+
+
+def encolar(funcion, *args, **kwargs):
+    """
+    Crea la Tarea que ejecutará funcion(*args, **kwargs). 'demora' (segundos)
+    y 'prioridad' no se pasan a la función: ajustan cuándo y en qué orden corre.
+    Devuelve None si la tarea se ejecutará en este proceso (ver cache_compartida).
+    """
+    opciones = funcion.opciones_tarea
+    demora = kwargs.pop('demora', 0)
+    prioridad = kwargs.pop('prioridad', opciones['prioridad'])
+    if opciones['invalida_cache'] and not cache_compartida():
+        # robust: si falla se registra en el log, sin romper la petición que ya guardó sus cambios
+        transaction.on_commit(partial(funcion, *args, **kwargs), robust=True)
+        return None
+    return Tarea.objects.create(
+        funcion=f'{funcion.__module__}.{funcion.__qualname__}',
+        argumentos={'args': list(args), 'kwargs': kwargs},
+        prioridad=prioridad,
+        max_intentos=opciones['max_intentos'],
+        visibilidad=opciones['visibilidad'],
+        disponible=timezone.now() + timedelta(seconds=demora),
+    )
+
+
+def cache_compartida():
+    """
+    True si los procesos web y el worker ven la misma caché por defecto.
+    """
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def retraso(intento):
+    """
+    Segundos de espera antes de reintentar tras el intento número 'intento'.
+    """
+    return min(RETRASO_MAXIMO, RETRASO_BASE * 2 ** (intento - 1)) * random.uniform(0.5, 1.0)
+
+
+def reclamar(trabajador, cantidad):
+    """
+    Toma hasta 'cantidad' tareas disponibles (las de mayor prioridad primero)
+    y las marca 'EnCurso' durante su plazo de visibilidad.
+    """
+    ahora = timezone.now()
+    candidatas = (
+        Tarea.objects
+        .filter(estado__in=ACTIVAS, disponible__lte=ahora)
+        .order_by('-prioridad', 'disponible', 'id')
+        .values_list('id', 'intentos', 'max_intentos', 'visibilidad')[:cantidad]
+    )
+    reclamadas = []
+    for pk, intentos, max_intentos, visibilidad in candidatas:
+        filas = Tarea.objects.filter(pk=pk, estado__in=ACTIVAS, intentos=intentos)
+        if intentos >= max_intentos:
+            # El último intento venció su plazo sin terminar (el worker murió)
+            filas.update(estado='Fallida', terminada=ahora, error="Venció el plazo de visibilidad del último intento.")
+            continue
+        if filas.update(
+            estado='EnCurso', intentos=intentos + 1, trabajador=trabajador[:100],
+            disponible=ahora + timedelta(seconds=visibilidad),
+        ):
+            reclamadas.append(pk)
+    tareas = Tarea.objects.in_bulk(reclamadas)
+    return [tareas[pk] for pk in reclamadas]
+
+
+def _marcar_hecha(tarea):
+    return Tarea.objects.filter(pk=tarea.pk, estado='EnCurso', intentos=tarea.intentos).update(
+        estado='Hecha', terminada=timezone.now(), error='',
+    )
+
+
+def _marcar_fallo(tarea, error):
+    ahora = timezone.now()
+    filas = Tarea.objects.filter(pk=tarea.pk, estado='EnCurso', intentos=tarea.intentos)
+    if tarea.intentos >= tarea.max_intentos:
+        return filas.update(estado='Fallida', terminada=ahora, error=error[-LARGO_ERROR:])
+    return filas.update(
+        estado='Pendiente', error=error[-LARGO_ERROR:],
+        disponible=ahora + timedelta(seconds=retraso(tarea.intentos)),
+    )
+
+
+def ejecutar(tarea):
+    """
+    Ejecuta una tarea ya reclamada y registra el resultado. Devuelve True si terminó bien.
+    """
+    try:
+        funcion = import_string(tarea.funcion)
+        args, kwargs = tarea.argumentos.get('args', []), tarea.argumentos.get('kwargs', {})
+        if funcion.opciones_tarea['transaccional']:
+            with transaction.atomic():
+                funcion(*args, **kwargs)
+                if not _marcar_hecha(tarea):
+                    raise PlazoVencido()
+        else:
+            funcion(*args, **kwargs)
+            _marcar_hecha(tarea)
+    except PlazoVencido:
+        return False
+    except Exception:
+        _marcar_fallo(tarea, traceback.format_exc())
+        return False
+    return True
+
+
+def procesar_pendientes(trabajador='local', lote=10):
+    """
+    Ejecuta en este hilo las tareas disponibles hasta vaciar la cola.
+    Devuelve cuántas se ejecutaron (útil en pruebas y en 'procesar_tareas --una-vez').
+    """
+    total = 0
+    while tareas := reclamar(trabajador, lote):
+        for pendiente in tareas:
+            ejecutar(pendiente)
+            total += 1
+    return total
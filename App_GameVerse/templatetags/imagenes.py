@@ -0,0 +1,42 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from App_GameVerse import imagenes
+
+register = template.Library()
+
+
+@register.simple_tag
+def imagen_producto(producto, sizes='(max-width: 768px) 100vw, 33vw', clase='card-img-top'):
+    """
+    Imagen responsiva de un producto: <picture> con srcset WebP y JPEG de los
+    derivados generados, anunciados con su ancho real (un original angosto no
+    se amplía). Si aún no hay derivados, usa la imagen original.
+    Uso: {% imagen_producto producto sizes="25vw" clase="img-fluid" %}
+    """
+    if not producto.imagen:
+        return ''
+
+    huella = getattr(producto, 'imagen_hash', '')
+    ancho_original = getattr(producto, 'imagen_ancho', None)
+    if not huella or not ancho_original:
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" loading="lazy">',
+            producto.imagen.url, clase, producto.nombre,
+        )
+
+    candidatos = imagenes.candidatos(ancho_original)
+
+    def srcset(extension):
+        return format_html_join(', ', '{} {}w', (
+            (imagenes.url(huella, archivo, extension), real) for archivo, real in candidatos
+        ))
+
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" class="{}" alt="{}" loading="lazy" decoding="async">'
+        '</picture>',
+        srcset('webp'), sizes,
+        imagenes.url(huella, candidatos[len(candidatos) // 2][0], 'jpg'), srcset('jpg'), sizes, clase, producto.nombre,
+    )
@@ -1,3 +1,1022 @@
-from django.test import TestCase
+import base64
+import datetime
+import json
+import os
+import tempfile
+import threading
+from contextlib import ExitStack
+from decimal import Decimal
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import BACKEND_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.models import Session
+from django.core import signing
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections, transaction
+from django.db.models import QuerySet
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import autocompletar, basedatos, busqueda, catalogo, imagenes, metricas, saldo, tareas, usuarios, version_catalogo
+from .instrumentacion import Medicion
+from .models import (
+    BibliotecaItem, CarritoItem, ClaveIdempotencia, Compra, CompraItem, MovimientoCredito, Producto, Proveedor, Tarea,
+    Usuario,
+)
+from .pagos import CreditoInsuficiente, ErrorCompra, procesar_compra
+from .paginacion import paginar
+from .templatetags.imagenes import imagen_producto
+from .urls import urlpatterns
+from .usuarios import UsuarioLigeroBackend
+
+
+def crear_catalogo(cantidad, precio=Decimal('100.00')):
+    proveedor = Proveedor.objects.create(nombre='Proveedor', tipo='Publisher', pais='MX')
+    return [
+        Producto.objects.create(
+            nombre=f'Juego {i}', tipo='Juego', genero='RPG', descripcion='Descripción',
+            precio=precio, fecha_lanzamiento=datetime.date(2024, 1, 1), proveedor=proveedor,
+        )
+        for i in range(cantidad)
+    ]
+
+
+# ==========================
+#  MOTOR DE COMPRA
+# ==========================
+class ProcesarCompraTests(TestCase):
+
+    def setUp(self):
+        self.productos = crear_catalogo(3)
+        self.usuario = Usuario.objects.create_user('jugador', password='clave1234', credito=Decimal('1000.00'))
+        CarritoItem.objects.bulk_create([CarritoItem(usuario=self.usuario, producto=p) for p in self.productos])
+
+    def test_compra_con_credito_descuenta_y_otorga(self):
+        compra = procesar_compra(self.usuario, 'Credito')
+
+        self.usuario.refresh_from_db()
+        self.assertEqual(compra.total, Decimal('348.00'))           # 300 + 16% IVA
+        self.assertEqual(self.usuario.credito, Decimal('652.00'))
+        self.assertEqual(BibliotecaItem.objects.filter(usuario=self.usuario).count(), 3)
+        self.assertEqual(compra.items.count(), 3)
+        self.assertFalse(CarritoItem.objects.filter(usuario=self.usuario).exists())
+
+    def test_credito_insuficiente_no_deja_cambios(self):
+        Usuario.objects.filter(pk=self.usuario.pk).update(credito=Decimal('10.00'))
+
+        with self.assertRaises(CreditoInsuficiente):
+            procesar_compra(self.usuario, 'Credito')
+
+        self.assertEqual(Compra.objects.count(), 0)
+        self.assertEqual(CarritoItem.objects.filter(usuario=self.usuario).count(), 3)
+
+    def test_numero_fijo_de_consultas(self):
+        CarritoItem.objects.bulk_create([
+            CarritoItem(usuario=self.usuario, producto=p) for p in crear_catalogo(20, Decimal('1.00'))
+        ])
+        # SAVEPOINT/RELEASE + bloqueo, carrito, biblioteca, DELETE, Compra, líneas, biblioteca, UPDATE, movimiento
+        with self.assertNumQueries(11):
+            procesar_compra(self.usuario, 'Credito')
+
+
+class CompraConcurrenteTests(TransactionTestCase):
+    """
+    Dispara compras en paralelo contra la misma cuenta: solo una debe cobrarse.
+    """
+    HILOS = 8
+
+    def test_compras_paralelas_no_duplican_cobro(self):
+        productos = crear_catalogo(5)
+        usuario = Usuario.objects.create_user('concurrente', password='clave1234', credito=Decimal('5000.00'))
+        CarritoItem.objects.bulk_create([CarritoItem(usuario=usuario, producto=p) for p in productos])
+
+        barrera = threading.Barrier(self.HILOS)
+        resultados = []
+
+        def comprar():
+            try:
+                barrera.wait()
+                procesar_compra(Usuario.objects.get(pk=usuario.pk), 'Credito')
+                resultados.append('ok')
+            except (ErrorCompra, OperationalError) as error:
+                # SQLite puede rechazar al escritor concurrente ("database is locked")
+                resultados.append(type(error).__name__)
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=comprar) for _ in range(self.HILOS)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        usuario.refresh_from_db()
+        self.assertEqual(resultados.count('ok'), 1, resultados)
+        self.assertEqual(Compra.objects.filter(usuario=usuario).count(), 1)
+        self.assertEqual(usuario.credito, Decimal('5000.00') - Decimal('580.00'))
+        self.assertEqual(BibliotecaItem.objects.filter(usuario=usuario).count(), 5)
+
+
+class IdempotenciaTests(TestCase):
+    """
+    Un reintento del POST de compra con la misma clave no vuelve a cobrar.
+    """
+
+    def setUp(self):
+        self.productos = crear_catalogo(2)
+        self.usuario = Usuario.objects.create_user('idempotente', password='clave1234', credito=Decimal('1000.00'))
+        CarritoItem.objects.bulk_create([CarritoItem(usuario=self.usuario, producto=p) for p in self.productos])
+        self.client.force_login(self.usuario)
+        self.url = reverse('App_GameVerse:comprar_carrito')
+        self.datos = {
+            'metodo_pago': 'Credito', 'telefono': '5555555555', 'direccion': 'Calle 1',
+            'clave_idempotencia': 'clave-reintento',
+        }
+
+    def test_reintento_reproduce_la_redireccion(self):
+        primera = self.client.post(self.url, self.datos)
+        segunda = self.client.post(self.url, self.datos)
+
+        self.assertRedirects(primera, reverse('App_GameVerse:biblioteca'), fetch_redirect_response=False)
+        self.assertEqual(segunda.status_code, primera.status_code)
+        self.assertEqual(segunda['Location'], primera['Location'])
+        self.assertEqual(segunda['Idempotent-Replayed'], 'true')
+        self.assertEqual(Compra.objects.filter(usuario=self.usuario).count(), 1)
+        self.usuario.refresh_from_db()
+        self.assertEqual(self.usuario.credito, Decimal('768.00'))      # Un solo cargo de 200 + 16% IVA
+
+    def test_clave_en_proceso_responde_409(self):
+        ahora = timezone.now()
+        ClaveIdempotencia.objects.create(
+            usuario=self.usuario, clave='clave-reintento', ruta=self.url,
+            expira=ahora + datetime.timedelta(hours=1), bloqueada_hasta=ahora + datetime.timedelta(seconds=30),
+        )
+
+        respuesta = self.client.post(self.url, self.datos)
+
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertEqual(respuesta['Retry-After'], '1')
+        self.assertFalse(Compra.objects.filter(usuario=self.usuario).exists())
+        self.assertEqual(CarritoItem.objects.filter(usuario=self.usuario).count(), 2)
+
+    def test_plazo_vencido_el_reintento_toma_la_clave(self):
+        ahora = timezone.now()
+        # El proceso que la reclamó murió a mitad de la petición
+        ClaveIdempotencia.objects.create(
+            usuario=self.usuario, clave='clave-reintento', ruta=self.url,
+            expira=ahora + datetime.timedelta(hours=1), bloqueada_hasta=ahora - datetime.timedelta(seconds=1),
+        )
+
+        primera = self.client.post(self.url, self.datos)
+        segunda = self.client.post(self.url, self.datos)
+
+        self.assertRedirects(primera, reverse('App_GameVerse:biblioteca'), fetch_redirect_response=False)
+        self.assertEqual(segunda['Idempotent-Replayed'], 'true')
+        self.assertEqual(Compra.objects.filter(usuario=self.usuario).count(), 1)
+        registro = ClaveIdempotencia.objects.get(usuario=self.usuario, clave='clave-reintento')
+        self.assertEqual(registro.estado, 'Completada')
+        self.assertIsNone(registro.bloqueada_hasta)
+
+
+class CuentaSinPisarCreditoTests(TestCase):
+    """
+    Editar la cuenta con un usuario leído antes de un abono no deshace el abono.
+    """
+
+    def test_cuenta_y_contrasena_no_reescriben_credito(self):
+        usuario = Usuario.objects.create_user('cuenta', password='clave1234', credito=Decimal('100.00'))
+        self.client.force_login(usuario)
+        viejo = Usuario.objects.get(pk=usuario.pk)
+        saldo.abonar(usuario, Decimal('50.00'), 'Recarga')  # Llega mientras la petición ya cargó al usuario
+
+        with patch.object(UsuarioLigeroBackend, 'get_user', return_value=viejo):
+            self.client.post(reverse('App_GameVerse:cuenta'), {'username': 'cuenta', 'email': 'c@example.com', 'pais': 'MX'})
+            self.client.post(reverse('App_GameVerse:cambiar_contrasena'), {
+                'old_password': 'clave1234', 'new_password1': 'Otra-clave-987', 'new_password2': 'Otra-clave-987',
+            })
+
+        usuario.refresh_from_db()
+        self.assertEqual(usuario.email, 'c@example.com')
+        self.assertTrue(usuario.check_password('Otra-clave-987'))
+        self.assertEqual(usuario.credito, Decimal('150.00'))
+
+
+# ==========================
+#  USUARIO DE LA SOLICITUD
+# ==========================
+class UsuarioLigeroTests(TestCase):
+
+    def test_registro_inicia_sesion(self):
+        respuesta = self.client.post(reverse('App_GameVerse:register'), {
+            'username': 'nuevo', 'email': 'nuevo@example.com', 'pais': 'MX',
+            'password1': 'UnaClave987x', 'password2': 'UnaClave987x',
+        })
+
+        self.assertRedirects(respuesta, reverse('App_GameVerse:home'), fetch_redirect_response=False)
+        usuario = Usuario.objects.get(username='nuevo')
+        self.assertEqual(self.client.session[SESSION_KEY], str(usuario.pk))
+        self.assertEqual(self.client.session[BACKEND_SESSION_KEY], 'App_GameVerse.usuarios.UsuarioLigeroBackend')
+        self.assertEqual(self.client.get(reverse('App_GameVerse:cuenta')).status_code, 200)
+
+    def test_carga_solo_los_campos_de_la_solicitud(self):
+        creado = Usuario.objects.create_user('ligero', email='l@example.com', password='clave1234', pais='MX')
+        diferidos = {f.attname for f in Usuario._meta.concrete_fields} - set(usuarios.CAMPOS_SOLICITUD)
+        backend = UsuarioLigeroBackend()
+
+        for usuario in (backend.get_user(creado.pk), async_to_sync(backend.aget_user)(creado.pk)):
+            self.assertEqual(usuario.get_deferred_fields(), diferidos)
+            with self.assertNumQueries(1):
+                usuarios.completar(usuario)
+            with self.assertNumQueries(0):
+                self.assertEqual((usuario.email, usuario.pais), ('l@example.com', 'MX'))
+            self.assertEqual(usuario.get_deferred_fields(), set())
+
+        self.client.force_login(creado, backend='App_GameVerse.usuarios.UsuarioLigeroBackend')
+        respuesta = self.client.get(reverse('App_GameVerse:carrito_view'))
+        self.assertEqual(respuesta.context['user'].get_deferred_fields(), diferidos)
+
+
+# ==========================
+#  CATÁLOGO Y PAGINACIÓN POR CURSOR
+# ==========================
+class PaginacionCursorTests(TestCase):
+    """
+    Recorrer el catálogo por cursor visita cada producto una vez, en orden y con empates.
+    """
+
+    def setUp(self):
+        self.productos = crear_catalogo(9)
+        # Varios productos comparten precio, fecha y calificación: el desempate es por id
+        for i, producto in enumerate(self.productos):
+            producto.precio = Decimal(('50.00', '100.00', '200.00')[i % 3])
+            producto.fecha_lanzamiento = datetime.date(2024, 1 + i % 2, 1)
+            producto.calificacion_promedio = Decimal(('4.50', '3.00')[i % 2])
+            producto.tipo = 'DLC' if i % 4 == 0 else 'Juego'
+            producto.save()
+
+    def recorrer(self, consultar):
+        """
+        (ids hacia adelante, ids de vuelta hacia atrás desde la última página).
+        """
+        adelante, paginas = [], []
+        pagina = consultar(None)
+        while True:
+            paginas.append(pagina)
+            adelante += [p.pk for p in pagina]
+            if not pagina.siguiente:
+                break
+            pagina = consultar(pagina.siguiente)
+
+        atras = [p.pk for p in pagina]
+        while pagina.anterior:
+            pagina = consultar(pagina.anterior)
+            atras = [p.pk for p in pagina] + atras
+        self.assertIsNone(paginas[0].anterior)
+        return adelante, atras
+
+    def test_cada_orden_hacia_adelante_y_atras(self):
+        for orden, campo in catalogo.ORDENES.items():
+            with self.subTest(orden=orden):
+                prefijo = '-' if campo.startswith('-') else ''
+                esperado = list(
+                    catalogo.productos_visibles().order_by(campo, f'{prefijo}id').values_list('id', flat=True)
+                )
+                adelante, atras = self.recorrer(lambda cursor: catalogo.consultar(orden, cursor, limite=2))
+                self.assertEqual(adelante, esperado)
+                self.assertEqual(atras, esperado)
+
+    def test_empates_en_nombre(self):
+        Producto.objects.update(nombre='Mismo nombre')
+        qs = Producto.objects.all()
+        for descendente in (False, True):
+            with self.subTest(descendente=descendente):
+                adelante, atras = self.recorrer(lambda cursor: paginar(qs, 'nombre', descendente, cursor, limite=4))
+                esperado = sorted((p.pk for p in self.productos), reverse=descendente)
+                self.assertEqual(adelante, esperado)
+                self.assertEqual(atras, esperado)
+
+    def test_filtros_con_cursor(self):
+        filtros = {'tipo': 'Juego', 'precio_min': Decimal('100.00')}
+        adelante, atras = self.recorrer(lambda cursor: catalogo.consultar('-precio', cursor, limite=2, **filtros))
+
+        esperado = list(
+            Producto.objects.filter(tipo='Juego', precio__gte=Decimal('100.00'))
+            .order_by('-precio', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(adelante, esperado)
+        self.assertEqual(atras, esperado)
+
+    def test_cursor_alterado_vuelve_a_la_primera_pagina(self):
+        primera = [p.pk for p in catalogo.consultar('precio', limite=3)]
+        siguiente = catalogo.consultar('precio', limite=3).siguiente
+        otro_orden = catalogo.consultar('-lanzamiento', limite=3).siguiente
+
+        for cursor in ('basura', siguiente[:-2] + 'xx', otro_orden, signing.dumps({'o': 'x'})):
+            with self.subTest(cursor=cursor):
+                self.assertEqual([p.pk for p in catalogo.consultar('precio', cursor, limite=3)], primera)
+
+        respuesta = self.client.get(reverse('App_GameVerse:tienda'), {'orden': 'precio', 'cursor': 'basura'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIsNone(respuesta.context['anterior_url'])
+
+
+# ==========================
+#  IMÁGENES DE PRODUCTO
+# ==========================
+class ImagenesTests(TestCase):
+
+    def test_srcset_anuncia_el_ancho_real_de_un_original_angosto(self):
+        producto = crear_catalogo(1)[0]
+        contenido = BytesIO()
+        Image.new('RGB', (500, 250), (200, 30, 30)).save(contenido, 'PNG')
+
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            producto.imagen.save('angosta.png', ContentFile(contenido.getvalue()))
+            imagenes.procesar_producto(producto)
+            html = imagen_producto(producto)
+
+        self.assertEqual(producto.imagen_ancho, 500)
+        self.assertIn('/320.webp 320w', html)
+        self.assertIn('/640.webp 500w', html)   # El de 640 se generó con el ancho del original
+        self.assertNotIn('960', html)           # Sería otra copia de 500 px
+
+
+# ==========================
+#  GET CONDICIONAL (ETag)
+# ==========================
+class CondicionalTests(TestCase):
+    """
+    El detalle de producto responde 304 solo si la página guardada sigue siendo la del usuario.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.producto = crear_catalogo(1)[0]
+        self.url = reverse('App_GameVerse:producto_detalle', args=[self.producto.pk])
+        self.usuario = Usuario.objects.create_user('condicional', password='clave1234', credito=Decimal('1000.00'))
+        self.client.force_login(self.usuario)
+
+    def test_304_con_etag_vigente(self):
+        etag = self.client.get(self.url)['ETag']
+
+        respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta.content, b'')
+
+    def test_etag_distinto_por_usuario_y_tras_comprar(self):
+        otro = Client()
+        otro.force_login(Usuario.objects.create_user('otro', password='clave1234', credito=Decimal('1000.00')))
+        etag = self.client.get(self.url)['ETag']
+        self.assertNotEqual(otro.get(self.url)['ETag'], etag)
+
+        CarritoItem.objects.create(usuario=self.usuario, producto=self.producto)
+        procesar_compra(self.usuario, 'Credito')
+        respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+
+    def test_mensaje_pendiente_no_responde_304(self):
+        BibliotecaItem.objects.create(usuario=self.usuario, producto=self.producto)
+        etag = self.client.get(self.url)['ETag']
+
+        redireccion = self.client.post(reverse('App_GameVerse:agregar_al_carrito', args=[self.producto.pk]))
+        self.assertRedirects(redireccion, self.url, fetch_redirect_response=False)
+        con_aviso = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        despues = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertContains(con_aviso, 'Ya tienes este producto en tu biblioteca.')
+        self.assertNotIn('ETag', con_aviso)
+        self.assertEqual(despues.status_code, 304)       # El aviso ya se mostró
+
+
+# ==========================
+#  ARCHIVOS ESTÁTICOS
+# ==========================
+class EstaticosTests(TestCase):
+    """
+    EstaticosMiddleware negocia la codificación y no sirve nada fuera de STATIC_ROOT.
+    """
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        raiz = os.path.join(directorio.name, 'static')
+        os.makedirs(raiz)
+        for nombre, contenido in (
+            ('app.css', b'body {}'), ('app.css.gz', b'gz'), ('app.css.br', b'br'),
+            ('app.0123456789ab.css', b'body {}'), ('app.0123456789ab.css.gz', b'gz'),
+        ):
+            with open(os.path.join(raiz, nombre), 'wb') as archivo:
+                archivo.write(contenido)
+        with open(os.path.join(directorio.name, 'secreto.txt'), 'wb') as archivo:
+            archivo.write(b'fuera de STATIC_ROOT')
+
+        configuracion = override_settings(STATIC_ROOT=raiz, STATIC_URL='/static/', ESTATICOS_EN_PROCESO=True)
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+        self.secreto = os.path.join(directorio.name, 'secreto.txt')
+
+    def pedir(self, ruta, codificaciones=None):
+        extra = {'HTTP_ACCEPT_ENCODING': codificaciones} if codificaciones is not None else {}
+        respuesta = self.client.get(ruta, **extra)
+        self.addCleanup(respuesta.close)
+        return respuesta
+
+    def test_elige_br_luego_gzip_luego_sin_codificar(self):
+        for codificaciones, esperada, cuerpo in (
+            ('gzip, deflate, br', 'br', b'br'),
+            ('gzip', 'gzip', b'gz'),
+            ('', None, b'body {}'),
+        ):
+            with self.subTest(codificaciones=codificaciones):
+                respuesta = self.pedir('/static/app.css', codificaciones)
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertEqual(respuesta.get('Content-Encoding'), esperada)
+                self.assertEqual(b''.join(respuesta.streaming_content), cuerpo)
+                self.assertEqual(respuesta['Vary'], 'Accept-Encoding')
+                self.assertEqual(respuesta['Content-Type'], 'text/css')
+
+    def test_inmutable_solo_con_hash_del_manifiesto(self):
+        con_hash = self.pedir('/static/app.0123456789ab.css', 'gzip, br')
+        sin_hash = self.pedir('/static/app.css', 'gzip, br')
+
+        self.assertEqual(con_hash['Content-Encoding'], 'gzip')    # No hay .br para este archivo
+        self.assertEqual(con_hash['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertNotIn('immutable', sin_hash['Cache-Control'])
+
+    def test_no_sale_de_static_root(self):
+        for ruta in ('/static/../secreto.txt', '/static/%2e%2e/secreto.txt', f'/static/{self.secreto}', '/static/falta.css'):
+            with self.subTest(ruta=ruta):
+                self.assertEqual(self.pedir(ruta).status_code, 404)
+
+
+# ==========================
+#  BÚSQUEDA
+# ==========================
+class BuscarTests(TestCase):
+
+    def test_pagina_fuera_de_rango_se_limita(self):
+        crear_catalogo(1)
+
+        respuesta = self.client.get(reverse('App_GameVerse:buscar'), {'q': 'Juego', 'pagina': 999})
+
+        self.assertEqual(respuesta.context['pagina'], busqueda.PAGINAS_MAXIMAS)
+        self.assertIn(f'pagina={busqueda.PAGINAS_MAXIMAS - 1}', respuesta.context['anterior_url'])
+        self.assertIsNone(respuesta.context['siguiente_url'])
+
+
+# ==========================
+#  AUTOCOMPLETADO
+# ==========================
+class AutocompletarTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.indice = autocompletar.IndicePrefijos()
+        self.productos = crear_catalogo(2)
+        self.productos[0].nombre = 'Pokémon Édición Acción'
+        self.productos[0].save()
+
+    def nombres(self, texto):
+        return [s['nombre'] for s in self.indice.sugerencias(texto) if s['tipo'] == 'producto']
+
+    def test_prefijo_sin_acentos_ni_mayusculas(self):
+        for texto in ('poke', 'POKÉ', 'edic', 'edición acc', '  Accion '):
+            with self.subTest(texto=texto):
+                self.assertEqual(self.nombres(texto), ['Pokémon Édición Acción'])
+        self.assertEqual(self.nombres('mon'), [])     # Solo prefijos de palabra
+
+    def test_actualiza_solo_lo_que_cambio(self):
+        self.assertEqual(self.nombres('zel'), [])
+        producto = self.productos[1]
+
+        with patch.object(self.indice, '_reconstruir', side_effect=AssertionError("reconstrucción completa")):
+            with self.captureOnCommitCallbacks(execute=True):   # La versión avanza al confirmar
+                nuevo = crear_catalogo(1)[0]
+                nuevo.nombre = 'The Legend of Zelda'
+                nuevo.save()
+            self.assertEqual(self.nombres('zel'), ['The Legend of Zelda'])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                producto.nombre = 'Metroid'
+                producto.save()
+            self.assertEqual(self.nombres('metr'), ['Metroid'])
+            self.assertEqual(self.nombres('juego 1'), [])   # El nombre anterior ya no aparece
+
+    def test_consultas_no_esperan_a_la_reconstruccion(self):
+        self.assertEqual(self.nombres('poke'), ['Pokémon Édición Acción'])
+        version_catalogo.incrementar()
+
+        # Otro hilo está recalculando: se responde con la instantánea anterior sin esperarlo
+        resultados = []
+        with self.indice._candado:
+            hilo = threading.Thread(target=lambda: resultados.append(self.nombres('poke')))
+            hilo.start()
+            hilo.join(timeout=5)
+            respondio = not hilo.is_alive()
+        hilo.join()
+        self.assertTrue(respondio)
+        self.assertEqual(resultados, [['Pokémon Édición Acción']])
+
+
+# ==========================
+#  VERSIÓN DEL CATÁLOGO
+# ==========================
+class VersionCatalogoTests(TestCase):
+
+    def test_version_desalojada_no_vuelve_a_un_numero_usado(self):
+        anterior = version_catalogo.incrementar()
+        cache.delete(version_catalogo.CLAVE_VERSION)     # Como si la caché la hubiera desalojado
+        self.assertGreater(version_catalogo.actual(), anterior)
+
+        anterior = version_catalogo.actual()
+        cache.delete(version_catalogo.CLAVE_VERSION)
+        self.assertGreater(version_catalogo.incrementar(), anterior)
+
+
+# ==========================
+#  PRESUPUESTO DE CONSULTAS POR RUTA
+# ==========================
+def sembrar(tamano):
+    """
+    Catálogo, biblioteca, carrito, historial y usuarios de 'tamano' elementos cada uno.
+    """
+    proveedor = Proveedor.objects.create(nombre='Proveedor', tipo='Publisher', pais='MX')
+    productos = Producto.objects.bulk_create([
+        Producto(
+            nombre=f'Juego {i}', tipo='Juego', genero='RPG', descripcion='Descripción',
+            precio=Decimal('100.00'), fecha_lanzamiento=datetime.date(2024, 1, 1), proveedor=proveedor,
+        )
+        for i in range(2 * tamano + 1)
+    ])
+    poseidos, en_carrito, libre = productos[:tamano], productos[tamano:2 * tamano], productos[-1]
+
+    jugador = Usuario.objects.create_user('jugador', password='clave1234', credito=Decimal('100000.00'))
+    admin = Usuario.objects.create_superuser('admin', password='clave1234')
+    Usuario.objects.bulk_create([Usuario(username=f'otro_{i}') for i in range(tamano)])
+
+    compras = Compra.objects.bulk_create([
+        Compra(usuario=jugador, total=p.precio, metodo_pago='Tarjeta') for p in poseidos
+    ])
+    CompraItem.objects.bulk_create([
+        CompraItem(compra=c, producto=p, nombre=p.nombre, precio=p.precio, fecha_compra=c.fecha_compra)
+        for c, p in zip(compras, poseidos)
+    ])
+    BibliotecaItem.objects.bulk_create([BibliotecaItem(usuario=jugador, producto=p) for p in poseidos])
+    CarritoItem.objects.bulk_create([CarritoItem(usuario=jugador, producto=p) for p in en_carrito])
+    return SimpleNamespace(
+        proveedor=proveedor, poseido=poseidos[0], en_carrito=en_carrito[0], libre=libre,
+        jugador=jugador, admin=admin,
+    )
+
+
+def peticiones(m):
+    """
+    (método, url, datos, usuario) de cada ruta de urls.py sobre el mundo 'm'.
+    """
+    def ruta(nombre, *args):
+        return reverse(f'App_GameVerse:{nombre}', args=args)
+
+    tarjeta = {'nombre_tarjeta': 'Jugador', 'numero_tarjeta': '4' * 16,
+               'mes_expiracion': 12, 'anio_expiracion': 2099, 'cvv': '123'}
+    return {
+        'home': ('get', ruta('home'), None, m.jugador),
+        'register': ('get', ruta('register'), None, None),
+        'login': ('get', ruta('login'), None, None),
+        'logout': ('get', ruta('logout'), None, m.jugador),
+        'tienda': ('get', ruta('tienda'), None, m.jugador),
+        'buscar': ('get', ruta('buscar'), {'q': 'Juego'}, m.jugador),
+        'autocompletar': ('get', ruta('autocompletar'), {'q': 'Jue'}, None),
+        'producto_detalle': ('get', ruta('producto_detalle', m.poseido.pk), None, m.jugador),
+        'agregar_al_carrito': ('post', ruta('agregar_al_carrito', m.libre.pk), None, m.jugador),
+        'carrito_view': ('get', ruta('carrito_view'), None, m.jugador),
+        'eliminar_del_carrito': ('get', ruta('eliminar_del_carrito', m.en_carrito.pk), None, m.jugador),
+        'comprar_carrito': ('post', ruta('comprar_carrito'),
+                            {'metodo_pago': 'Credito', 'telefono': '5555555555', 'direccion': 'Calle 1'}, m.jugador),
+        'pago_tarjeta': ('post', ruta('pago_tarjeta'), tarjeta, m.jugador),
+        'comprar_carrito_efectivo': ('get', ruta('comprar_carrito_efectivo'), None, m.jugador),
+        'comprar_carrito_tarjeta': ('get', ruta('comprar_carrito_tarjeta'), None, m.jugador),
+        'proveedor_detalle': ('get', ruta('proveedor_detalle', m.proveedor.pk), None, m.jugador),
+        'biblioteca': ('get', ruta('biblioteca'), None, m.jugador),
+        'compras': ('get', ruta('compras'), None, m.jugador),
+        'exportar_compras': ('get', ruta('exportar_compras'), {'formato': 'csv'}, m.jugador),
+        'credito': ('get', ruta('credito'), None, m.jugador),
+        'devolver_producto': ('post', ruta('devolver_producto', m.poseido.pk), {'metodo': 'credito'}, m.jugador),
+        'cuenta': ('get', ruta('cuenta'), None, m.jugador),
+        'cambiar_contrasena': ('get', ruta('cambiar_contrasena'), None, m.jugador),
+        'proveedor_list': ('get', ruta('proveedor_list'), None, m.admin),
+        'proveedor_create': ('get', ruta('proveedor_create'), None, m.admin),
+        'proveedor_update': ('get', ruta('proveedor_update', m.proveedor.pk), None, m.admin),
+        'proveedor_delete': ('get', ruta('proveedor_delete', m.proveedor.pk), None, m.admin),
+        'producto_list': ('get', ruta('producto_list'), None, m.admin),
+        'producto_create': ('get', ruta('producto_create'), None, m.admin),
+        'producto_update': ('get', ruta('producto_update', m.poseido.pk), None, m.admin),
+        'producto_delete': ('get', ruta('producto_delete', m.poseido.pk), None, m.admin),
+        'usuario_list': ('get', ruta('usuario_list'), None, m.admin),
+        'usuario_create': ('get', ruta('usuario_create'), None, m.admin),
+        'usuario_update': ('get', ruta('usuario_update', m.jugador.pk), None, m.admin),
+        'usuario_delete': ('get', ruta('usuario_delete', m.jugador.pk), None, m.admin),
+        'metricas': ('get', ruta('metricas'), None, m.admin),
+    }
+
+
+class PresupuestoConsultasTests(TestCase):
+    """
+    Cada ruta de urls.py tiene un máximo de consultas SQL que no depende del
+    tamaño de la biblioteca, el carrito, el historial o el catálogo. Las
+    peticiones se miden con la caché vacía (el peor caso) y cada una se
+    revierte para que todas vean los mismos datos.
+    """
+    TAMANOS = (2, 30)
+
+    # Máximo de consultas por ruta, incluidas las de sesión y usuario
+    PRESUPUESTO = {
+        'home': 2,
+        'register': 0,
+        'login': 0,
+        'logout': 4,
+        'tienda': 5,
+        'buscar': 5,
+        'autocompletar': 2,
+        'producto_detalle': 4,
+        'agregar_al_carrito': 8,
+        'carrito_view': 3,
+        'eliminar_del_carrito': 3,
+        'comprar_carrito': 14,        # Checkout completo con crédito
+        'pago_tarjeta': 12,           # Checkout completo con tarjeta
+        'comprar_carrito_efectivo': 3,
+        'comprar_carrito_tarjeta': 3,
+        'proveedor_detalle': 4,
+        'biblioteca': 3,
+        'compras': 4,
+        'exportar_compras': 4,
+        'credito': 2,
+        'devolver_producto': 8,       # El abono del reembolso se hace en segundo plano
+        'cuenta': 3,
+        'cambiar_contrasena': 2,
+        'proveedor_list': 3,
+        'proveedor_create': 2,
+        'proveedor_update': 3,
+        'proveedor_delete': 3,
+        'producto_list': 3,
+        'producto_create': 3,
+        'producto_update': 4,
+        'producto_delete': 3,
+        'usuario_list': 3,
+        'usuario_create': 2,
+        'usuario_update': 3,
+        'usuario_delete': 3,
+        'metricas': 2,
+    }
+
+    def medir(self, tamano):
+        """
+        {nombre de ruta: Medicion} con los datos sembrados para 'tamano'.
+        """
+        mediciones = {}
+        with transaction.atomic():
+            mundo = sembrar(tamano)
+            for nombre, (metodo, url, datos, usuario) in peticiones(mundo).items():
+                with transaction.atomic():
+                    cliente = Client()
+                    if usuario is not None:
+                        cliente.force_login(usuario)
+                    cache.clear()
+                    autocompletar.indice = autocompletar.IndicePrefijos()
+                    medicion = Medicion()
+                    with ExitStack() as pila:
+                        for conexion in connections.all():
+                            pila.enter_context(conexion.execute_wrapper(medicion))
+                        respuesta = getattr(cliente, metodo)(url, datos)
+                        if respuesta.streaming:
+                            b''.join(respuesta.streaming_content)
+                    self.assertLess(respuesta.status_code, 400, f"{nombre}: {url}")
+                    mediciones[nombre] = medicion
+                    transaction.set_rollback(True)
+            transaction.set_rollback(True)
+        return mediciones
+
+    def detalle(self, medicion):
+        lineas = [f"  {r['veces']}× {r['sql']}" for r in medicion.repetidas()]
+        return '\n'.join(['Sentencias repetidas:'] + lineas) if lineas else 'Sin sentencias repetidas.'
+
+    def test_todas_las_rutas_tienen_presupuesto(self):
+        self.assertEqual({p.name for p in urlpatterns}, set(self.PRESUPUESTO))
+
+    def test_consultas_dentro_del_presupuesto_y_constantes(self):
+        por_tamano = {tamano: self.medir(tamano) for tamano in self.TAMANOS}
+        for nombre, maximo in self.PRESUPUESTO.items():
+            conteos = {tamano: por_tamano[tamano][nombre].consultas for tamano in self.TAMANOS}
+            mayor = max(self.TAMANOS, key=lambda t: conteos[t])
+            with self.subTest(ruta=nombre):
+                self.assertLessEqual(
+                    conteos[mayor], maximo,
+                    f"{nombre}: {conteos[mayor]} consultas (máximo {maximo}).\n{self.detalle(por_tamano[mayor][nombre])}",
+                )
+                self.assertEqual(
+                    len(set(conteos.values())), 1,
+                    f"{nombre}: las consultas crecen con los datos {conteos}.\n{self.detalle(por_tamano[mayor][nombre])}",
+                )
+
+
+# ==========================
+#  INSTRUMENTACIÓN POR PETICIÓN
+# ==========================
+@override_settings(INSTRUMENTACION_MUESTREO=1)
+class InstrumentacionTests(TestCase):
+
+    def setUp(self):
+        crear_catalogo(3)
+
+    def _consultas(self, respuesta):
+        return int(respuesta['Server-Timing'].split('desc="')[1].split()[0])
+
+    def test_cuenta_consultas_con_wsgi(self):
+        self.assertGreater(self._consultas(self.client.get(reverse('App_GameVerse:tienda'))), 0)
+
+    async def test_cuenta_consultas_del_orm_asincrono(self):
+        # Con ASGI el middleware corre en el event loop y las consultas en el hilo del ORM
+        respuesta = await self.async_client.get(reverse('App_GameVerse:tienda'))
+        self.assertGreater(self._consultas(respuesta), 0)
+
+
+# ==========================
+#  MÉTRICAS PROMETHEUS
+# ==========================
+class MetricasTests(TestCase):
+
+    def setUp(self):
+        self.url = reverse('App_GameVerse:metricas')
+        Usuario.objects.create_superuser('admin', password='clave1234')
+
+    def test_exige_superusuario(self):
+        cliente = Client()
+        cliente.force_login(Usuario.objects.create_user('jugador', password='clave1234'))
+        self.assertEqual(cliente.get(self.url).status_code, 401)
+
+        basic = base64.b64encode(b'admin:clave1234').decode()
+        respuesta = Client().get(self.url, HTTP_AUTHORIZATION=f'Basic {basic}')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('# TYPE gameverse_peticion_segundos histogram', respuesta.content.decode())
+
+    def test_compra_se_cuenta_al_confirmar(self):
+        usuario = Usuario.objects.create_user('jugador', password='clave1234', credito=Decimal('1000.00'))
+        CarritoItem.objects.create(usuario=usuario, producto=crear_catalogo(1)[0])
+        antes = metricas.COMPRAS.valores.get(('Credito',), [0])[0]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            procesar_compra(usuario, 'Credito')
+
+        self.assertEqual(metricas.COMPRAS.valores[('Credito',)][0], antes + 1)
+        self.assertIn(f'gameverse_compras_total{{metodo_pago="Credito"}} {antes + 1}', metricas.exponer())
+
+    def test_suma_los_archivos_de_todos_los_procesos(self):
+        with tempfile.TemporaryDirectory() as directorio, override_settings(METRICAS_DIR=directorio):
+            # Estado que dejó otro worker
+            with open(os.path.join(directorio, 'metricas_1_otro.json'), 'w', encoding='utf-8') as archivo:
+                json.dump({'gameverse_carrito_agregados_total': [[[], [5]]]}, archivo)
+            propio = metricas.CARRITO_AGREGADOS.valores.get((), [0])[0]
+            try:
+                texto = metricas.exponer()
+            finally:
+                metricas._proceso['archivo'] = None
+            self.assertEqual(len(os.listdir(directorio)), 2)  # El de este proceso se publica al exponer
+
+        self.assertIn(f'gameverse_carrito_agregados_total {propio + 5}', texto)
+
+
+# ==========================
+#  TAREAS EN SEGUNDO PLANO
+# ==========================
+ejecutadas = []
+
+
+@tareas.tarea()
+def anotar(nombre):
+    ejecutadas.append(nombre)
+
+
+@tareas.tarea(intentos=2)
+def fallar():
+    raise RuntimeError("falla de prueba")
+
+
+@tareas.tarea(transaccional=True)
+def crear_proveedor(nombre):
+    Proveedor.objects.create(nombre=nombre, tipo='Publisher', pais='MX')
+
+
+class TareasTests(TestCase):
+
+    def setUp(self):
+        ejecutadas.clear()
+
+    def test_mayor_prioridad_primero(self):
+        anotar.encolar('normal')
+        anotar.encolar('urgente', prioridad=5)
+        anotar.encolar('despues', demora=60)
+
+        self.assertEqual(tareas.procesar_pendientes(), 2)
+        self.assertEqual(ejecutadas, ['urgente', 'normal'])
+        self.assertEqual(Tarea.objects.filter(estado='Pendiente').count(), 1)  # La demorada sigue esperando
+
+    def test_reintenta_con_espera_y_luego_falla(self):
+        tarea = fallar.encolar()
+
+        tareas.procesar_pendientes()
+        tarea.refresh_from_db()
+        self.assertEqual((tarea.estado, tarea.intentos), ('Pendiente', 1))
+        self.assertGreater(tarea.disponible, timezone.now())
+        self.assertIn('falla de prueba', tarea.error)
+
+        Tarea.objects.filter(pk=tarea.pk).update(disponible=timezone.now())
+        tareas.procesar_pendientes()
+        tarea.refresh_from_db()
+        self.assertEqual((tarea.estado, tarea.intentos), ('Fallida', 2))
+
+    def test_plazo_vencido_la_reclama_otro_worker(self):
+        crear_proveedor.encolar('Una sola vez')
+        [primera] = tareas.reclamar('a', 10)
+        self.assertEqual(tareas.reclamar('b', 10), [])  # Retenida durante su plazo de visibilidad
+
+        Tarea.objects.filter(pk=primera.pk).update(disponible=timezone.now())
+        [segunda] = tareas.reclamar('b', 10)
+        self.assertTrue(tareas.ejecutar(segunda))
+        self.assertFalse(tareas.ejecutar(primera))   # El worker lento ya no puede terminarla
+        self.assertEqual(Proveedor.objects.filter(nombre='Una sola vez').count(), 1)
+
+    def test_con_cache_local_invalida_en_el_proceso_web(self):
+        producto = crear_catalogo(1)[0]
+        antes = version_catalogo.actual()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertIsNone(imagenes.generar_derivados_producto.encolar(producto.pk))
+        self.assertFalse(Tarea.objects.exists())
+        self.assertGreater(version_catalogo.actual(), antes)
+
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}):
+            self.assertIsNotNone(imagenes.generar_derivados_producto.encolar(producto.pk))
+        self.assertEqual(Tarea.objects.count(), 1)
+
+    def test_devolucion_abona_el_credito_en_segundo_plano(self):
+        producto = crear_catalogo(1)[0]
+        usuario = Usuario.objects.create_user('jugador', password='clave1234')
+        BibliotecaItem.objects.create(usuario=usuario, producto=producto)
+        cliente = Client()
+        cliente.force_login(usuario)
+
+        cliente.post(reverse('App_GameVerse:devolver_producto', args=[producto.pk]), {'metodo': 'credito'})
+        self.assertFalse(BibliotecaItem.objects.filter(usuario=usuario).exists())
+        self.assertEqual(Usuario.objects.get(pk=usuario.pk).credito, Decimal('0.00'))
+
+        tareas.procesar_pendientes()
+        tareas.procesar_pendientes()
+        self.assertEqual(Usuario.objects.get(pk=usuario.pk).credito, producto.precio)
+        self.assertEqual(MovimientoCredito.objects.filter(usuario=usuario, tipo='Reembolso').count(), 1)
+
+    def test_devolucion_repetida_no_reembolsa_dos_veces(self):
+        producto = crear_catalogo(1)[0]
+        usuario = Usuario.objects.create_user('impaciente', password='clave1234')
+        entrada = BibliotecaItem.objects.create(usuario=usuario, producto=producto)
+        cliente = Client()
+        cliente.force_login(usuario)
+        url = reverse('App_GameVerse:devolver_producto', args=[producto.pk])
+        antes = metricas.DEVOLUCIONES.valores.get(('credito',), [0])[0]
+
+        # Dos envíos que leyeron la entrada antes de que cualquiera la borrara
+        leidas = [BibliotecaItem.objects.get(pk=entrada.pk) for _ in range(2)]
+        with patch.object(QuerySet, 'first', side_effect=leidas):
+            primera = cliente.post(url, {'metodo': 'credito'})
+            segunda = cliente.post(url, {'metodo': 'credito'})
+
+        self.assertRedirects(primera, reverse('App_GameVerse:biblioteca'), fetch_redirect_response=False)
+        self.assertContains(segunda, 'no está en tu biblioteca')
+        self.assertEqual(Tarea.objects.count(), 1)
+        self.assertEqual(metricas.DEVOLUCIONES.valores[('credito',)][0], antes + 1)
+
+        # Lo que hace el worker (manage.py procesar_tareas): un solo abono aunque se procese de nuevo
+        self.assertEqual(tareas.procesar_pendientes(), 1)
+        self.assertEqual(tareas.procesar_pendientes(), 0)
+        self.assertEqual(Usuario.objects.get(pk=usuario.pk).credito, producto.precio)
+        self.assertEqual(MovimientoCredito.objects.filter(usuario=usuario, tipo='Reembolso').count(), 1)
+
+        # Un tercer envío, ya sin la entrada, tampoco encola nada
+        self.assertContains(cliente.post(url, {'metodo': 'credito'}), 'no está en tu biblioteca')
+        self.assertEqual(Tarea.objects.count(), 1)
+
+
+# ==========================
+#  CONEXIONES DE LECTURA Y ESCRITURA
+# ==========================
+@skipUnless(basedatos.ALIAS_LECTURA in connections, "la conexión 'lectura' solo existe en el perfil 'produccion'")
+class EnrutadorLecturaTests(TransactionTestCase):
+    """
+    TransactionTestCase: dentro del atomic de TestCase el enrutador siempre
+    elige 'default', que es justo lo que no se quiere probar aquí.
+    """
+    databases = {'default', basedatos.ALIAS_LECTURA}
+
+    def setUp(self):
+        self.producto = crear_catalogo(1)[0]
+        self.fabrica = RequestFactory()
+
+    def consultas(self, funcion):
+        with CaptureQueriesContext(connections['default']) as escritura, \
+                CaptureQueriesContext(connections[basedatos.ALIAS_LECTURA]) as lectura:
+            funcion()
+        return len(escritura.captured_queries), len(lectura.captured_queries)
+
+    def test_get_marcado_lee_por_la_conexion_de_lectura(self):
+        @basedatos.solo_lectura
+        def vista(request):
+            return list(Producto.objects.all())
+
+        escritura, lectura = self.consultas(lambda: vista(self.fabrica.get('/')))
+
+        self.assertEqual((escritura, lectura), (0, 1))
+
+    def test_escrituras_y_post_van_a_default(self):
+        @basedatos.solo_lectura
+        def vista(request):
+            Producto.objects.filter(pk=self.producto.pk).update(precio=Decimal('50.00'))
+            return list(Producto.objects.all())
+
+        self.assertEqual(self.consultas(lambda: vista(self.fabrica.get('/'))), (1, 1))
+        self.assertEqual(self.consultas(lambda: vista(self.fabrica.post('/'))), (2, 0))
+
+    def test_fuera_de_la_vista_y_en_transaccion_lee_default(self):
+        @basedatos.solo_lectura
+        def vista(request):
+            with transaction.atomic():
+                return list(Producto.objects.all())
+
+        self.assertEqual(self.consultas(lambda: list(Producto.objects.all())), (1, 0))
+        self.assertEqual(self.consultas(lambda: vista(self.fabrica.get('/')))[1], 0)
+
+    def test_la_marca_se_restablece_si_la_vista_falla(self):
+        @basedatos.solo_lectura
+        def vista(request):
+            self.assertEqual(Producto.objects.all().db, basedatos.ALIAS_LECTURA)
+            raise ValueError('falla')
+
+        with self.assertRaises(ValueError):
+            vista(self.fabrica.get('/'))
+
+        self.assertFalse(basedatos._solo_lectura.get())
+        self.assertEqual(Producto.objects.all().db, 'default')
+
+    def test_vista_asincrona(self):
+        @basedatos.solo_lectura
+        async def vista(request):
+            return Producto.objects.all().db
+
+        self.assertEqual(async_to_sync(vista)(self.fabrica.get('/')), basedatos.ALIAS_LECTURA)
+        self.assertEqual(async_to_sync(vista)(self.fabrica.post('/')), 'default')
+        self.assertFalse(basedatos._solo_lectura.get())
+
+
+# ==========================
+#  COMANDOS DE MANTENIMIENTO
+# ==========================
+class PurgarSesionesTests(TestCase):
+
+    def crear_sesiones(self, prefijo, cantidad, expira):
+        Session.objects.bulk_create([
+            Session(session_key=f'{prefijo}{i:02d}', session_data='', expire_date=expira) for i in range(cantidad)
+        ])
+
+    def test_borra_solo_las_vencidas_por_lotes(self):
+        ahora = timezone.now()
+        self.crear_sesiones('vencida', 7, ahora - datetime.timedelta(minutes=1))
+        self.crear_sesiones('viva', 3, ahora + datetime.timedelta(days=1))
+        salida = StringIO()
+
+        with CaptureQueriesContext(connection) as consultas:
+            call_command('purgar_sesiones', lote=3, pausa=0, stdout=salida)
+
+        borrados = [q['sql'] for q in consultas.captured_queries if q['sql'].startswith('DELETE')]
+        self.assertEqual(len(borrados), 3)                      # 3 + 3 + 1
+        self.assertEqual(set(Session.objects.values_list('session_key', flat=True)), {'viva00', 'viva01', 'viva02'})
+        self.assertIn('Sesiones vencidas eliminadas: 7', salida.getvalue())
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_sin_motor_de_base_no_hace_nada(self):
+        self.crear_sesiones('vencida', 2, timezone.now() - datetime.timedelta(minutes=1))
+        salida = StringIO()
+
+        with self.assertNumQueries(0):
+            call_command('purgar_sesiones', stdout=salida)
+
+        self.assertEqual(Session.objects.count(), 2)
+        self.assertIn('no hay sesiones en la base de datos', salida.getvalue())
@@ -13,6 +13,8 @@ urlpatterns = [
 
     # ---- TIENDA ----
     path('tienda/', views.tienda, name='tienda'),                      # Vista principal de la tienda de productos
+    path('buscar/', views.buscar, name='buscar'),                      # Búsqueda de texto completo en el catálogo
+    path('autocompletar/', views.autocompletar, name='autocompletar'),  # Sugerencias JSON mientras se escribe
     path('producto/<int:pk>/', views.producto_detalle, name='producto_detalle'),  # Detalles de un producto por ID
     
     # ---- CARRITO ----
@@ -30,6 +32,7 @@ urlpatterns = [
     # ---- USUARIO ----
     path('biblioteca/', views.biblioteca_view, name='biblioteca'),      # Biblioteca del usuario (sus compras)
     path('compras/', views.compras_view, name='compras'),               # Historial de compras del usuario
+    path('compras/exportar/', views.exportar_compras, name='exportar_compras'),  # Exportar compras en CSV/JSONL
     path("credito/", views.credito, name="credito"),                    # Página para gestionar o recargar crédito
     path("biblioteca/devolver/<int:producto_id>/", views.devolver_producto, name="devolver_producto"), # Devolver un producto comprado
     path('cuenta/', views.cuenta, name='cuenta'),                       # Configuración de cuenta del usuario
@@ -52,4 +55,7 @@ urlpatterns = [
     path('crud/usuarios/crear/', views.usuario_create, name='usuario_create'),          # Crear usuario desde panel admin
     path('crud/usuarios/editar/<int:pk>/', views.usuario_update, name='usuario_update'), # Editar usuario existente
     path('crud/usuarios/eliminar/<int:pk>/', views.usuario_delete, name='usuario_delete'), # Eliminar usuario
+
+    # ---- MÉTRICAS ----
+    path('metrics/', views.metricas, name='metricas'),                                  # Métricas Prometheus (solo superusuarios)
 ]
@@ -0,0 +1,97 @@
+# ================================
+# USUARIO DE LA SOLICITUD
+# ================================
+# AuthenticationMiddleware carga al usuario en cada petición. La mayoría de
+# las páginas solo usan lo que muestra el navbar (nombre, crédito, rol), así
+# que UsuarioLigeroBackend lo carga con .only(CAMPOS_SOLICITUD) y deja el
+# resto de columnas diferidas; completar() las trae todas juntas cuando una
+# vista (p. ej. 'cuenta') sí las necesita.
+#
+# estado_productos() responde "¿está en su biblioteca / carrito?" con una sola
+# consulta y guarda la respuesta en el objeto usuario, que vive lo mismo que
+# la petición: consultar varias veces el mismo producto no repite el SELECT.
+
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Exists, OuterRef
+
+from .models import BibliotecaItem, CarritoItem, Producto, Usuario
+
+# Lo necesario para validar la sesión (password → hash de sesión, is_active)
+# y para el navbar/permisos de las plantillas
+CAMPOS_SOLICITUD = ('id', 'password', 'username', 'is_active', 'is_staff', 'is_superuser', 'credito')
+
+
+class UsuarioLigeroBackend(ModelBackend):
+    """
+    ModelBackend que carga al usuario de la sesión solo con CAMPOS_SOLICITUD.
+    """
+
+    def get_user(self, user_id):
+        try:
+            usuario = Usuario._default_manager.only(*CAMPOS_SOLICITUD).get(pk=user_id)
+        except Usuario.DoesNotExist:
+            return None
+        return usuario if self.user_can_authenticate(usuario) else None
+
+    async def aget_user(self, user_id):
+        try:
+            usuario = await Usuario._default_manager.only(*CAMPOS_SOLICITUD).aget(pk=user_id)
+        except Usuario.DoesNotExist:
+            return None
+        return usuario if self.user_can_authenticate(usuario) else None
+
+
+async def acargar(request):
+    """
+    Resuelve el usuario con request.auser() y lo deja en request.user, para que
+    plantillas y decoradores síncronos no lo consulten desde el event loop.
+    """
+    request.user = await request.auser()
+    return request.user
+
+
+def completar(usuario):
+    """
+    Carga en una sola consulta las columnas que quedaron diferidas.
+    """
+    diferidos = usuario.get_deferred_fields()
+    if diferidos:
+        usuario.refresh_from_db(fields=list(diferidos))
+    return usuario
+
+
+def _consulta_estado(usuario, ids):
+    return (
+        Producto.objects.filter(id__in=ids)
+        .annotate(
+            en_biblioteca=Exists(BibliotecaItem.objects.filter(usuario=usuario, producto=OuterRef('pk'))),
+            en_carrito=Exists(CarritoItem.objects.filter(usuario=usuario, producto=OuterRef('pk'))),
+        )
+        .values_list('id', 'en_biblioteca', 'en_carrito')
+    )
+
+
+def estado_productos(usuario, ids):
+    """
+    {producto_id: (en_biblioteca, en_carrito)} para los ids pedidos.
+    Solo consulta los que aún no se conocen en esta petición.
+    """
+    conocidos = usuario.__dict__.setdefault('_estado_productos', {})
+    faltantes = [pk for pk in ids if pk not in conocidos]
+    if faltantes and usuario.is_authenticated:
+        for pk, en_biblioteca, en_carrito in _consulta_estado(usuario, faltantes):
+            conocidos[pk] = (en_biblioteca, en_carrito)
+    return {pk: conocidos.get(pk, (False, False)) for pk in ids}
+
+
+async def aestado_productos(usuario, ids):
+    """
+    estado_productos() con el ORM asíncrono.
+    """
+    conocidos = usuario.__dict__.setdefault('_estado_productos', {})
+    faltantes = [pk for pk in ids if pk not in conocidos]
+    if faltantes and usuario.is_authenticated:
+        async for pk, en_biblioteca, en_carrito in _consulta_estado(usuario, faltantes):
+            conocidos[pk] = (en_biblioteca, en_carrito)
+    return {pk: conocidos.get(pk, (False, False)) for pk in ids}
+
@@ -0,0 +1,79 @@
+# ================================
+# VERSIÓN DEL CATÁLOGO
+# ================================
+# Número que aumenta cada vez que cambia un Producto o un Proveedor (ver
+# senales.py). Vive en la caché de Django para que todos los procesos que
+# comparten el backend de caché vean el mismo valor.
+#
+# Si la clave desaparece (caché nueva, reiniciada o que la desalojó) se retoma
+# desde el reloj en nanosegundos y no desde 1: así nunca vuelve a un número ya
+# usado y las páginas y fragmentos guardados con versiones anteriores no
+# vuelven a ser vigentes.
+#
+# Además de la versión se guarda, por cada incremento, qué objeto cambió
+# ("catalogo:cambio:<n>" → ('producto', id)). Así los índices en memoria
+# (autocompletar.py) pueden actualizarse solo con lo que cambió.
+
+import time
+
+from django.core.cache import cache
+
+CLAVE_VERSION = 'catalogo:version'
+PREFIJO_CAMBIO = 'catalogo:cambio:'
+TTL_CAMBIOS = 60 * 60 * 24          # Segundos que se conserva el registro de cambios
+
+
+def _inicial():
+    return time.time_ns()
+
+
+def actual():
+    """
+    Versión vigente del catálogo.
+    """
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        inicial = _inicial()
+        cache.add(CLAVE_VERSION, inicial, timeout=None)  # Si otro proceso la creó primero, gana la suya
+        version = cache.get(CLAVE_VERSION, inicial)
+    return version
+
+
+async def aactual():
+    """
+    actual() con las llamadas asíncronas de la caché.
+    """
+    version = await cache.aget(CLAVE_VERSION)
+    if version is None:
+        inicial = _inicial()
+        await cache.aadd(CLAVE_VERSION, inicial, timeout=None)
+        version = await cache.aget(CLAVE_VERSION, inicial)
+    return version
+
+
+def incrementar(tipo=None, pk=None):
+    """
+    Aumenta la versión y registra qué objeto cambió. Devuelve la nueva versión.
+    """
+    try:
+        version = cache.incr(CLAVE_VERSION)
+    except ValueError:
+        # La clave no existía (caché vacía o expulsada): se vuelve a crear desde el reloj
+        actual()
+        version = cache.incr(CLAVE_VERSION)
+    if tipo is not None:
+        cache.set(f'{PREFIJO_CAMBIO}{version}', (tipo, pk), TTL_CAMBIOS)
+    return version
+
+
+def cambios(desde, hasta):
+    """
+    Objetos que cambiaron entre 'desde' (exclusivo) y 'hasta' (inclusivo)
+    como conjunto de (tipo, id). None si falta algún registro y hay que
+    reconstruir todo.
+    """
+    claves = [f'{PREFIJO_CAMBIO}{n}' for n in range(desde + 1, hasta + 1)]
+    registros = cache.get_many(claves)
+    if len(registros) != len(claves):
+        return None
+    return set(registros.values())
@@ -2,21 +2,39 @@
 # IMPORTACIONES Y UTILIDADES
 # ================================
 
-from decimal import Decimal  # Para operaciones de dinero (precios y totales)
 from django.shortcuts import render, redirect, get_object_or_404  # Renderiza templates, redirige y obtiene objetos o 404
 from django.contrib.auth import login, logout  # Funciones de autenticación
 from django.contrib.auth.decorators import login_required  # Decorador para proteger vistas
 from django.contrib.auth.forms import AuthenticationForm  # Formulario de login por defecto de Django
 from django.contrib import messages  # Mensajes flash para notificaciones al usuario
-from django.utils import timezone  # Manejo de fechas y horas con zona horaria
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth import update_session_auth_hash
-
-from .forms import RegistroForm, CuentaForm, ProveedorForm, ProductoForm, UsuarioForm, AgregarCreditoForm, DevolucionForm
-from .models import Producto, Proveedor, Compra, Usuario
+from django.db import transaction  # Agrupa escrituras relacionadas en una sola transacción
+from django.http import HttpResponse, JsonResponse  # Respuestas JSON (autocompletado) y texto (métricas)
+from django.utils.cache import patch_cache_control  # Encabezados Cache-Control
+from asgiref.sync import sync_to_async  # Saca del event loop lo que solo existe en versión síncrona
+
+from .forms import RegistroForm, CuentaForm, ProveedorForm, ProductoForm, UsuarioForm, AgregarCreditoForm, DevolucionForm, FiltroCatalogoForm, FiltroBibliotecaForm
+from .models import Producto, Proveedor, Compra, Usuario, CarritoItem, BibliotecaItem
+from . import catalogo  # Consultas paginadas del catálogo de la tienda
+from .carrito import resolver_carrito  # Cotización del carrito en una sola consulta
+from .pagos import procesar_compra, ErrorCompra, CarritoVacio, CreditoInsuficiente, CarritoModificado
+from .idempotencia import idempotente, nueva_clave  # Evita compras/recargas duplicadas por reintentos
+from . import saldo  # Movimientos del crédito (libro mayor + saldo en caché)
+from . import historial  # Historial paginado y exportación de compras
+from . import biblioteca  # Biblioteca paginada del usuario
+from . import imagenes  # Derivados (miniaturas) de las imágenes de producto
+from . import busqueda  # Búsqueda de texto completo (FTS5)
+from . import autocompletar as autocompletar_prefijos  # Índice de prefijos en memoria
+from . import cache_catalogo, version_catalogo  # Caché del catálogo invalidada por versión
+from . import condicional  # ETag / Last-Modified de las páginas de detalle
+from . import usuarios  # Usuario ligero de la sesión y estado biblioteca/carrito por petición
+from .basedatos import solo_lectura  # Vistas que leen por la conexión 'lectura'
+from . import metricas as registro_metricas  # Contadores de negocio y exposición Prometheus
 
 from django.contrib.auth.decorators import user_passes_test  # Decorador para permisos de superusuario
 from django.views.decorators.csrf import csrf_exempt  # Permite deshabilitar CSRF en ciertas vistas
+from django.views.decorators.http import condition  # Respuestas 304 con ETag / Last-Modified
 
 # ============================================
 # Decorador para proteger vistas de superusuarios
@@ -39,7 +57,7 @@ def superuser_required(view_func):
 @superuser_required
 def proveedor_list(request):
     proveedores = Proveedor.objects.all()
-    return render(request, 'App_GameVerse/CRUD/proveedor_list.html', {'proveedores': proveedores})
+    return render(request, 'App_GameVerse/crud/proveedor_list.html', {'proveedores': proveedores})
 
 # Crear proveedor
 @csrf_exempt  # Evita error CSRF (no recomendado en producción)
@@ -53,7 +71,7 @@ def proveedor_create(request):
             return redirect('App_GameVerse:proveedor_list')
     else:
         form = ProveedorForm()
-    return render(request, 'App_GameVerse/CRUD/proveedor_form.html', {'form': form})
+    return render(request, 'App_GameVerse/crud/proveedor_form.html', {'form': form})
 
 # Actualizar proveedor
 @csrf_exempt
@@ -68,7 +86,7 @@ def proveedor_update(request, pk):
             return redirect('App_GameVerse:proveedor_list')
     else:
         form = ProveedorForm(instance=proveedor)
-    return render(request, 'App_GameVerse/CRUD/proveedor_form.html', {'form': form})
+    return render(request, 'App_GameVerse/crud/proveedor_form.html', {'form': form})
 
 # Eliminar proveedor
 @csrf_exempt
@@ -81,7 +99,7 @@ def proveedor_delete(request, pk):
         messages.success(request, "Proveedor eliminado correctamente.")
         return redirect('App_GameVerse:proveedor_list')
 
-    return render(request, 'App_GameVerse/CRUD/proveedor_confirm_delete.html', {
+    return render(request, 'App_GameVerse/crud/proveedor_confirm_delete.html', {
         'proveedor': proveedor
     })
 
@@ -92,8 +110,8 @@ def proveedor_delete(request, pk):
 # Lista todos los productos
 @superuser_required
 def producto_list(request):
-    productos = Producto.objects.all()
-    return render(request, 'App_GameVerse/CRUD/producto_list.html', {'productos': productos})
+    productos = Producto.objects.select_related('proveedor')  # La tabla muestra el proveedor de cada fila
+    return render(request, 'App_GameVerse/crud/producto_list.html', {'productos': productos})
 
 # Crear producto
 @csrf_exempt
@@ -102,12 +120,14 @@ def producto_create(request):
     if request.method == 'POST':
         form = ProductoForm(request.POST, request.FILES)
         if form.is_valid():
-            form.save()
+            producto = form.save()
+            if producto.imagen:
+                imagenes.generar_derivados_producto.encolar(producto.pk)  # Miniaturas WebP/JPEG en segundo plano
             messages.success(request, "Producto creado exitosamente.")
             return redirect('App_GameVerse:producto_list')
     else:
         form = ProductoForm()
-    return render(request, 'App_GameVerse/CRUD/producto_form.html', {'form': form})
+    return render(request, 'App_GameVerse/crud/producto_form.html', {'form': form})
 
 # Actualizar producto
 @csrf_exempt
@@ -117,12 +137,14 @@ def producto_update(request, pk):
     if request.method == 'POST':
         form = ProductoForm(request.POST, request.FILES, instance=producto)
         if form.is_valid():
-            form.save()
+            producto = form.save()
+            if 'imagen' in form.changed_data:
+                imagenes.generar_derivados_producto.encolar(producto.pk)  # Regenera miniaturas solo si cambió la imagen
             messages.success(request, "Producto actualizado correctamente.")
             return redirect('App_GameVerse:producto_list')
     else:
         form = ProductoForm(instance=producto)
-    return render(request, 'App_GameVerse/CRUD/producto_form.html', {'form': form})
+    return render(request, 'App_GameVerse/crud/producto_form.html', {'form': form})
 
 # Eliminar producto
 @csrf_exempt
@@ -135,7 +157,7 @@ def producto_delete(request, pk):
         messages.success(request, "Producto eliminado correctamente.")
         return redirect('App_GameVerse:producto_list')
 
-    return render(request, 'App_GameVerse/CRUD/producto_confirm_delete.html', {
+    return render(request, 'App_GameVerse/crud/producto_confirm_delete.html', {
         'producto': producto
     })
 
@@ -147,7 +169,7 @@ def producto_delete(request, pk):
 @superuser_required
 def usuario_list(request):
     usuarios = Usuario.objects.all()
-    return render(request, 'App_GameVerse/CRUD/usuario_list.html', {'usuarios': usuarios})
+    return render(request, 'App_GameVerse/crud/usuario_list.html', {'usuarios': usuarios})
 
 # Crear usuario
 @csrf_exempt
@@ -161,7 +183,7 @@ def usuario_create(request):
             return redirect('App_GameVerse:usuario_list')
     else:
         form = UsuarioForm()
-    return render(request, 'App_GameVerse/CRUD/usuario_form.html', {'form': form})
+    return render(request, 'App_GameVerse/crud/usuario_form.html', {'form': form})
 
 # Actualizar usuario
 @csrf_exempt
@@ -171,12 +193,13 @@ def usuario_update(request, pk):
     if request.method == 'POST':
         form = UsuarioForm(request.POST, instance=usuario)
         if form.is_valid():
-            form.save()
+            # Solo las columnas del formulario: un save() completo reescribiría 'credito' con el valor leído al inicio
+            form.save(commit=False).save(update_fields=form._meta.fields)
             messages.success(request, "Usuario actualizado correctamente.")
             return redirect('App_GameVerse:usuario_list')
     else:
         form = UsuarioForm(instance=usuario)
-    return render(request, 'App_GameVerse/CRUD/usuario_form.html', {'form': form})
+    return render(request, 'App_GameVerse/crud/usuario_form.html', {'form': form})
 
 # Eliminar usuario
 @csrf_exempt
@@ -189,14 +212,51 @@ def usuario_delete(request, pk):
         messages.success(request, "Usuario eliminado correctamente.")
         return redirect('App_GameVerse:usuario_list')
 
-    return render(request, 'App_GameVerse/CRUD/usuario_confirm_delete.html', {
+    return render(request, 'App_GameVerse/crud/usuario_confirm_delete.html', {
         'usuario': usuario
     })
 
+# =================================================
+# MÉTRICAS (PROMETHEUS)
+# =================================================
+
+# Métricas de todos los procesos en formato de texto de Prometheus.
+# Acepta la sesión de un superusuario o HTTP Basic con sus credenciales (scraper).
+def metricas(request):
+    if not request.user.is_superuser and registro_metricas.superusuario_basic(request) is None:
+        respuesta = HttpResponse("Se requiere un superusuario.", status=401, content_type='text/plain')
+        respuesta['WWW-Authenticate'] = 'Basic realm="metricas"'
+        return respuesta
+    respuesta = HttpResponse(registro_metricas.exponer(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    patch_cache_control(respuesta, no_store=True)
+    return respuesta
+
+
+# Vistas asíncronas: con ASGI no ocupan un hilo mientras esperan a la base de datos
+# o a la caché. Lo que solo existe en versión síncrona (plantillas, validar formularios
+# con ModelChoiceField) se ejecuta con sync_to_async.
+_arender = sync_to_async(render)
+
+
+def _enlaces_cursor(request, pagina):
+    """
+    Enlaces de paginación por cursor conservando los filtros actuales.
+    """
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    enlaces = {'primera_url': f"?{params.urlencode()}" if request.GET.get('cursor') else None}
+    for nombre, cursor in (('anterior_url', pagina.anterior), ('siguiente_url', pagina.siguiente)):
+        enlaces[nombre] = None
+        if cursor:
+            params['cursor'] = cursor
+            enlaces[nombre] = f"?{params.urlencode()}"
+    return enlaces
+
 
 # Página de inicio
-def home(request):
-    return render(request, 'App_GameVerse/index.html')
+async def home(request):
+    await usuarios.acargar(request)
+    return await _arender(request, 'App_GameVerse/index.html')
 
 # Registro de usuarios
 def register_view(request):
@@ -204,7 +264,8 @@ def register_view(request):
         form = RegistroForm(request.POST)
         if form.is_valid():
             user = form.save()
-            login(request, user)
+            # Con dos backends configurados login() necesita saber con cuál queda la sesión
+            login(request, user, backend='App_GameVerse.usuarios.UsuarioLigeroBackend')
             return redirect('App_GameVerse:home')
     else:
         form = RegistroForm()
@@ -243,57 +304,151 @@ def logout_view(request):
 # =============================================
 # TIENDA (CON ESTADO DE CARRITO Y BIBLIOTECA)
 # =============================================
-def tienda(request):
+def _marcar_estado(usuario, productos):
+    """
+    Marca cada producto con ya_en_biblioteca / ya_en_carrito para el usuario.
+    Es una consulta limitada a los ids de la página (ninguna para anónimos).
+    """
+    _aplicar_estado(productos, usuarios.estado_productos(usuario, [p.id for p in productos]))
+
+
+async def _amarcar_estado(usuario, productos):
+    _aplicar_estado(productos, await usuarios.aestado_productos(usuario, [p.id for p in productos]))
+
+
+def _aplicar_estado(productos, estado):
+    # Marcar cada producto si ya está en biblioteca o carrito
+    for p in productos:
+        p.ya_en_biblioteca, p.ya_en_carrito = estado[p.id]
+
+
+@solo_lectura
+async def tienda(request):
     """
-    Muestra todos los productos disponibles en la tienda.
+    Muestra los productos disponibles de la tienda, paginados por cursor.
+    Admite filtros por tipo, género, proveedor y rango de precio, y varios órdenes.
     Indica si ya están en la biblioteca o carrito del usuario.
     """
-    productos = Producto.objects.filter(disponible=True)
+    usuario = await usuarios.acargar(request)
+    form = FiltroCatalogoForm(request.GET or None)
+    # Validar 'proveedor' consulta la base con el ORM síncrono
+    filtros = await sync_to_async(form.filtros)() if form.is_bound else {}
+    orden = request.GET.get('orden') or catalogo.ORDEN_POR_DEFECTO
+    version = await version_catalogo.aactual()
+    # La página es igual para todos; el estado del usuario se marca encima
+    pagina = await cache_catalogo.apagina_tienda(orden, request.GET.get('cursor'), filtros, version)
+    productos = pagina.productos
+
+    await _amarcar_estado(usuario, productos)
+
+    return await _arender(request, 'App_GameVerse/tienda.html', {
+        'productos': productos,
+        'form': form if form.is_bound else FiltroCatalogoForm(),
+        **_enlaces_cursor(request, pagina),
+        'version_catalogo': version,
+        'cache_ttl': cache_catalogo.ttl(),
+    })
 
-    if request.user.is_authenticated:
-        usuario = request.user
-        # IDs de productos en biblioteca y carrito del usuario
-        biblioteca_ids = [p.get('id_producto') for p in usuario.biblioteca]
-        carrito_ids = [c.get('id_producto') for c in usuario.carrito]
 
-        # Marcar cada producto si ya está en biblioteca o carrito
-        for p in productos:
-            p.ya_en_biblioteca = p.id in biblioteca_ids
-            p.ya_en_carrito = p.id in carrito_ids
-    else:
-        # Usuario no autenticado → no tiene productos
-        for p in productos:
-            p.ya_en_biblioteca = False
-            p.ya_en_carrito = False
+# =============================================
+# BÚSQUEDA DE PRODUCTOS
+# =============================================
+def buscar(request):
+    """
+    Búsqueda de texto completo sobre nombre, descripción, género y proveedor.
+    Resultados ordenados por relevancia y paginados por número de página.
+    """
+    texto = request.GET.get('q', '').strip()
+    try:
+        # Mismo tope que busqueda.buscar(): la página mostrada y sus enlaces coinciden con los resultados
+        pagina = max(1, min(int(request.GET.get('pagina', 1)), busqueda.PAGINAS_MAXIMAS))
+    except ValueError:
+        pagina = 1
+
+    productos, hay_siguiente = busqueda.buscar(texto, pagina)
+    _marcar_estado(request.user, productos)
+
+    params = request.GET.copy()
+    anterior_url = siguiente_url = None
+    if pagina > 1:
+        params['pagina'] = pagina - 1
+        anterior_url = f"?{params.urlencode()}"
+    if hay_siguiente:
+        params['pagina'] = pagina + 1
+        siguiente_url = f"?{params.urlencode()}"
+
+    return render(request, 'App_GameVerse/buscar.html', {
+        'q': texto,
+        'productos': productos,
+        'pagina': pagina,
+        'anterior_url': anterior_url,
+        'siguiente_url': siguiente_url,
+        'version_catalogo': version_catalogo.actual(),
+        'cache_ttl': cache_catalogo.ttl(),
+    })
 
-    return render(request, 'App_GameVerse/tienda.html', {'productos': productos})
+
+def autocompletar(request):
+    """
+    Sugerencias (JSON) para la caja de búsqueda del navbar.
+    Se resuelven con el índice en memoria, sin consultar la BD en cada tecla.
+    """
+    try:
+        k = int(request.GET.get('k', autocompletar_prefijos.RESULTADOS))
+    except ValueError:
+        k = autocompletar_prefijos.RESULTADOS
+
+    respuesta = JsonResponse({'resultados': autocompletar_prefijos.sugerencias(request.GET.get('q', ''), k)})
+    patch_cache_control(respuesta, public=True, max_age=30)
+    return respuesta
 
 
 # =============================================
 # DETALLE PRODUCTO (CON ESTADOS)
 # =============================================
-def producto_detalle(request, pk):
+async def _aproducto_con_estado(request, pk):
     """
-    Vista del detalle de un producto individual.
-    Muestra si ya está en biblioteca o carrito.
+    Producto (desde la caché del catálogo) marcado con el estado del usuario.
+    Se guarda en el request para que el ETag y la vista no repitan consultas.
     """
-    producto = get_object_or_404(Producto, pk=pk)
+    producto = await cache_catalogo.aproducto(pk)
+    await _amarcar_estado(request.user, [producto])
+    request._producto_detalle = producto
 
-    if request.user.is_authenticated:
-        usuario = request.user
-        biblioteca_ids = [p.get('id_producto') for p in usuario.biblioteca]
-        carrito_ids = [c.get('id_producto') for c in usuario.carrito]
 
-        producto.ya_en_biblioteca = producto.id in biblioteca_ids
-        producto.ya_en_carrito = producto.id in carrito_ids
-    else:
-        producto.ya_en_biblioteca = False
-        producto.ya_en_carrito = False
+# condition() llama a estas funciones de forma síncrona: leen lo ya precargado en el request
+@condicional.sin_mensajes
+def _etag_producto(request, pk):
+    producto = request._producto_detalle
+    return condicional.etag(
+        'producto', producto.pk, producto.actualizado.isoformat(),
+        producto.ya_en_biblioteca, producto.ya_en_carrito, *condicional.firma_usuario(request),
+    )
+
+
+@condicional.sin_mensajes
+def _modificado_producto(request, pk):
+    return condicional.solo_anonimos(request, request._producto_detalle.actualizado)
+
+
+@condition(etag_func=_etag_producto, last_modified_func=_modificado_producto)
+async def _producto_detalle(request, pk):
+    return await _arender(request, 'App_GameVerse/detalle_producto.html', {'producto': request._producto_detalle})
 
-    return render(request, 'App_GameVerse/detalle_producto.html', {'producto': producto})
+
+@solo_lectura
+async def producto_detalle(request, pk):
+    """
+    Vista del detalle de un producto individual.
+    Muestra si ya está en biblioteca o carrito.
+    Responde 304 si el cliente ya tiene la página vigente (ver condicional.py).
+    """
+    await usuarios.acargar(request)
+    await _aproducto_con_estado(request, pk)
+    return await _producto_detalle(request, pk)
 
 # =======================================================
-# CARRITO (almacenado en usuario.carrito)
+# CARRITO (almacenado en CarritoItem)
 # =======================================================
 
 @login_required
@@ -305,26 +460,18 @@ def agregar_al_carrito(request, pk):
     producto = get_object_or_404(Producto, pk=pk)
     usuario = request.user
 
-    biblioteca = usuario.biblioteca or []
-    carrito = usuario.carrito or []
-
     # Producto ya en biblioteca
-    if any(item.get('id_producto') == producto.id for item in biblioteca):
+    if usuario.items_biblioteca.filter(producto=producto).exists():
         messages.warning(request, "Ya tienes este producto en tu biblioteca.")
         return redirect('App_GameVerse:producto_detalle', pk=pk)
 
-    # Producto ya en carrito
-    if any(item.get('id_producto') == producto.id for item in carrito):
-        messages.info(request, "Este producto ya está en tu carrito.")
-    else:
-        carrito.append({
-            'id_producto': producto.id,
-            'nombre': producto.nombre,
-            'precio': float(producto.precio)
-        })
-        usuario.carrito = carrito
-        usuario.save()
+    # Inserta una sola fila; la restricción única evita duplicados en el carrito
+    _, creado = CarritoItem.objects.get_or_create(usuario=usuario, producto=producto)
+    if creado:
+        registro_metricas.CARRITO_AGREGADOS.incrementar()
         messages.success(request, f"{producto.nombre} ha sido agregado al carrito.")
+    else:
+        messages.info(request, "Este producto ya está en tu carrito.")
 
     return redirect('App_GameVerse:carrito_view')
 
@@ -335,42 +482,16 @@ def carrito_view(request):
     Vista del carrito del usuario.
     Calcula subtotal, IVA y total.
     """
-    usuario = request.user
-    carrito = usuario.carrito or []
-
-    items = []
-    subtotal = Decimal('0.00')
-
-    for entry in carrito:
-        pid = entry.get('id_producto')
-        if not pid:
-            continue
-
-        producto = get_object_or_404(Producto, pk=pid)
-
-        # precio en carrito, o precio del producto
-        price = Decimal(str(entry.get('precio', producto.precio)))
-
-        items.append({
-            'id_producto': producto.id,
-            'producto': producto,
-            'precio': price,
-            'subtotal': price
-        })
-
-        subtotal += price
+    resumen = resolver_carrito(request.user)
 
-    # -------------------------
-    #        IVA 16%
-    # -------------------------
-    iva = subtotal * Decimal("0.16")
-    total_con_iva = subtotal + iva
+    for producto in resumen.descartados:
+        messages.warning(request, f"{producto.nombre} ya no está disponible y no se incluirá en tu compra.")
 
     return render(request, 'App_GameVerse/carrito.html', {
-        'items': items,
-        'subtotal': subtotal,
-        'iva': iva,
-        'total': total_con_iva       # importante: tu plantilla usa "total"
+        'items': resumen.lineas,
+        'subtotal': resumen.subtotal,
+        'iva': resumen.iva,         # IVA 16%
+        'total': resumen.total       # importante: tu plantilla usa "total"
     })
 
 
@@ -381,34 +502,44 @@ def eliminar_del_carrito(request, item_id):
     Elimina un producto del carrito del usuario.
     """
     usuario = request.user
-    carrito = usuario.carrito or []
 
-    item_id = int(item_id)
-    # Filtra todos los productos excepto el que se elimina
-    nuevo_carrito = [entry for entry in carrito if entry.get('id_producto') != item_id]
-
-    usuario.carrito = nuevo_carrito
-    usuario.save()
+    # Borra solo la fila del producto indicado
+    usuario.items_carrito.filter(producto_id=item_id).delete()
 
     messages.success(request, "Producto eliminado del carrito.")
     return redirect('App_GameVerse:carrito_view')
 
+def _cobrar_carrito(request, metodo_pago, mensaje_exito):
+    """
+    Ejecuta el motor de compra y traduce su resultado a mensajes y redirecciones.
+    """
+    try:
+        procesar_compra(request.user, metodo_pago)
+    except (CarritoVacio, CreditoInsuficiente, CarritoModificado) as error:
+        messages.error(request, str(error))
+        return redirect('App_GameVerse:carrito_view')
+    except ErrorCompra as error:
+        messages.warning(request, str(error))
+    else:
+        messages.success(request, mensaje_exito)
+
+    return redirect('App_GameVerse:biblioteca')
+
 @login_required
+@idempotente
 def comprar_carrito(request):
     """
     Procesa la compra de todos los productos en el carrito.
     Permite pagar con Tarjeta, Crédito o Efectivo.
     """
     usuario = request.user
-    carrito = usuario.carrito or []
+    carrito = resolver_carrito(usuario)
 
     if not carrito:
         messages.warning(request, "Tu carrito está vacío.")
         return redirect('App_GameVerse:carrito_view')
 
-    subtotal = sum(Decimal(str(item.get('precio', 0))) for item in carrito)
-    iva = subtotal * Decimal("0.16")
-    total = subtotal + iva
+    total = carrito.total
 
     from .forms import MetodoPagoForm
 
@@ -416,11 +547,6 @@ def comprar_carrito(request):
         form = MetodoPagoForm(request.POST)
         if form.is_valid():
             metodo_pago = form.cleaned_data['metodo_pago']
-            request.session['metodo_pago'] = metodo_pago
-            request.session['total_carrito'] = str(total)
-
-            biblioteca = usuario.biblioteca or []
-            detalles = []
 
             # PAGO CON TARJETA → redirige a la vista de pago con tarjeta
             if metodo_pago == "Tarjeta":
@@ -428,192 +554,144 @@ def comprar_carrito(request):
 
             # PAGO CON CRÉDITO
             elif metodo_pago == "Credito":
-                if usuario.credito < total:
-                    messages.error(request, "No tienes suficiente crédito para realizar esta compra.")
-                    return redirect('App_GameVerse:carrito_view')
-
-                usuario.credito -= total
-
-                for entry in carrito:
-                    pid = entry.get('id_producto')
-                    if not pid:
-                        continue
-                    producto = get_object_or_404(Producto, pk=pid)
-                    if any(p.get('id_producto') == producto.id for p in biblioteca):
-                        continue
-                    detalles.append({'id_producto': producto.id, 'nombre': producto.nombre})
-                    biblioteca.append({
-                        'id_producto': producto.id,
-                        'nombre': producto.nombre,
-                        'fecha_compra': timezone.now().strftime('%Y-%m-%d %H:%M')
-                    })
-
-                if detalles:
-                    Compra.objects.create(
-                        usuario=usuario,
-                        detalles_productos=detalles,
-                        total=total,
-                        metodo_pago="Credito",
-                        estatus="Completada"
-                    )
-                    usuario.biblioteca = biblioteca
-                    usuario.carrito = []
-                    usuario.save()
-                    messages.success(request, "Compra realizada con crédito.")
-                else:
-                    messages.warning(request, "Todos los productos del carrito ya están en tu biblioteca.")
-
-                return redirect('App_GameVerse:biblioteca')
+                return _cobrar_carrito(request, "Credito", "Compra realizada con crédito.")
 
             # PAGO CON EFECTIVO
             elif metodo_pago == "Efectivo":
-                for entry in carrito:
-                    pid = entry.get('id_producto')
-                    if not pid:
-                        continue
-                    producto = get_object_or_404(Producto, pk=pid)
-                    if any(p.get('id_producto') == producto.id for p in biblioteca):
-                        continue
-                    detalles.append({'id_producto': producto.id, 'nombre': producto.nombre})
-                    biblioteca.append({
-                        'id_producto': producto.id,
-                        'nombre': producto.nombre,
-                        'fecha_compra': timezone.now().strftime('%Y-%m-%d %H:%M')
-                    })
-
-                if detalles:
-                    Compra.objects.create(
-                        usuario=usuario,
-                        detalles_productos=detalles,
-                        total=total,
-                        metodo_pago="Efectivo",
-                        estatus="Completada"
-                    )
-                    usuario.biblioteca = biblioteca
-                    usuario.carrito = []
-                    usuario.save()
-                    messages.success(request, "Has comprado todos los productos del carrito con efectivo.")
-                else:
-                    messages.warning(request, "Todos los productos del carrito ya están en tu biblioteca.")
-
-                return redirect('App_GameVerse:biblioteca')
+                return _cobrar_carrito(request, "Efectivo", "Has comprado todos los productos del carrito con efectivo.")
 
     else:
         form = MetodoPagoForm()
 
     return render(request, 'App_GameVerse/seleccionar_metodo_pago.html', {
         'form': form,
-        'total': total
+        'total': total,
+        'clave_idempotencia': nueva_clave()
     })
 
 @login_required
+@idempotente
 def pago_tarjeta(request):
     """
     Procesa la compra del carrito mediante tarjeta (simulado).
     """
     usuario = request.user
-    carrito = usuario.carrito or []
+    carrito = resolver_carrito(usuario)
 
     if not carrito:
         messages.warning(request, "Tu carrito está vacío.")
         return redirect('App_GameVerse:carrito_view')
 
-    total = sum(Decimal(str(item.get('precio', 0))) for item in carrito)
+    total = carrito.total
 
     from .forms import PagoTarjetaForm
 
     if request.method == 'POST':
         form = PagoTarjetaForm(request.POST)
         if form.is_valid():
-            biblioteca = usuario.biblioteca or []
-            detalles = []
-
-            for entry in carrito:
-                pid = entry.get('id_producto')
-                if not pid:
-                    continue
-                producto = get_object_or_404(Producto, pk=pid)
-                if any(p.get('id_producto') == producto.id for p in biblioteca):
-                    continue
-                detalles.append({'id_producto': producto.id, 'nombre': producto.nombre})
-                biblioteca.append({
-                    'id_producto': producto.id,
-                    'nombre': producto.nombre,
-                    'fecha_compra': timezone.now().strftime('%Y-%m-%d %H:%M')
-                })
-
-            if detalles:
-                Compra.objects.create(
-                    usuario=usuario,
-                    detalles_productos=detalles,
-                    total=total,
-                    metodo_pago="Tarjeta",
-                    estatus="Completada"
-                )
-                usuario.biblioteca = biblioteca
-                usuario.carrito = []
-                usuario.save()
-                messages.success(request, "Has comprado todos los productos del carrito con tarjeta.")
-            else:
-                messages.warning(request, "Todos los productos del carrito ya están en tu biblioteca.")
-
-            return redirect('App_GameVerse:biblioteca')
+            return _cobrar_carrito(request, "Tarjeta", "Has comprado todos los productos del carrito con tarjeta.")
     else:
         form = PagoTarjetaForm()
 
     return render(request, 'App_GameVerse/pago_tarjeta.html', {
         'form': form,
-        'total': total
+        'total': total,
+        'clave_idempotencia': nueva_clave()
     })
 
-# Detalle de un proveedor y sus productos
-def proveedor_detalle(request, pk):
-    proveedor = get_object_or_404(Proveedor, pk=pk)
-    productos = proveedor.productos.filter(disponible=True)
-    return render(request, 'App_GameVerse/proveedor.html', {
+# Datos de la página de un proveedor (caché del catálogo), guardados en el request
+async def _apagina_proveedor(request, pk):
+    version = await version_catalogo.aactual()
+    request._pagina_proveedor = (version,) + tuple(await cache_catalogo.apagina_proveedor(pk, version))
+
+
+# La página cambia si cambia el proveedor o cualquiera de sus productos visibles
+def _ultimo_cambio_proveedor(request, pk):
+    _, proveedor, productos = request._pagina_proveedor
+    return max([proveedor.actualizado] + [p.actualizado for p in productos])
+
+
+@condicional.sin_mensajes
+def _etag_proveedor(request, pk):
+    _, proveedor, productos = request._pagina_proveedor
+    return condicional.etag(
+        'proveedor', proveedor.pk, _ultimo_cambio_proveedor(request, pk).isoformat(),
+        tuple(p.pk for p in productos), *condicional.firma_usuario(request),
+    )
+
+
+@condicional.sin_mensajes
+def _modificado_proveedor(request, pk):
+    return condicional.solo_anonimos(request, _ultimo_cambio_proveedor(request, pk))
+
+
+@condition(etag_func=_etag_proveedor, last_modified_func=_modificado_proveedor)
+async def _proveedor_detalle(request, pk):
+    version, proveedor, productos = request._pagina_proveedor
+    return await _arender(request, 'App_GameVerse/proveedor.html', {
         'proveedor': proveedor,
-        'productos': productos
+        'productos': productos,
+        'version_catalogo': version,
+        'cache_ttl': cache_catalogo.ttl(),
     })
 
-# Vista de la biblioteca del usuario
-@login_required
-def biblioteca_view(request):
-    user = request.user
 
-    biblioteca = user.biblioteca or []
-    productos = []
-
-    for item in biblioteca:
-        id_prod = item.get("id_producto")
-        if not id_prod:
-            continue
-
-        try:
-            producto = Producto.objects.get(pk=id_prod)
-            productos.append({
-                "producto": producto,
-                "fecha_compra": item.get("fecha_compra"),
-            })
-        except Producto.DoesNotExist:
-            continue
-
-    return render(request, "App_GameVerse/biblioteca.html", {
-        "productos": productos
+# Detalle de un proveedor y sus productos (304 si el cliente ya tiene la página vigente)
+@solo_lectura
+async def proveedor_detalle(request, pk):
+    await usuarios.acargar(request)
+    await _apagina_proveedor(request, pk)
+    return await _proveedor_detalle(request, pk)
+
+# Vista de la biblioteca del usuario (paginada, con filtros por tipo y género)
+@solo_lectura
+@login_required
+async def biblioteca_view(request):
+    user = await usuarios.acargar(request)
+
+    form = FiltroBibliotecaForm(request.GET or None)
+    filtros = form.filtros() if form.is_bound else {}
+    pagina = await biblioteca.apagina_biblioteca(user, cursor=request.GET.get('cursor'), **filtros)
+
+    # Cada item expone .producto y .fecha_compra, igual que espera la plantilla
+    return await _arender(request, "App_GameVerse/biblioteca.html", {
+        "productos": pagina.productos,
+        "form": form if form.is_bound else FiltroBibliotecaForm(),
+        **_enlaces_cursor(request, pagina),
     })
 
-# Historial de compras del usuario
+# Historial de compras del usuario (paginado por cursor)
+@solo_lectura
 @login_required
 def compras_view(request):
     usuario = request.user
-    compras = Compra.objects.filter(usuario=usuario).order_by('-fecha_compra')
-    return render(request, 'App_GameVerse/compras.html', {'compras': compras})
+    pagina = historial.pagina_compras(usuario, cursor=request.GET.get('cursor'))
+
+    siguiente_url = f"?cursor={pagina.siguiente}" if pagina.siguiente else None
+    return render(request, 'App_GameVerse/compras.html', {
+        'compras': pagina.productos,
+        'siguiente_url': siguiente_url,
+        'es_primera_pagina': not request.GET.get('cursor'),
+    })
+
+# Exporta las compras en CSV o JSONL (streaming)
+@login_required
+def exportar_compras(request):
+    """
+    Usuarios: exportan sus propias compras.
+    Superusuarios: con ?todos=1 exportan las compras de todos los usuarios.
+    """
+    formato = request.GET.get('formato', 'csv')
+    if request.user.is_superuser and request.GET.get('todos'):
+        return historial.exportar(Compra.objects.all(), formato, 'compras_gameverse')
+    return historial.exportar(Compra.objects.filter(usuario=request.user), formato, 'mis_compras')
 
 @login_required
 def cuenta(request):
     """
     Permite al usuario actualizar o eliminar su cuenta.
     """
-    usuario = request.user
+    usuario = usuarios.completar(request.user)  # El formulario usa columnas que la sesión no carga
 
     if request.method == 'POST':
         if 'eliminar' in request.POST:
@@ -623,7 +701,7 @@ def cuenta(request):
 
         form = CuentaForm(request.POST, instance=usuario)
         if form.is_valid():
-            form.save()
+            form.save(commit=False).save(update_fields=form._meta.fields)  # Sin 'credito' (ver usuario_update)
             messages.success(request, "Tu cuenta ha sido actualizada correctamente.")
             return redirect('App_GameVerse:cuenta')
     else:
@@ -648,6 +726,7 @@ def comprar_carrito_tarjeta(request):
 # FUNCIONES DEL CREDITO
 # =================================================
 @login_required
+@idempotente
 def credito(request):
     """
     Permite agregar crédito al usuario desde un formulario.
@@ -656,15 +735,18 @@ def credito(request):
         form = AgregarCreditoForm(request.POST)
         if form.is_valid():
             monto = form.cleaned_data['credito']
-            usuario = request.user
-            usuario.credito += Decimal(monto)
-            usuario.save()
+            saldo.abonar(request.user, monto, 'Recarga')
+            registro_metricas.RECARGAS.incrementar()
+            registro_metricas.RECARGAS_MONTO.incrementar(cantidad=monto)
             messages.success(request, f"Se han agregado ${monto} a tu crédito.")
             return redirect("App_GameVerse:tienda")
     else:
         form = AgregarCreditoForm()
 
-    return render(request, "App_GameVerse/credito.html", {"form": form})
+    return render(request, "App_GameVerse/credito.html", {
+        "form": form,
+        "clave_idempotencia": nueva_clave()
+    })
 
 @login_required
 def devolver_producto(request, producto_id):
@@ -673,25 +755,27 @@ def devolver_producto(request, producto_id):
     producto = get_object_or_404(Producto, pk=producto_id)
 
     # Validar que el producto esté en la biblioteca
-    biblioteca = user.biblioteca or []
-    entrada = next((item for item in biblioteca if item["id_producto"] == producto_id), None)
+    entrada = user.items_biblioteca.filter(producto=producto).first()
 
     if not entrada:
-        return render(request, "App_GameVerse/error.html", {
-            "mensaje": "Este producto no está en tu biblioteca."
-        })
+        return _no_esta_en_biblioteca(request)
 
     if request.method == "POST":
         metodo = request.POST.get("metodo")
 
-        # Eliminar de la biblioteca
-        nueva_biblio = [item for item in biblioteca if item["id_producto"] != producto_id]
-        user.biblioteca = nueva_biblio
-
         # Reembolso como crédito
         if metodo == "credito":
-            user.credito += producto.precio
-            user.save()
+            with transaction.atomic():
+                # Borrado condicional: dos envíos a la vez leen la misma entrada,
+                # pero solo el que la borra de verdad reembolsa
+                borradas, _ = BibliotecaItem.objects.filter(pk=entrada.pk).delete()
+                if borradas == 1:
+                    # El abono lo hace el worker; se encola en la misma transacción que la devolución
+                    saldo.reembolsar.encolar(user.pk, producto.pk, str(producto.precio))
+            if borradas != 1:
+                return _no_esta_en_biblioteca(request)
+            registro_metricas.DEVOLUCIONES.incrementar('credito')
+            messages.success(request, f"Devolviste {producto.nombre}. El reembolso se abonará a tu crédito en unos momentos.")
             return redirect("App_GameVerse:biblioteca")
 
         # Reembolso a tarjeta
@@ -702,7 +786,10 @@ def devolver_producto(request, producto_id):
 
             # Aquí NO hacemos transacciones reales.
             # Solo simularíamos que se enviará un depósito.
-            user.save()
+            borradas, _ = BibliotecaItem.objects.filter(pk=entrada.pk).delete()  # Ver reembolso como crédito
+            if borradas != 1:
+                return _no_esta_en_biblioteca(request)
+            registro_metricas.DEVOLUCIONES.incrementar('tarjeta')
             return redirect("App_GameVerse:biblioteca")
 
     return render(request, "App_GameVerse/devolver_producto.html", {
@@ -710,12 +797,19 @@ def devolver_producto(request, producto_id):
     })
 
 
+def _no_esta_en_biblioteca(request):
+    return render(request, "App_GameVerse/error.html", {
+        "mensaje": "Este producto no está en tu biblioteca."
+    })
+
+
 @login_required
 def cambiar_contrasena(request):
     if request.method == "POST":
         form = PasswordChangeForm(request.user, request.POST)
         if form.is_valid():
-            user = form.save()
+            user = form.save(commit=False)
+            user.save(update_fields=['password'])  # Sin 'credito' (ver usuario_update)
             update_session_auth_hash(request, user)  # Mantener sesión después de cambiar contraseña
             messages.success(request, "Tu contraseña se ha actualizado correctamente.")
             return redirect("App_GameVerse:cuenta")
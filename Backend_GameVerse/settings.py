@@ -1,3 +1,5 @@
+import os
+from datetime import timedelta
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -18,8 +20,19 @@ INSTALLED_APPS = [
 
 AUTH_USER_MODEL = 'App_GameVerse.Usuario'
 
+# El usuario de cada petición se carga solo con las columnas que usan sesión y navbar
+# (ver App_GameVerse/usuarios.py). ModelBackend sigue en la lista para que las sesiones
+# iniciadas antes de este cambio no se cierren; se migran solas al volver a iniciar sesión.
+AUTHENTICATION_BACKENDS = [
+    'App_GameVerse.usuarios.UsuarioLigeroBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 MIDDLEWARE = [
+    'App_GameVerse.instrumentacion.InstrumentacionMiddleware',  # Server-Timing y log de lentas (si hay muestreo)
+    'App_GameVerse.metricas.MetricasMiddleware',  # Latencia y consultas por ruta para /metrics/
     'django.middleware.security.SecurityMiddleware',
+    'App_GameVerse.estaticos.EstaticosMiddleware',  # Sirve STATIC_ROOT con caché inmutable y .gz/.br (solo sin DEBUG)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -32,7 +45,7 @@ ROOT_URLCONF = 'Backend_GameVerse.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'App_GameVerse.instrumentacion.PlantillasMedidas',  # DjangoTemplates + tiempo de render
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -48,12 +61,49 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'Backend_GameVerse.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Base de datos. GAMEVERSE_SQLITE elige el perfil:
+#   'produccion' (por defecto): cada conexión nueva aplica SQLITE_PRAGMAS (WAL, synchronous=NORMAL, busy_timeout,
+#       mmap, caché de páginas); las transacciones de escritura abren con BEGIN IMMEDIATE, así esperan el bloqueo
+#       en vez de fallar con "database is locked" al pasar de lectura a escritura. Las vistas de solo lectura usan
+#       la conexión 'lectura' (query_only) y el resto 'default' (ver App_GameVerse/basedatos.py).
+#   'simple': la configuración de SQLite que trae Django, una sola conexión.
+# GAMEVERSE_DB cambia la ruta del archivo (por defecto db.sqlite3).
+_DB = os.environ.get('GAMEVERSE_DB', str(BASE_DIR / 'db.sqlite3'))
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode = WAL;'          # Los lectores no bloquean al escritor ni al revés
+    'PRAGMA synchronous = NORMAL;'        # Con WAL solo arriesga la última transacción ante un corte de luz
+    'PRAGMA busy_timeout = 5000;'         # Milisegundos que se espera un bloqueo antes de fallar
+    'PRAGMA mmap_size = 268435456;'       # 256 MB leídos por mmap en vez de read()
+    'PRAGMA cache_size = -65536;'         # 64 MB de caché de páginas por conexión
+    'PRAGMA temp_store = MEMORY;'
+    'PRAGMA foreign_keys = ON;'
+)
+if os.environ.get('GAMEVERSE_SQLITE', 'produccion') == 'produccion':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': _DB,
+            'OPTIONS': {'init_command': SQLITE_PRAGMAS, 'transaction_mode': 'IMMEDIATE', 'timeout': 5},
+            'CONN_MAX_AGE': 600,          # Conexiones persistentes: los PRAGMA se aplican una vez por conexión
+            'CONN_HEALTH_CHECKS': True,
+        },
+        'lectura': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': _DB,
+            'OPTIONS': {'init_command': SQLITE_PRAGMAS + 'PRAGMA query_only = ON;', 'timeout': 5},
+            'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
+            'TEST': {'MIRROR': 'default'},
+        },
+    }
+    DATABASE_ROUTERS = ['App_GameVerse.basedatos.EnrutadorLectura']
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': _DB,
+        }
     }
-}
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -66,7 +116,100 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'App_GameVerse' / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic: nombres con hash, imágenes optimizadas y copias .gz/.br (ver App_GameVerse/estaticos.py)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'App_GameVerse.estaticos.EstaticosComprimidos'},
+}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Tiempo que se recuerda una clave de idempotencia de checkout/crédito (ver App_GameVerse/idempotencia.py)
+# y plazo de una petición en curso con esa clave: si el proceso muere, un reintento la retoma al vencer.
+IDEMPOTENCIA_TTL = timedelta(hours=24)
+IDEMPOTENCIA_PLAZO = timedelta(seconds=60)
+
+# Cola de tareas en segundo plano (ver App_GameVerse/tareas.py). No hay ajustes aquí, pero además del
+# servidor web debe correr al menos un worker: 'manage.py procesar_tareas'. Sin él las tareas se quedan
+# 'Pendiente': los reembolsos de devoluciones a crédito no se abonan y, con caché compartida, tampoco
+# se generan las imágenes derivadas de los productos.
+
+# Caché (catálogo, fragmentos de plantilla, versión del catálogo). Se elige con GAMEVERSE_CACHE:
+#   'memoria' (por defecto): LocMemCache, una por proceso. Con varios procesos cada uno ve su propia versión.
+#   'archivo': FileBasedCache en GAMEVERSE_CACHE_DIR, compartida por los procesos de la misma máquina.
+#   'redis': RedisCache en GAMEVERSE_CACHE_URL (sirve cualquier servidor compatible: Redis, Valkey, KeyDB...).
+_CACHE = os.environ.get('GAMEVERSE_CACHE', 'memoria')
+if _CACHE == 'redis':
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('GAMEVERSE_CACHE_URL', 'redis://127.0.0.1:6379/0'),
+        'KEY_PREFIX': 'gameverse',
+    }, 'sesiones': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('GAMEVERSE_CACHE_URL', 'redis://127.0.0.1:6379/0'),
+        'KEY_PREFIX': 'gameverse-sesion',
+    }}
+elif _CACHE == 'archivo':
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('GAMEVERSE_CACHE_DIR', str(BASE_DIR / 'cache')),
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    }, 'sesiones': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(os.environ.get('GAMEVERSE_CACHE_DIR', str(BASE_DIR / 'cache')), 'sesiones'),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    }}
+else:
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'gameverse',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }, 'sesiones': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'gameverse-sesiones',
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    }}
+
+# Almacén de sesiones. Se elige con GAMEVERSE_SESIONES:
+#   'cached_db': se leen de la caché 'sesiones' y solo se escriben en la base de datos al cambiar.
+#   'cache': solo en la caché 'sesiones'; se pierden si la caché se vacía o desaloja.
+#   'cookie': firmadas con SECRET_KEY en la cookie del navegador; sin estado en el servidor, cerrar sesión no las revoca.
+#   'db': la tabla django_session de Django, una lectura por petición autenticada.
+# Por defecto es 'cached_db' si la caché es compartida ('archivo' o 'redis') y 'db' con 'memoria': con
+# varios procesos, una sesión cerrada en uno seguiría viva en la caché local de los demás.
+# Las sesiones vencidas de 'db' y 'cached_db' se borran con 'manage.py purgar_sesiones'.
+# La caché 'sesiones' es aparte de 'default' para que el catálogo no desaloje sesiones.
+SESSION_ENGINE = {
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'cookie': 'django.contrib.sessions.backends.signed_cookies',
+    'db': 'django.contrib.sessions.backends.db',
+}[os.environ.get('GAMEVERSE_SESIONES', 'db' if _CACHE == 'memoria' else 'cached_db')]
+SESSION_CACHE_ALIAS = 'sesiones'
+
+# Segundos que vive una entrada de la caché del catálogo (ver App_GameVerse/cache_catalogo.py)
+CATALOGO_CACHE_TTL = 60 * 60
+
+# Instrumentación por petición (ver App_GameVerse/instrumentacion.py).
+# GAMEVERSE_MUESTREO: fracción de peticiones medidas (0 la desactiva, 1 todas).
+# Las que tardan más de GAMEVERSE_UMBRAL_MS se escriben como JSON en el logger 'App_GameVerse.lentas'.
+INSTRUMENTACION_MUESTREO = float(os.environ.get('GAMEVERSE_MUESTREO', '0'))
+INSTRUMENTACION_UMBRAL_MS = int(os.environ.get('GAMEVERSE_UMBRAL_MS', '500'))
+
+# Métricas en formato Prometheus en /metrics/ (ver App_GameVerse/metricas.py).
+# GAMEVERSE_METRICAS=0 apaga el registro por petición. Con varios workers,
+# GAMEVERSE_METRICAS_DIR es un directorio compartido donde cada proceso deja su
+# estado para sumarlo; se debe vaciar en cada despliegue.
+METRICAS_ACTIVAS = os.environ.get('GAMEVERSE_METRICAS', '1') != '0'
+METRICAS_DIR = os.environ.get('GAMEVERSE_METRICAS_DIR') or None
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {'mensaje': {'format': '%(message)s'}},
+    'handlers': {'lentas': {'class': 'logging.StreamHandler', 'formatter': 'mensaje'}},
+    'loggers': {'App_GameVerse.lentas': {'handlers': ['lentas'], 'level': 'WARNING', 'propagate': False}},
+}